@@ -0,0 +1,81 @@
+"""按钮动画渲染基准测试 (无需显示器)
+
+    python benchmarks/bench_animation.py [--frames 2000]
+
+在 QT_QPA_PLATFORM=offscreen 下驱动 AnimatedServerButton / AnimatedStartButton 的悬停动画，
+逐帧同步重绘，输出每秒帧数、每帧的瞬时 Python 内存分配峰值与净增内存块数 (tracemalloc)。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+# main.py 在导入时会在 %APPDATA% 下创建日志目录，基准测试使用临时目录
+os.environ.setdefault('APPDATA', tempfile.mkdtemp(prefix='ArknightsLauncherBench'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QSize  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QWidget  # noqa: E402
+
+import main  # noqa: E402
+
+
+def run_frames(button, frames):
+    """悬停进入 / 离开交替触发动画，每帧设定动画时间后同步重绘"""
+    duration = button.anim.duration()
+    tracemalloc.start()
+    peak_total = 0
+    blocks_before = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    start = time.perf_counter()
+    for i in range(frames):
+        t = i % duration
+        if t == 0:
+            button.is_hover = not button.is_hover
+            button._start_anim()
+        button.anim.setCurrentTime(t)
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        button.repaint()
+        peak_total += tracemalloc.get_traced_memory()[1] - current
+    elapsed = time.perf_counter() - start
+    blocks_after = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    return {
+        'frames': frames,
+        'fps': frames / elapsed,
+        'transient_bytes_per_frame': peak_total / frames,
+        'net_blocks_per_frame': (blocks_after - blocks_before) / frames,
+    }
+
+
+def main_bench(frames):
+    app = QApplication.instance() or QApplication(sys.argv)
+    host = QWidget()
+    host.resize(600, 300)
+
+    server_btn = main.AnimatedServerButton(host)
+    server_btn.setFixedSize(56, 56)
+    server_btn.setIcon(main.QIcon(main.OFFICIAL_ICON))
+    server_btn.setIconSize(QSize(32, 32))
+    start_btn = main.AnimatedStartButton(' 启动游戏  START', host)
+    start_btn.setFixedSize(380, 80)
+    start_btn.move(100, 150)
+    host.show()
+    app.processEvents()
+
+    results = {}
+    for name, button in (('AnimatedServerButton', server_btn), ('AnimatedStartButton', start_btn)):
+        run_frames(button, min(frames, 200))  # 预热
+        results[name] = run_frames(button, frames)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(main_bench(args.frames), indent=2))
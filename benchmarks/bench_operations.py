@@ -0,0 +1,357 @@
+"""常用操作基准测试：切换服务器、修复、校验、账号保存 / 恢复、账号列表与窗口构建
+
+    python benchmarks/bench_operations.py [--scale 1.0] [--presets 10,100,500] [--repeat 5]
+                                          [--baseline benchmarks/baseline.json] [--save-baseline] [--no-gui]
+
+在临时目录中生成与真实结构相同的合成游戏目录、资源包与账号预设 (见 synthetic.py)，
+%APPDATA% 同样指向临时目录，不会触碰真实配置。Windows 专有的调用 (ShellExecuteEx 借权启动、
+os.startfile) 被替换为空操作，窗口构建在 QT_QPA_PLATFORM=offscreen 下进行，可在 Linux 上无界面运行。
+
+每项操作报告耗时中位数、写入字节数与系统调用数。系统调用数为进程 I/O 计数器中的读 / 写次数
+加上审计钩子 (sys.addaudithook) 统计的打开文件、遍历目录、删除 / 重命名 / 建目录 / 修改时间戳次数，
+不含 stat。与基线相比耗时或写入量超过 --threshold 倍时以返回码 1 退出。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import statistics
+import collections
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+# launcher.env 在导入时根据 %APPDATA% 确定数据目录，必须在导入 launcher 之前指向临时目录
+WORK_DIR = tempfile.mkdtemp(prefix='ArknightsLauncherBench')
+os.environ['APPDATA'] = os.path.join(WORK_DIR, 'appdata')
+os.makedirs(os.environ['APPDATA'])
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil  # noqa: E402
+
+import launcher.process  # noqa: E402
+from launcher import env  # noqa: E402
+from launcher.accounts import AccountIndex  # noqa: E402
+from launcher.config import ConfigStore  # noqa: E402
+from launcher.copier import copy_tree  # noqa: E402
+from launcher.detect import detect_server  # noqa: E402
+from launcher.payload import Payload  # noqa: E402
+from launcher.pipeline import (  # noqa: E402
+    PipelineContext, apply_account, repair_stages, run_pipeline, save_account_stages,
+    start_game_stages, switch_server_files, verify_repair_stages
+)
+from launcher.process import GAME_EXE, ProcessController  # noqa: E402
+from launcher.snapshots import SnapshotStore  # noqa: E402
+
+import synthetic  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# 低于该耗时差 (秒) 的变化视为噪声，不判定为回归
+NOISE_FLOOR = 0.002
+
+# 计入系统调用数的审计事件
+AUDIT_EVENTS = {
+    'open': 'opens',
+    'os.scandir': 'dir_scans',
+    'os.listdir': 'dir_scans',
+    'os.remove': 'removes',
+    'os.rmdir': 'removes',
+    'shutil.rmtree': 'removes',
+    'os.rename': 'renames',
+    'os.mkdir': 'mkdirs',
+    'os.utime': 'utimes',
+}
+
+
+# ================= Windows 专有调用 =================
+def stub_windows_calls():
+    """借权启动返回"拿不到 PID"，与 UAC 被拒绝时的行为一致；os.startfile 在 Linux 上不存在"""
+    launcher.process._shell_execute_runas = lambda exe_path, cwd: None
+    if not hasattr(os, 'startfile'):
+        os.startfile = lambda *args, **kwargs: None
+
+
+# ================= 计数 =================
+class Counters:
+    """统计一次运行期间的 I/O 计数器增量与审计事件次数"""
+
+    def __init__(self):
+        self.proc = psutil.Process()
+        self.events = collections.Counter()
+        self.active = False
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event, args):
+        if self.active:
+            name = AUDIT_EVENTS.get(event)
+            if name is not None:
+                self.events[name] += 1
+
+    def _io(self):
+        io = self.proc.io_counters()
+        return (getattr(io, 'write_chars', io.write_bytes), getattr(io, 'read_chars', io.read_bytes),
+                io.write_count, io.read_count)
+
+    def start(self):
+        self.events.clear()
+        self._before = self._io()
+        self.active = True
+
+    def stop(self):
+        self.active = False
+        after = self._io()
+        written, read, writes, reads = (a - b for a, b in zip(after, self._before))
+        result = {'bytes_written': written, 'bytes_read': read, 'write_calls': writes, 'read_calls': reads}
+        result.update(self.events)
+        result['syscalls'] = writes + reads + sum(self.events.values())
+        return result
+
+
+class Bench:
+    """一项基准：setup / teardown 不计时，run 计时并统计 I/O"""
+
+    def __init__(self, name, run, setup=None, teardown=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.teardown = teardown
+
+
+def measure(bench, counters, repeat):
+    walls = []
+    stats = None
+    for _ in range(repeat):
+        if bench.setup:
+            bench.setup()
+        counters.start()
+        start = time.perf_counter()
+        value = bench.run()
+        wall = time.perf_counter() - start
+        stats = counters.stop()
+        if bench.teardown:
+            bench.teardown(value)
+        walls.append(wall)
+    return {'wall': statistics.median(walls), 'wall_min': min(walls), 'repeat': repeat, **stats}
+
+
+# ================= 合成环境 =================
+class World:
+    """基准测试共用的合成游戏目录、资源包与账号预设"""
+
+    def __init__(self, root, scale, preset_counts):
+        self.root = root
+        self.scale = scale
+        self.processes = ProcessController()
+        self.payload_dirs = {}
+        self.payloads = {}
+        for server in ('official', 'bilibili'):
+            src = os.path.join(root, 'payloads', server)
+            synthetic.make_payload(src, server, scale)
+            self.payload_dirs[server] = src
+            self.payloads[server] = Payload.from_directory(server, src, env.MANIFEST_DIR)
+
+        self.game = os.path.join(root, 'game')
+        synthetic.make_game(self.game, scale)
+        self.set_server('official')
+        synthetic.write_login_data(self.game, 'current')
+
+        self.accounts = AccountIndex(env.ACCOUNTS_DIR, env.ACCOUNT_INDEX_PATH, SnapshotStore(env.ACCOUNT_OBJECTS_DIR))
+        synthetic.make_presets(self.game, self.accounts, 2)
+        self.preset_sets = {}
+        for count in preset_counts:
+            base = os.path.join(root, f'presets-{count}')
+            index = AccountIndex(os.path.join(base, 'accounts'), os.path.join(base, 'index.json'),
+                                 SnapshotStore(os.path.join(base, 'objects')))
+            synthetic.make_presets(self.game, index, count)
+            self.preset_sets[count] = index
+
+        config = ConfigStore(env.CONFIG_PATH)
+        config.update({'game_path': self.game, 'last_server': 'official'})
+        config.close()
+
+    def set_server(self, server):
+        switch_server_files(self.game, server, self.payloads[server])
+
+    def damage(self, rel):
+        with open(os.path.join(self.game, rel), 'r+b') as f:
+            f.write(b'\0' * 16)
+
+    def run(self, stages):
+        return run_pipeline(stages, PipelineContext())
+
+
+def build_benches(world, with_gui):
+    game = world.game
+    copy_dst = os.path.join(world.root, 'copy-target')
+    benches = [
+        Bench('copy_tree (cold)', lambda: copy_tree(world.payload_dirs['bilibili'], copy_dst),
+              setup=lambda: shutil.rmtree(copy_dst, ignore_errors=True)),
+        Bench('copy_tree (overwrite)', lambda: copy_tree(world.payload_dirs['bilibili'], copy_dst)),
+        Bench('kill_process (not running)', lambda: world.processes.terminate(GAME_EXE)),
+        Bench('detect (cold)', lambda: detect_server(game, world.payloads, env.SERVER_CACHE_PATH),
+              setup=lambda: os.path.exists(env.SERVER_CACHE_PATH) and os.remove(env.SERVER_CACHE_PATH)),
+        Bench('detect (cached)', lambda: detect_server(game, world.payloads, env.SERVER_CACHE_PATH)),
+        Bench('switch official -> bilibili', lambda: world.run(start_game_stages(
+            game, 'bilibili', world.payloads['bilibili'], None, True, world.accounts.snapshots, world.processes)),
+            setup=lambda: world.set_server('official')),
+        Bench('switch bilibili -> official', lambda: world.run(start_game_stages(
+            game, 'official', world.payloads['official'], None, True, world.accounts.snapshots, world.processes)),
+            setup=lambda: world.set_server('bilibili')),
+        Bench('start (same server)', lambda: world.run(start_game_stages(
+            game, 'official', None, world.accounts.path_of('account-000'), False,
+            world.accounts.snapshots, world.processes)),
+            setup=lambda: synthetic.write_login_data(game, 'current')),
+        Bench('repair', lambda: world.run(repair_stages(game, world.payloads['official'], world.processes)),
+              setup=lambda: synthetic.write_login_data(game, 'current')),
+        Bench('verify (clean)', lambda: world.run(verify_repair_stages(
+            game, world.payloads['official'], world.processes, repair=False))),
+        Bench('verify + repair (1 damaged file)', lambda: world.run(verify_repair_stages(
+            game, world.payloads['official'], world.processes)),
+            setup=lambda: world.damage('U8CoreUI.dll')),
+        Bench('account save', lambda: world.run(save_account_stages(game, world.accounts, 'bench-save', 'official')),
+              setup=lambda: synthetic.write_login_data(game, f'save-{time.perf_counter_ns()}')),
+        Bench('account restore', lambda: apply_account(
+            world.accounts.path_of('account-001'), game, world.accounts.snapshots),
+            setup=lambda: synthetic.write_login_data(game, 'current')),
+    ]
+    for count, index in world.preset_sets.items():
+        def rebuild(index=index):
+            if os.path.exists(index.index_path):
+                os.remove(index.index_path)
+            index._data = None
+
+        def reload(index=index):
+            # 新启动的进程：索引只在磁盘上
+            return AccountIndex(index.accounts_dir, index.index_path, index.snapshots).names_for('official')
+
+        benches.append(Bench(f'accounts list x{count} (rebuild)', lambda index=index: index.names_for('official'),
+                             setup=rebuild))
+        benches.append(Bench(f'accounts list x{count} (index)', reload))
+    if with_gui:
+        benches.append(window_bench())
+    return benches
+
+
+def window_bench():
+    from PyQt6.QtWidgets import QApplication
+    import main
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    main.PROFILER.finish()
+
+    def teardown(window):
+        window.monitor.stop()
+        window.stateModel.stop()
+        window.config.close()
+        window.deleteLater()
+        app.processEvents()
+
+    return Bench('window construction', main.ModernArknightsLauncher, teardown=teardown)
+
+
+# ================= 基线比较 =================
+def compare(results, baseline, threshold):
+    """返回 {名称: 说明}，以及回归项列表"""
+    notes = {}
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            notes[name] = 'new'
+            continue
+        ratio = r['wall'] / base['wall'] if base['wall'] > 0 else 1.0
+        notes[name] = f'{ratio:.2f}x'
+        if ratio > threshold and r['wall'] - base['wall'] > NOISE_FLOOR:
+            regressions.append(f'{name}: 耗时 {base["wall"] * 1000:.1f}ms -> {r["wall"] * 1000:.1f}ms')
+        if base['bytes_written'] and r['bytes_written'] > base['bytes_written'] * threshold:
+            regressions.append(f'{name}: 写入 {base["bytes_written"]} B -> {r["bytes_written"]} B')
+            notes[name] += ' (写入增加)'
+    return notes, regressions
+
+
+def format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+
+
+def print_table(results, notes):
+    width = max(len(name) for name in results)
+    print(f'{"operation":<{width}}  {"wall (ms)":>10}  {"written":>10}  {"syscalls":>9}  {"opens":>6}  baseline')
+    for name, r in results.items():
+        print(f'{name:<{width}}  {r["wall"] * 1000:>10.2f}  {format_bytes(r["bytes_written"]):>10}  '
+              f'{r["syscalls"]:>9}  {r.get("opens", 0):>6}  {notes.get(name, "")}')
+
+
+def main_bench(args):
+    stub_windows_calls()
+    # 各操作的 INFO 日志会淹没结果输出
+    logging.getLogger('ArknightsLauncher').setLevel(logging.WARNING)
+    counters = Counters()
+    preset_counts = [int(n) for n in args.presets.split(',') if n]
+    start = time.perf_counter()
+    world = World(os.path.join(WORK_DIR, 'world'), args.scale, preset_counts)
+    print(f'合成环境生成完毕 ({time.perf_counter() - start:.1f}s): {WORK_DIR}', file=sys.stderr)
+
+    with_gui = not args.no_gui
+    if with_gui:
+        try:
+            import PyQt6  # noqa: F401
+        except ImportError:
+            print('未安装 PyQt6，跳过窗口构建基准', file=sys.stderr)
+            with_gui = False
+
+    results = {}
+    for bench in build_benches(world, with_gui):
+        if args.only and args.only not in bench.name:
+            continue
+        results[bench.name] = measure(bench, counters, args.repeat)
+        print(f'  {bench.name}: {results[bench.name]["wall"] * 1000:.2f}ms', file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='合成文件大小的缩放比例')
+    parser.add_argument('--presets', default='10,100,500', help='账号列表基准使用的预设数量 (逗号分隔)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='只运行名称包含该字符串的基准')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果写入基线文件')
+    parser.add_argument('--threshold', type=float, default=1.25, help='判定为回归的倍数')
+    parser.add_argument('--no-gui', action='store_true', help='跳过窗口构建基准')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出完整结果')
+    parser.add_argument('--keep', action='store_true', help='保留临时目录')
+    args = parser.parse_args(argv)
+
+    try:
+        results = main_bench(args)
+    finally:
+        if not args.keep:
+            shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    notes, regressions = compare(results, baseline, args.threshold) if baseline else ({}, [])
+
+    if args.json:
+        print(json.dumps({'results': results, 'regressions': regressions}, ensure_ascii=False, indent=2))
+    else:
+        print_table(results, notes)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'presets': args.presets, 'results': results}, f, indent=2)
+        print(f'基线已写入 {args.baseline}', file=sys.stderr)
+    if regressions:
+        print('性能回归:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""基准测试用的合成游戏目录、资源包与账号预设
+
+目录结构与文件大小仿照真实资源：两个服务器共有的 SDK 文件 (内容不同)、官服专属的 hgsdk.dll、
+B 服专属的 BLPlatform64/BLWebBrowser (CEF) 目录树，以及 U8Data / sdkdata 登录数据。
+文件内容由固定种子生成，同样的参数每次生成完全相同的目录；scale 按比例缩放全部文件大小。
+"""
+import os
+import random
+
+KB = 1024
+MB = 1024 * KB
+
+# 两个服务器都有、但内容不同的文件
+COMMON_FILES = {
+    'PlatformProcess.exe': 180 * KB,
+    'PlatformProcess.dll': 620 * KB,
+    'U8CoreUI.dll': int(1.8 * MB),
+    'webviewsdk.dll': int(2.7 * MB),
+    'u8_channel.dll': 90 * KB,
+    'game_files': int(1.9 * MB),
+    'U8Data/config': 2 * KB,
+    'sdkdata/sdk_hgsdk_config.bin': 1 * KB,
+    'sdkdata/sdk_hgsdk_config.gryph': 1 * KB,
+}
+OFFICIAL_FILES = {
+    'hgsdk.dll': int(2.2 * MB),
+}
+CEF_DIR = 'BLPlatform64/BLWebBrowser'
+CEF_FILES = {
+    'libcef.dll': int(3.2 * MB),
+    'swiftshader/libGLESv2.dll': int(3.7 * MB),
+    'swiftshader/libEGL.dll': 400 * KB,
+    'cef.pak': int(2.1 * MB),
+    'cef_extensions.pak': int(1.7 * MB),
+    'cef_100_percent.pak': 650 * KB,
+    'cef_200_percent.pak': 800 * KB,
+    'chrome_elf.dll': 990 * KB,
+    'v8_context_snapshot.bin': 560 * KB,
+    'icudtl.dat': int(1.5 * MB),
+    'BLWebBrowser.exe': 900 * KB,
+}
+# CEF 语言包：真实目录中约 55 个，大小在 200 KB ~ 620 KB 之间
+CEF_LOCALES = 55
+BILIBILI_FILES = {
+    'PCGameSDK.dll': int(1.1 * MB),
+}
+# 游戏本体中与切换无关的文件 (只影响目录规模)
+GAME_DATA_FILES = 400
+GAME_DATA_SIZE = 48 * KB
+LOGIN_DATA = {
+    'U8Data/config': 2 * KB,
+    'U8Data/session.dat': 6 * KB,
+    'sdkdata/sdk_hgsdk_config.bin': 1 * KB,
+    'sdkdata/sdk_hgsdk_config.gryph': 1 * KB,
+    'sdkdata/token.dat': 3 * KB,
+}
+
+_POOL_SIZE = 4 * MB
+
+
+class ContentSource:
+    """由种子生成确定的文件内容：从一块随机数据中按偏移截取，文件头写入唯一标记使每个文件内容不同"""
+
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        self.pool = rng.randbytes(_POOL_SIZE)
+        self.rng = rng
+
+    def content(self, tag, size):
+        header = f'{tag}\n'.encode('utf-8')[:size]
+        data = bytearray(header)
+        while len(data) < size:
+            offset = self.rng.randrange(_POOL_SIZE)
+            data += self.pool[offset:offset + size - len(data)]
+        return bytes(data)
+
+
+def write_files(root, files, source, tag, scale=1.0):
+    """写入 {相对路径: 大小}，返回写入的字节数"""
+    total = 0
+    for rel, size in files.items():
+        size = max(1, int(size * scale))
+        path = os.path.join(root, *rel.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(source.content(f'{tag}:{rel}', size))
+        total += size
+    return total
+
+
+def cef_tree():
+    files = {f'{CEF_DIR}/{rel}': size for rel, size in CEF_FILES.items()}
+    rng = random.Random('locales')
+    for i in range(CEF_LOCALES):
+        files[f'{CEF_DIR}/locales/l{i:02d}.pak'] = rng.randrange(200 * KB, 620 * KB)
+    return files
+
+
+def payload_files(server):
+    files = dict(COMMON_FILES)
+    if server == 'official':
+        files.update(OFFICIAL_FILES)
+    else:
+        files.update(BILIBILI_FILES)
+        files.update(cef_tree())
+    return files
+
+
+def make_payload(root, server, scale=1.0):
+    """生成服务器资源包目录 (与 resources/Payload、Payload_B 结构相同)"""
+    return write_files(root, payload_files(server), ContentSource(f'payload-{server}'), server, scale)
+
+
+def make_game(root, scale=1.0):
+    """生成不含服务器资源的游戏本体目录"""
+    files = {'Arknights.exe': 650 * KB}
+    files.update({f'Arknights_Data/StreamingAssets/AB/{i:04d}.ab': GAME_DATA_SIZE for i in range(GAME_DATA_FILES)})
+    return write_files(root, files, ContentSource('game'), 'game', scale)
+
+
+def write_login_data(game_path, account):
+    """模拟某个账号登录后写入的 U8Data / sdkdata"""
+    return write_files(game_path, LOGIN_DATA, ContentSource(f'login-{account}'), account)
+
+
+def make_presets(game_path, accounts, count, server_of=lambda i: ('official', 'bilibili')[i % 2]):
+    """依次 "登录" 并保存 count 个账号预设，返回预设名列表"""
+    from launcher.pipeline import save_login_data
+
+    names = []
+    for i in range(count):
+        name = f'account-{i:03d}'
+        write_login_data(game_path, name)
+        save_login_data(game_path, accounts.path_of(name), server_of(i), accounts.snapshots)
+        names.append(name)
+    return names
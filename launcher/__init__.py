@@ -0,0 +1 @@
+"""启动器核心逻辑 (不依赖 Qt，可被 GUI 与命令行共同使用)"""
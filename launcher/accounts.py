@@ -0,0 +1,252 @@
+"""账号预设索引
+
+将每个预设的名称、服务器、创建 / 最近使用时间、大小与快照哈希保存在单个索引文件中，
+加载一次即可按服务器筛选，无需每次切换服务器都扫描目录并逐个读取 meta.json。
+索引记录了预设目录自身的修改时间与每个预设的修改标记，目录增删条目或预设被修改后
+(例如手动删除、另一个启动器实例保存) 会在下次访问时只重新扫描变化的预设。
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+
+from launcher.copier import iter_files
+from launcher.payload import file_sha256
+from launcher.snapshots import SNAPSHOT_FILE, SnapshotStore
+
+logger = logging.getLogger('ArknightsLauncher')
+
+INDEX_VERSION = 1
+META_FILE = 'meta.json'
+
+
+def read_meta(acc_path):
+    try:
+        with open(os.path.join(acc_path, META_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def scan_account(acc_path):
+    """统计预设的大小与快照哈希 (按相对路径排序后对各文件哈希再做一次哈希)
+
+    快照格式的预设直接读取快照清单，旧版目录格式的预设则逐个文件计算。
+    """
+    size = 0
+    h = hashlib.sha256()
+    snapshot = SnapshotStore.read_snapshot(acc_path)
+    if snapshot is not None:
+        items = ((rel, meta['size'], meta['sha256']) for rel, meta in snapshot['files'].items())
+    else:
+        items = ((rel, entry.stat().st_size, file_sha256(entry.path)) for rel, entry in iter_files(acc_path))
+    for rel, file_size, digest in sorted(items):
+        size += file_size
+        h.update(f'{rel}\0{digest}\n'.encode('utf-8'))
+    return size, h.hexdigest()
+
+
+def entry_stamp(acc_path):
+    """预设目录、meta.json 与快照清单的修改时间，任一变化即需要重新扫描该预设"""
+    parts = []
+    for path in (acc_path, os.path.join(acc_path, META_FILE), os.path.join(acc_path, SNAPSHOT_FILE)):
+        try:
+            parts.append(str(os.stat(path).st_mtime_ns))
+        except OSError:
+            parts.append('-')
+    return '|'.join(parts)
+
+
+def stamp_age(stamp, now=None):
+    """entry_stamp 中最近一次修改距今的秒数，全部缺失时为 None"""
+    times = [int(part) for part in stamp.split('|') if part != '-']
+    if not times:
+        return None
+    return (now if now is not None else time.time()) - max(times) / 1e9
+
+
+def filter_names(accounts, server):
+    """某服务器可用的预设名 (未记录服务器归属的旧预设在两个服务器下都显示)"""
+    return sorted(name for name, e in accounts.items() if not e.get('server') or e['server'] == server)
+
+
+class AccountIndex:
+    def __init__(self, accounts_dir, index_path, snapshots=None):
+        self.accounts_dir = accounts_dir
+        self.index_path = index_path
+        self.snapshots = snapshots
+        self._lock = threading.RLock()
+        self._data = None
+
+    def path_of(self, name):
+        return os.path.join(self.accounts_dir, name)
+
+    # ---------------- 读取 ----------------
+    def _dir_mtime_ns(self):
+        os.makedirs(self.accounts_dir, exist_ok=True)
+        return os.stat(self.accounts_dir).st_mtime_ns
+
+    def _load(self):
+        """返回最新的索引数据：内存 → 磁盘 → 增量同步 / 重建，逐级回退"""
+        dir_mtime = self._dir_mtime_ns()
+        if self._data is not None and self._data['dir_mtime_ns'] == dir_mtime:
+            return self._data
+        data = None
+        if self._data is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+            if data is not None and data.get('version') == INDEX_VERSION:
+                self._data = data
+                if data.get('dir_mtime_ns') == dir_mtime:
+                    return data
+        if self._data is None:
+            return self.rebuild(previous=data)
+        self.sync()
+        return self._data
+
+    def entries(self):
+        with self._lock:
+            return dict(self._load()['accounts'])
+
+    def get(self, name):
+        with self._lock:
+            return self._load()['accounts'].get(name)
+
+    def names_for(self, server):
+        """某服务器可用的预设名 (未记录服务器归属的旧预设在两个服务器下都显示)"""
+        with self._lock:
+            return filter_names(self._load()['accounts'], server)
+
+    # ---------------- 写入 ----------------
+    def _write(self, complete=True):
+        self._data['dir_mtime_ns'] = self._dir_mtime_ns()
+        # 还有未扫描的预设时文件中不记录目录修改时间，下次启动加载时会再同步一次
+        data = self._data if complete else dict(self._data, dir_mtime_ns=0)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _scan_entry(self, name, prev, migrate=False):
+        """扫描单个预设目录，返回索引条目；migrate 为 True 时先将旧版目录格式转换为快照格式"""
+        acc_path = self.path_of(name)
+        if migrate and self.snapshots is not None and not SnapshotStore.has_snapshot(acc_path):
+            self.snapshots.migrate_legacy(acc_path)
+        meta = read_meta(acc_path)
+        size, snapshot = scan_account(acc_path)
+        return {
+            'server': meta.get('server'),
+            'created': meta.get('created') or prev.get('created') or os.stat(acc_path).st_mtime,
+            'last_used': prev.get('last_used'),
+            'size': size,
+            'snapshot': snapshot,
+            'stamp': entry_stamp(acc_path),
+        }
+
+    def rebuild(self, previous=None):
+        """完整扫描预设目录重建索引，尽量保留旧索引中的时间信息"""
+        with self._lock:
+            old = previous.get('accounts', {}) if previous else {}
+            accounts = {}
+            for entry in os.scandir(self.accounts_dir):
+                if entry.is_dir():
+                    accounts[entry.name] = self._scan_entry(entry.name, old.get(entry.name, {}), migrate=True)
+            self._data = {'version': INDEX_VERSION, 'dir_mtime_ns': 0, 'accounts': accounts}
+            self._write()
+            logger.info(f'已重建账号索引: {len(accounts)} 个预设')
+            return self._data
+
+    def sync(self, settle=0):
+        """只重新扫描新增或标记变化的预设、移除已消失的预设，返回 (新增, 删除, 变化, 待定) 的名称列表
+
+        供目录监视在外部修改 (手动增删、另一个启动器实例保存预设) 后调用，避免整体重建。
+        修改标记在 settle 秒内变化过的预设可能仍在复制中，本次不扫描，作为待定返回，
+        调用方应稍后再同步一次。同步不转换旧版格式的预设 (见 migrate_legacy)。
+        """
+        with self._lock:
+            if self._data is None:
+                self._load()
+                return [], [], [], []
+            accounts = self._data['accounts']
+            present = {}
+            for entry in os.scandir(self.accounts_dir):
+                if entry.is_dir():
+                    present[entry.name] = entry_stamp(entry.path)
+            removed = sorted(set(accounts) - set(present))
+            added, changed, pending = [], [], []
+            now = time.time()
+            for name, stamp in sorted(present.items()):
+                prev = accounts.get(name)
+                if prev is not None and prev.get('stamp') == stamp:
+                    continue
+                age = stamp_age(stamp, now)
+                if settle and age is not None and age < settle:
+                    pending.append(name)
+                    continue
+                accounts[name] = self._scan_entry(name, prev or {})
+                (changed if prev is not None else added).append(name)
+            for name in removed:
+                del accounts[name]
+            if added or removed or changed or pending or self._data['dir_mtime_ns'] != self._dir_mtime_ns():
+                self._write(complete=not pending)
+            if added or removed or changed:
+                logger.info(f'账号索引已同步: 新增 {added}，删除 {removed}，变化 {changed}')
+            return added, removed, changed, pending
+
+    def migrate_legacy(self):
+        """将旧版 (直接保存 U8Data / sdkdata 目录) 的预设转换为快照格式，返回转换的名称列表
+
+        只在启动时调用一次 (以及 rebuild 中)；转换会删除预设中的原目录，
+        不能在监视触发的 sync 中进行，否则可能破坏仍在复制中的预设。
+        """
+        if self.snapshots is None:
+            return []
+        with self._lock:
+            accounts = self._load()['accounts']
+            migrated = []
+            for name in sorted(accounts):
+                acc_path = self.path_of(name)
+                if os.path.isdir(acc_path) and not SnapshotStore.has_snapshot(acc_path):
+                    accounts[name] = self._scan_entry(name, accounts[name], migrate=True)
+                    migrated.append(name)
+            if migrated:
+                self._write()
+            return migrated
+
+    def record_saved(self, name):
+        """预设目录写入完成后更新索引"""
+        with self._lock:
+            self._load()
+            prev = self._data['accounts'].get(name, {})
+            self._data['accounts'][name] = self._scan_entry(name, prev)
+            self._write()
+            if prev and self.snapshots is not None:
+                # 覆盖保存后旧快照引用的数据块可能已无人使用
+                self.snapshots.gc(self.accounts_dir)
+
+    def delete(self, name):
+        """删除预设目录并同步移除索引条目"""
+        with self._lock:
+            self._load()
+            acc_path = self.path_of(name)
+            if os.path.exists(acc_path):
+                shutil.rmtree(acc_path, ignore_errors=True)
+            self._data['accounts'].pop(name, None)
+            self._write()
+            if self.snapshots is not None:
+                self.snapshots.gc(self.accounts_dir)
+
+    def touch(self, name):
+        """记录预设最近一次被应用的时间"""
+        with self._lock:
+            entry = self._load()['accounts'].get(name)
+            if entry is not None:
+                entry['last_used'] = time.time()
+                self._write()
@@ -0,0 +1,146 @@
+"""资源包归档与按需解压缓存
+
+打包版本不再把 Payload / Payload_B 作为 --add-data 随单文件 exe 分发 (否则每次启动都要
+解压到新的 _MEIPASS)，而是将两套资源连同各自的清单压缩为一个归档文件，
+与 exe 放在同一目录。归档内的 index.json 记录由各服务器清单计算出的内容键；
+首次需要资源 (切换 / 修复 / 检测服务器) 时才解压到本地缓存目录下以内容键命名的子目录，
+之后直接复用，启动时间不再随资源大小增长。
+
+归档结构::
+
+    index.json             # {"version": 2, "key": <内容键>, "servers": [...]}
+    official.json          # 与 launcher.payload 相同格式的清单
+    bilibili.json
+    official/...           # 资源文件，按清单中的相对路径存放
+    bilibili/...
+
+两套资源没有内容相同的文件，按哈希去重存放并不能节省空间，因此直接按目录存放。
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import zipfile
+
+from launcher.payload import build_manifest
+
+logger = logging.getLogger('ArknightsLauncher')
+
+ARCHIVE_NAME = 'ArknightsLauncher.payloads'
+ARCHIVE_VERSION = 2
+INDEX_NAME = 'index.json'
+# 解压完成的标记文件，缺少该文件的缓存目录视为不完整
+COMPLETE_MARKER = '.complete'
+
+
+class PayloadArchive:
+    """资源包归档：读取内容键很廉价，解压只在首次调用 extract 时发生"""
+
+    def __init__(self, path, cache_root):
+        self.path = path
+        self.cache_root = cache_root
+        self._index = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'PayloadArchive({self.path!r})'
+
+    @classmethod
+    def locate(cls, search_dirs, cache_root):
+        """在 search_dirs 中查找归档文件，找不到时返回 None"""
+        for directory in search_dirs:
+            path = os.path.join(directory, ARCHIVE_NAME)
+            if os.path.isfile(path):
+                return cls(path, cache_root)
+        return None
+
+    @property
+    def index(self):
+        if self._index is None:
+            with zipfile.ZipFile(self.path) as zf:
+                index = json.loads(zf.read(INDEX_NAME).decode('utf-8'))
+            if index.get('version') != ARCHIVE_VERSION:
+                raise ValueError(f'不支持的资源归档版本: {index.get("version")}')
+            self._index = index
+        return self._index
+
+    @property
+    def key(self):
+        return self.index['key']
+
+    @property
+    def extract_dir(self):
+        return os.path.join(self.cache_root, self.key)
+
+    def is_extracted(self):
+        return os.path.exists(os.path.join(self.extract_dir, COMPLETE_MARKER))
+
+    def extract(self):
+        """确保归档已解压到缓存目录，返回解压目录；同一内容只解压一次"""
+        with self._lock:
+            extract_dir = self.extract_dir
+            if self.is_extracted():
+                return extract_dir
+            os.makedirs(self.cache_root, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(prefix=f'{self.key}.', suffix='.tmp', dir=self.cache_root)
+            try:
+                with zipfile.ZipFile(self.path) as zf:
+                    zf.extractall(tmp_dir)
+                open(os.path.join(tmp_dir, COMPLETE_MARKER), 'w').close()
+                shutil.rmtree(extract_dir, ignore_errors=True)
+                os.replace(tmp_dir, extract_dir)
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            logger.info(f'资源归档已解压到 {extract_dir}')
+            self._prune()
+            return extract_dir
+
+    def _prune(self):
+        """删除其它版本的解压缓存 (启动器更新后残留的旧资源)"""
+        for name in os.listdir(self.cache_root):
+            if not name.startswith(self.key):
+                shutil.rmtree(os.path.join(self.cache_root, name), ignore_errors=True)
+
+
+def _manifest_bytes(manifest):
+    # 与 save_manifest 相同的序列化方式
+    return json.dumps(manifest, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def content_key(manifests):
+    """由各服务器清单 {server: 清单 JSON 字节} 计算内容键：清单包含每个文件的哈希，清单相同即全部内容相同"""
+    # 包含归档版本：旧版本解压出的缓存目录布局不同，不能复用
+    h = hashlib.sha256(f'v{ARCHIVE_VERSION}'.encode('ascii'))
+    for server in sorted(manifests):
+        h.update(server.encode('utf-8'))
+        h.update(hashlib.sha256(manifests[server]).digest())
+    return h.hexdigest()
+
+
+def build_archive(out_path, payloads):
+    """由 {server: src_dir} 构建归档文件"""
+    manifests = {server: build_manifest(src_dir) for server, src_dir in payloads.items()}
+    encoded = {server: _manifest_bytes(manifest) for server, manifest in manifests.items()}
+    index = {'version': ARCHIVE_VERSION, 'key': content_key(encoded), 'servers': sorted(payloads)}
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = out_path + '.tmp'
+    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        zf.writestr(INDEX_NAME, json.dumps(index))
+        for server in sorted(payloads):
+            zf.writestr(f'{server}.json', encoded[server])
+            for rel in sorted(manifests[server]['files']):
+                zf.write(os.path.join(payloads[server], *rel.split('/')), f'{server}/{rel}')
+    os.replace(tmp_path, out_path)
+    print(f'{out_path}: key {index["key"]}, {os.path.getsize(out_path)} B')
+    return index
+
+
+if __name__ == '__main__':
+    # 构建时生成，与 exe 放在同一目录分发:
+    # python -m launcher.archive dist/ArknightsLauncher.payloads official=resources/Payload bilibili=resources/Payload_B
+    build_archive(sys.argv[1], dict(arg.split('=', 1) for arg in sys.argv[2:]))
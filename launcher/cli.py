@@ -0,0 +1,284 @@
+"""命令行模式：无界面地切换服务器 / 账号、查看状态、校验修复、列出账号与多账号轮换
+
+    ArknightsLauncher switch --server bilibili --account 主号 --launch
+    ArknightsLauncher status [--json]
+    ArknightsLauncher verify [--server official] [--json]
+    ArknightsLauncher repair [--server official] [--reset-login | --full]
+    ArknightsLauncher list-accounts [--server bilibili] [--json]
+    ArknightsLauncher rotate [--accounts 主号 小号 ...] [--maa-timeout 40] [--json]
+    ArknightsLauncher diagnostics [--json]
+
+main.py 在导入 PyQt6 之前识别这些子命令并转交给本模块，整个调用路径不加载 Qt。
+进度与日志输出到标准错误，结果 (含 --json) 输出到标准输出；成功返回 0，失败返回 1。
+"""
+import sys
+import json
+import argparse
+import logging
+
+from launcher import env
+from launcher import logs, metrics
+from launcher.config import SERVERS
+from launcher.monitor import SessionHistory
+from launcher.pipeline import PipelineCancelled, PipelineContext, run_pipeline
+from launcher.process import GAME_EXE
+from launcher.progress import format_eta, format_rate
+from launcher.rotation import MAA_TIMEOUT, RotationRunner, plan_rotation
+from launcher.service import SERVER_NAMES, LauncherError, LauncherService
+
+logger = logging.getLogger('ArknightsLauncher')
+
+
+class StageReporter:
+    """在标准错误上以单行刷新的方式显示当前阶段与进度"""
+
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.title = ''
+        self.interactive = stream.isatty()
+
+    def on_stage(self, index, count, stage):
+        self.title = f'[{index + 1}/{count}] {stage.title}'
+        self._write(self.title, final=not self.interactive)
+
+    def on_progress(self, snapshot):
+        if not self.interactive:
+            return
+        line = f'{self.title}  {snapshot.percent}%'
+        if snapshot.rate:
+            line += f'  {format_rate(snapshot.rate)}  剩余 {format_eta(snapshot.eta)}'
+        self._write(line)
+
+    def _write(self, line, final=False):
+        if self.interactive:
+            self.stream.write('\r\033[K' + line + ('\n' if final else ''))
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def done(self):
+        if self.interactive and self.title:
+            self.stream.write('\n')
+            self.stream.flush()
+
+
+def _run(stages):
+    reporter = StageReporter()
+    ctx = PipelineContext(reporter.on_progress)
+    try:
+        return run_pipeline(stages, ctx, reporter.on_stage)
+    finally:
+        reporter.done()
+
+
+def _print_json(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+# ================= 子命令 =================
+
+def cmd_switch(service, args):
+    if service.recover():
+        logger.warning('检测到上次服务器切换未完成，游戏文件已恢复到切换前的状态')
+    if args.account and args.account not in service.accounts.names_for(args.server):
+        raise LauncherError(f'{SERVER_NAMES[args.server]}下没有名为「{args.account}」的账号预设')
+    plan = service.plan_start(args.server, args.account)
+    print(plan.summary(), file=sys.stderr)
+    _run(service.start_stages(plan))
+    service.finish_start(plan, launch=args.launch)
+    if args.launch:
+        print(f'已切换到{SERVER_NAMES[args.server]}并拉起 {GAME_EXE}')
+    else:
+        print(f'已切换到{SERVER_NAMES[args.server]}')
+
+
+def cmd_status(service, args):
+    game_path = service.game_path
+    recovered = service.recover()
+    verdict = service.detect() if game_path else None
+    running = [p.pid for p in service.processes.find(GAME_EXE)]
+    status = {
+        'version': env.VERSION,
+        'game_path': game_path,
+        'last_server': service.config.get('last_server', 'official'),
+        'detected_server': verdict.server if verdict else None,
+        'differing': {k: len(v) for k, v in verdict.differing.items()} if verdict else {},
+        'recovered': recovered,
+        'game_running': running,
+        'payload_archive': service.payload_archive.path if service.payload_archive else None,
+        'accounts': len(service.accounts.entries()),
+    }
+    if args.json:
+        _print_json(status)
+        return
+    print(f'启动器版本:   {status["version"]}')
+    print(f'游戏目录:     {game_path or "(未配置)"}')
+    print(f'上次服务器:   {SERVER_NAMES.get(status["last_server"], status["last_server"])}')
+    if verdict:
+        detected = SERVER_NAMES.get(verdict.server, '混合 (文件不一致)')
+        print(f'当前文件:     {detected}')
+        for server, count in status['differing'].items():
+            if count:
+                print(f'  与{SERVER_NAMES[server]}资源不一致: {count} 个文件')
+    print(f'游戏进程:     {", ".join(map(str, running)) if running else "未运行"}')
+    print(f'账号预设:     {status["accounts"]} 个')
+
+
+def _print_verify(report):
+    print(f'校验 {report.files_checked} 个文件，耗时 {report.elapsed:.2f}s')
+    for label, paths in (('缺失', report.missing), ('已修改', report.modified), ('多余', report.foreign)):
+        for rel in paths:
+            print(f'  {label}: {rel}')
+
+
+def cmd_verify(service, args):
+    server = args.server or service.config.get('last_server', 'official')
+    report = _run(service.verify_repair(server, repair=False))['verify']
+    if args.json:
+        _print_json(report.to_dict())
+    else:
+        _print_verify(report)
+    if not report.ok:
+        raise LauncherError(f'发现 {report.damaged} 个与{SERVER_NAMES[server]}资源不一致的文件')
+
+
+def cmd_repair(service, args):
+    server = args.server or service.config.get('last_server', 'official')
+    if args.full:
+        _run(service.repair(server))
+    else:
+        results = _run(service.verify_repair(server, preserve_login=not args.reset_login))
+        _print_verify(results['verify'])
+        print(f'修复 {results["repair"].files_written} 个文件')
+    print(f'【{SERVER_NAMES[server]}】环境修复完毕')
+
+
+def cmd_list_accounts(service, args):
+    entries = service.accounts.entries()
+    names = service.accounts.names_for(args.server) if args.server else sorted(entries)
+    if args.json:
+        _print_json({name: entries[name] for name in names})
+        return
+    for name in names:
+        entry = entries[name]
+        server = SERVER_NAMES.get(entry.get('server'), '未知')
+        print(f'{name}\t{server}\t{entry["size"]} B')
+
+
+def cmd_rotate(service, args):
+    maa_path = service.require_maa_path()
+    service.require_game_path()
+    if service.recover():
+        logger.warning('检测到上次服务器切换未完成，游戏文件已恢复到切换前的状态')
+    names = args.accounts or sorted(service.accounts.entries())
+    unknown = [name for name in names if service.accounts.get(name) is None]
+    if unknown:
+        raise LauncherError(f'账号预设不存在: {", ".join(unknown)}')
+    items, skipped = plan_rotation(service.accounts, names, service.current_server())
+    if skipped:
+        print(f'以下预设未记录服务器归属，已跳过: {", ".join(skipped)}', file=sys.stderr)
+    if not items:
+        raise LauncherError('没有可轮换的账号预设')
+
+    reporter = StageReporter()
+    runner = RotationRunner(
+        service, maa_path, items, maa_timeout=args.maa_timeout * 60,
+        history=SessionHistory(env.SESSION_HISTORY_PATH),
+        on_item=lambda i, n, item: print(f'== ({i + 1}/{n}) {SERVER_NAMES[item.server]} {item.name}', file=sys.stderr),
+        on_stage=reporter.on_stage, on_progress=reporter.on_progress,
+        on_status=lambda text: reporter.done(),
+    )
+    try:
+        report = runner.run()
+    except KeyboardInterrupt:
+        runner.cancel()
+        raise LauncherError('轮换已取消')
+    SessionHistory(env.ROTATION_HISTORY_PATH).append(report)
+    if args.json:
+        _print_json(report.to_dict())
+    else:
+        for result in report.results:
+            line = f'{result.item.name}\t{SERVER_NAMES[result.item.server]}\t{result.status}\t{result.duration / 60:.1f} 分钟'
+            print(line + (f'\t{result.error}' if result.error else ''))
+        print(f'完成 {report.completed}/{len(items)} 个账号，耗时 {report.elapsed / 60:.1f} 分钟，'
+              f'{report.accounts_per_hour:.1f} 个/小时')
+    if report.completed < len(items):
+        raise LauncherError(f'{len(items) - report.completed} 个账号未完成')
+
+
+def cmd_diagnostics(service, args):
+    summary = metrics.summarize(metrics.RECORDER.load())
+    info = metrics.machine_info()
+    if args.json:
+        _print_json({'machine': info, 'version': env.VERSION, 'operations': summary})
+        return
+    print(f'{info["host"]}  {info["platform"]}  Python {info["python"]}  {info["cpus"]} 核  启动器 {env.VERSION}')
+    if not summary:
+        print('暂无操作记录')
+        return
+    for line in metrics.format_summary(summary):
+        print(line)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='ArknightsLauncher', description='明日方舟多服务器启动器 (命令行模式)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('switch', help='切换服务器文件并应用账号预设')
+    p.add_argument('--server', required=True, choices=SERVERS)
+    p.add_argument('--account', help='要加载的账号预设名')
+    p.add_argument('--launch', action='store_true', help='完成后拉起游戏')
+    p.set_defaults(func=cmd_switch)
+
+    p = sub.add_parser('status', help='显示配置与游戏目录当前的服务器状态')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser('verify', help='校验游戏文件是否与服务器资源一致 (不修改文件)')
+    p.add_argument('--server', choices=SERVERS, help='默认为上次使用的服务器')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser('repair', help='关闭游戏，只修复与服务器资源不一致的文件')
+    p.add_argument('--server', choices=SERVERS, help='默认为上次使用的服务器')
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument('--reset-login', action='store_true', help='同时清除登录数据 (需要重新登录)')
+    mode.add_argument('--full', action='store_true', help='旧版修复：清除登录数据并覆盖整个资源包')
+    p.set_defaults(func=cmd_repair)
+
+    p = sub.add_parser('list-accounts', help='列出已保存的账号预设')
+    p.add_argument('--server', choices=SERVERS)
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_list_accounts)
+
+    p = sub.add_parser('rotate', help='依次为多个账号切换服务器、启动游戏并运行 MAA')
+    p.add_argument('--accounts', nargs='+', metavar='NAME', help='默认为全部已记录服务器归属的预设')
+    p.add_argument('--maa-timeout', type=float, default=MAA_TIMEOUT / 60, metavar='MINUTES',
+                   help='单个账号等待 MAA 完成的最长时间 (分钟)')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_rotate)
+
+    p = sub.add_parser('diagnostics', help='显示本机各项操作的耗时统计 (p50 / p95)')
+    p.add_argument('--json', action='store_true')
+    p.set_defaults(func=cmd_diagnostics)
+    return parser
+
+
+def main(argv):
+    args = build_parser().parse_args(argv)
+    env.setup_logging()
+    metrics.configure(env.METRICS_PATH)
+    service = LauncherService()
+    logs.apply_settings(service.config['log_levels'], service.config['log_compress'])
+    try:
+        args.func(service, args)
+    except (LauncherError, PipelineCancelled) as e:
+        print(f'错误: {e}', file=sys.stderr)
+        return 1
+    except Exception as e:
+        logger.exception(f'{args.command} 执行失败')
+        print(f'错误: {e}', file=sys.stderr)
+        return 1
+    finally:
+        service.close()
+    return 0
@@ -0,0 +1,184 @@
+"""启动器配置存储
+
+配置常驻内存，修改后经过一段防抖时间才合并写入磁盘 (内容未变化时不写)；
+写入先落到临时文件再 os.replace，不会出现写到一半的 config.json。
+每次成功读取配置后会另存一份 config.json.bak，主文件损坏时自动回退到这份最近一次完好的副本。
+旧版本 (无 schema 字段) 的配置在加载时迁移到当前格式。
+"""
+import os
+import json
+import shutil
+import logging
+import threading
+
+logger = logging.getLogger('ArknightsLauncher')
+
+SCHEMA_VERSION = 2
+DEBOUNCE_SECONDS = 1.0
+BACKUP_SUFFIX = '.bak'
+SERVERS = ('official', 'bilibili')
+
+# 配置项: 名称 -> (类型, 默认值)；bg_path 为 None 表示使用内置背景图
+FIELDS = {
+    'game_path': (str, ''),
+    'maa_path': (str, ''),
+    'bg_path': (str, None),
+    'last_server': (str, 'official'),
+    # 按操作的日志级别，例如 {"default": "INFO", "download": "DEBUG"}；log_compress 为 True 时旧日志压缩为 .gz
+    'log_levels': (dict, {}),
+    'log_compress': (bool, False),
+}
+
+
+def _migrate_v1(data):
+    """v1: 无 schema 字段，last_server 可能缺失或为任意字符串"""
+    if data.get('last_server') not in SERVERS:
+        data.pop('last_server', None)
+    return data
+
+
+# 从版本 n 迁移到 n + 1 的函数
+MIGRATIONS = {1: _migrate_v1}
+
+
+def migrate(data):
+    """将任意旧版本的配置逐级迁移到 SCHEMA_VERSION"""
+    version = data.get('schema', 1)
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+        logger.info(f'配置已迁移到第 {version} 版')
+    data['schema'] = SCHEMA_VERSION
+    return data
+
+
+def normalize(data):
+    """按 FIELDS 校验类型，类型不符的项恢复默认值；未知字段原样保留"""
+    result = dict(data)
+    for name, (kind, default) in FIELDS.items():
+        value = result.get(name, default)
+        if value is not None and not isinstance(value, kind):
+            logger.warning(f'配置项 {name} 类型无效 ({value!r})，已恢复默认值')
+            value = default
+        result[name] = value
+    return result
+
+
+def defaults():
+    return {'schema': SCHEMA_VERSION, **{name: default for name, (_, default) in FIELDS.items()}}
+
+
+class ConfigStore:
+    """带防抖写回的配置存储，提供 get / [] / update 等 dict 风格的访问"""
+
+    def __init__(self, path, debounce=DEBOUNCE_SECONDS):
+        self.path = path
+        self.backup_path = path + BACKUP_SUFFIX
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._timer = None
+        self._data = self._load()
+        # 磁盘上的原始内容：迁移 / 从备份恢复后与内存不一致，下次 flush 时会写回
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._written = f.read()
+        except OSError:
+            self._written = None
+
+    # ---------------- 读取 ----------------
+    def _read(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError('配置文件顶层不是对象')
+        if data.get('schema', 1) > SCHEMA_VERSION:
+            logger.warning(f'配置文件来自更新版本的启动器 (schema {data["schema"]})，按当前版本读取')
+            data['schema'] = SCHEMA_VERSION
+        return normalize(migrate(data))
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                data = self._read(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning(f'配置文件损坏 ({e})，尝试使用备份')
+            else:
+                try:
+                    shutil.copyfile(self.path, self.backup_path)
+                except OSError:
+                    logger.warning('备份配置文件失败', exc_info=True)
+                return data
+        if os.path.exists(self.backup_path):
+            try:
+                data = self._read(self.backup_path)
+                logger.warning(f'已从备份恢复配置: {self.backup_path}')
+                return data
+            except (OSError, ValueError) as e:
+                logger.warning(f'配置备份同样无法读取 ({e})，使用默认配置')
+        return defaults()
+
+    # ---------------- dict 风格访问 ----------------
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        """修改配置项，有实际变化时安排一次延迟写入"""
+        with self._lock:
+            changed = False
+            for key, value in dict(values).items():
+                if self._data.get(key) != value:
+                    self._data[key] = value
+                    changed = True
+            if changed:
+                self._data = normalize(self._data)
+                self._schedule()
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._data)
+
+    # ---------------- 写入 ----------------
+    def _serialize(self):
+        return json.dumps(self._data, ensure_ascii=False, indent=4, sort_keys=True)
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """立即写入尚未保存的修改，内容与上次写入相同时跳过"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            content = self._serialize()
+            if content == self._written:
+                return False
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError:
+                logger.exception('保存配置失败')
+                return False
+            self._written = content
+            return True
+
+    def close(self):
+        self.flush()
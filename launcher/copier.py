@@ -0,0 +1,167 @@
+"""多线程文件复制引擎
+
+先一次性枚举出全部待复制文件，按大小从大到小投递到有界线程池，
+大文件尽早开始、小文件填满剩余的工作线程；进度与单文件错误汇总在 CopyResult 中。
+"""
+import os
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from launcher.metrics import bind_context
+
+DEFAULT_EXCLUDE = frozenset({'meta.json'})
+# 磁盘 I/O 为主，线程数无需随 CPU 核数无限增长
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+
+def iter_files(root, exclude=DEFAULT_EXCLUDE, _prefix=''):
+    """递归遍历目录，产出 (相对路径, os.DirEntry)，相对路径统一使用 '/' 分隔"""
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name in exclude:
+                continue
+            rel = _prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(entry.path, exclude, rel + '/')
+            elif entry.is_file():
+                yield rel, entry
+
+
+class CopyError(OSError):
+    """复制过程中有文件失败"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        dst, exc = errors[0]
+        super().__init__(f'{len(errors)} 个文件复制失败，首个错误: {dst}: {exc}')
+
+
+class CopyTask:
+    """单个文件的复制任务
+
+    check: 可选的 (dst) -> bool，返回 True 表示目标已是最新，跳过复制
+    mtime_ns: 可选，复制后将目标的修改时间设为该值
+    writer: 可选的 (dst) -> None，自定义写入方式 (例如从压缩快照解出)，此时 src 可为 None
+    """
+    __slots__ = ('src', 'dst', 'size', 'check', 'mtime_ns', 'writer')
+
+    def __init__(self, src, dst, size, check=None, mtime_ns=None, writer=None):
+        self.src = src
+        self.dst = dst
+        self.size = size
+        self.check = check
+        self.mtime_ns = mtime_ns
+        self.writer = writer
+
+
+class CopyResult:
+    """复制统计：写入 / 跳过的文件数与字节数、耗时、吞吐量及每个失败文件的错误"""
+
+    def __init__(self, files_total=0, bytes_total=0):
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.files_written = 0
+        self.bytes_written = 0
+        self.files_skipped = 0
+        self.bytes_skipped = 0
+        self.errors = []  # [(dst, exception)]
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def files_done(self):
+        return self.files_written + self.files_skipped + len(self.errors)
+
+    @property
+    def bytes_done(self):
+        return self.bytes_written + self.bytes_skipped
+
+    @property
+    def throughput(self):
+        """实际写入速度 (字节/秒)"""
+        elapsed = self.elapsed or (time.monotonic() - self.started)
+        return self.bytes_written / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def raise_for_errors(self):
+        if self.errors:
+            raise CopyError(self.errors)
+
+    def __repr__(self):
+        return (f'CopyResult(written={self.files_written} files/{self.bytes_written} B, '
+                f'skipped={self.files_skipped} files/{self.bytes_skipped} B, '
+                f'errors={len(self.errors)}, elapsed={self.elapsed:.3f}s)')
+
+
+def plan_tree(src_dir, dst_dir, exclude=DEFAULT_EXCLUDE):
+    """枚举源目录，生成复制到目标目录的任务列表 (exclude 按文件/目录名匹配，与旧版 copy_tree_overwrite 一致)"""
+    tasks = []
+    for rel, entry in iter_files(src_dir, exclude):
+        tasks.append(CopyTask(entry.path, os.path.join(dst_dir, *rel.split('/')), entry.stat().st_size))
+    return tasks
+
+
+def _copy_one(task):
+    if task.check is not None and task.check(task.dst):
+        return False
+    if task.writer is not None:
+        task.writer(task.dst)
+    else:
+        shutil.copy2(task.src, task.dst)
+    if task.mtime_ns is not None:
+        os.utime(task.dst, ns=(task.mtime_ns, task.mtime_ns))
+    return True
+
+
+def run_tasks(tasks, max_workers=DEFAULT_WORKERS, on_progress=None):
+    """并行执行复制任务
+
+    on_progress(result) 在每个文件完成后于工作线程中调用，result 为累计中的 CopyResult。
+    """
+    result = CopyResult(len(tasks), sum(t.size for t in tasks))
+    # 目录在主线程中预先建好，避免工作线程之间竞争创建
+    for parent in {os.path.dirname(t.dst) for t in tasks}:
+        os.makedirs(parent, exist_ok=True)
+
+    lock = threading.Lock()
+
+    def worker(task):
+        try:
+            written = _copy_one(task)
+        except OSError as e:
+            with lock:
+                result.errors.append((task.dst, e))
+                if on_progress:
+                    on_progress(result)
+            return
+        with lock:
+            if written:
+                result.files_written += 1
+                result.bytes_written += task.size
+            else:
+                result.files_skipped += 1
+                result.bytes_skipped += task.size
+            if on_progress:
+                on_progress(result)
+
+    ordered = sorted(tasks, key=lambda t: t.size, reverse=True)
+    if max_workers <= 1 or len(ordered) <= 1:
+        for task in ordered:
+            worker(task)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='copier') as pool:
+            # 消费迭代器以等待全部完成；异常已在 worker 内部收集
+            list(pool.map(bind_context(worker), ordered))
+    result.elapsed = time.monotonic() - result.started
+    return result
+
+
+def copy_tree(src_dir, dst_dir, exclude=DEFAULT_EXCLUDE, max_workers=DEFAULT_WORKERS, on_progress=None):
+    """将 src_dir 整体覆盖复制到 dst_dir"""
+    os.makedirs(dst_dir, exist_ok=True)
+    return run_tasks(plan_tree(src_dir, dst_dir, exclude), max_workers, on_progress)
@@ -0,0 +1,109 @@
+"""基于资源清单指纹的服务器检测
+
+将游戏目录与两个服务器的资源清单逐一比对 (先 stat，仅在不一致时计算哈希)，
+得出官服 / B 服 / 混合 (附差异文件列表) 的结论。结论按相关文件的 stat 信息缓存，
+游戏目录未变化时再次检测只需一轮 stat。
+"""
+import os
+import json
+import hashlib
+import logging
+
+from launcher.payload import EXCLUSIVE_FILES, LOGIN_DATA_DIRS, is_up_to_date
+
+logger = logging.getLogger('ArknightsLauncher')
+
+MIXED = 'mixed'
+CACHE_VERSION = 1
+
+
+class ServerVerdict:
+    """检测结论
+
+    server: 'official' / 'bilibili' / 'mixed'
+    differing: {server: [与该服务器资源不一致的相对路径]}
+    """
+
+    def __init__(self, server, differing):
+        self.server = server
+        self.differing = differing
+
+    def __repr__(self):
+        counts = {k: len(v) for k, v in self.differing.items()}
+        return f'ServerVerdict({self.server!r}, differing={counts})'
+
+    def to_dict(self):
+        return {'server': self.server, 'differing': self.differing}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['server'], data['differing'])
+
+
+def fingerprint_files(manifest):
+    """参与检测的清单条目：排除登录后会被游戏改写的登录数据目录"""
+    return {rel: meta for rel, meta in manifest['files'].items()
+            if rel.split('/', 1)[0] not in LOGIN_DATA_DIRS}
+
+
+def _stat_key(game_path, payloads):
+    """所有相关路径的 stat 信息摘要，作为缓存键；清单变化 (例如启动器更新) 同样会使缓存失效"""
+    h = hashlib.sha256(os.path.normcase(os.path.abspath(game_path)).encode('utf-8'))
+    paths = set()
+    for server in sorted(payloads):
+        manifest = payloads[server].manifest
+        h.update(server.encode('utf-8'))
+        h.update(json.dumps(manifest['files'], sort_keys=True).encode('utf-8'))
+        paths.update(fingerprint_files(manifest))
+    for names in EXCLUSIVE_FILES.values():
+        paths.update(names)
+    for rel in sorted(paths):
+        h.update(rel.encode('utf-8'))
+        try:
+            st = os.stat(os.path.join(game_path, *rel.split('/')))
+            h.update(f'|{st.st_size}|{st.st_mtime_ns}\n'.encode('ascii'))
+        except OSError:
+            h.update(b'|-\n')
+    return h.hexdigest()
+
+
+def compare(game_path, payloads):
+    """不使用缓存，直接比对游戏目录与各服务器资源"""
+    differing = {}
+    for server, payload in payloads.items():
+        diff = [rel for rel, meta in fingerprint_files(payload.manifest).items()
+                if not is_up_to_date(os.path.join(game_path, *rel.split('/')), meta)]
+        # 存在另一服务器的专属文件也视为不一致 (例如官服目录中残留的 PCGameSDK.dll)
+        diff.extend(rel for rel in EXCLUSIVE_FILES[server]
+                    if os.path.lexists(os.path.join(game_path, rel)))
+        differing[server] = sorted(diff)
+    matched = [server for server, diff in differing.items() if not diff]
+    return ServerVerdict(matched[0] if len(matched) == 1 else MIXED, differing)
+
+
+def detect_server(game_path, payloads, cache_path=None):
+    """检测游戏目录当前对应的服务器，payloads 为 {server: Payload}"""
+    key = _stat_key(game_path, payloads) if cache_path else None
+    if key:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION and cached.get('key') == key:
+                return ServerVerdict.from_dict(cached['verdict'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    verdict = compare(game_path, payloads)
+    logger.info(f'服务器检测: {verdict}')
+    if key:
+        # is_up_to_date 可能同步了部分文件的时间戳，需重新计算缓存键
+        key = _stat_key(game_path, payloads)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'key': key, 'verdict': verdict.to_dict()}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            logger.warning('写入服务器检测缓存失败', exc_info=True)
+    return verdict
@@ -0,0 +1,288 @@
+"""可断点续传的更新下载器
+
+下载先写入 <目标>.part，进度记录在 <目标>.part.json (URL、服务器校验标识 ETag / Last-Modified、
+各分段已完成的字节数)。连接中断或启动器退出后再次下载同一文件时，校验标识一致则用
+HTTP Range 请求从断点继续。服务器支持 Range 且文件较大时分段并行下载。
+
+单段下载在写入的同时计算 SHA-256；分段下载在全部完成后顺序读取一遍计算。
+提供期望的摘要时，不一致的文件会被删除并抛出 DigestMismatch，不会替换目标文件。
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+import urllib.error
+import urllib.request
+
+from launcher.metrics import bind_context, span
+
+logger = logging.getLogger('ArknightsLauncher')
+
+CHUNK_SIZE = 1024 * 1024
+USER_AGENT = 'ArknightsLauncher'
+DEFAULT_SEGMENTS = 4
+# 小于该大小的文件不分段
+SEGMENT_MIN_SIZE = 8 * 1024 * 1024
+STATE_VERSION = 1
+
+
+class DownloadError(Exception):
+    """下载失败"""
+
+
+class DownloadCancelled(DownloadError):
+    """下载被取消，已下载的部分保留以便续传"""
+
+
+class DigestMismatch(DownloadError):
+    """下载内容的 SHA-256 与发布的摘要不一致"""
+
+    def __init__(self, expected, actual):
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f'SHA-256 校验失败: 期望 {expected}，实际 {actual}')
+
+
+class RemoteInfo:
+    """HEAD 请求得到的远端文件信息"""
+    __slots__ = ('size', 'accepts_ranges', 'validator')
+
+    def __init__(self, size=None, accepts_ranges=False, validator=None):
+        self.size = size
+        self.accepts_ranges = accepts_ranges
+        self.validator = validator
+
+
+def parse_digest(digest):
+    """将 'sha256:<hex>' 或裸十六进制摘要规范为小写十六进制，无法识别时返回 None"""
+    if not digest:
+        return None
+    algo, _, value = digest.rpartition(':')
+    if algo and algo.lower() != 'sha256':
+        return None
+    value = value.strip().lower()
+    return value if len(value) == 64 and all(c in '0123456789abcdef' for c in value) else None
+
+
+def _request(url, method='GET', headers=None, timeout=60):
+    req = urllib.request.Request(url, method=method, headers={'User-Agent': USER_AGENT, **(headers or {})})
+    return urllib.request.urlopen(req, timeout=timeout)
+
+
+def _validator(headers):
+    return headers.get('ETag') or headers.get('Last-Modified')
+
+
+def probe(url, timeout=60):
+    """HEAD 请求获取大小、是否支持 Range 与校验标识，失败时返回空信息 (按不支持续传处理)"""
+    try:
+        with _request(url, 'HEAD', timeout=timeout) as resp:
+            length = resp.headers.get('Content-Length')
+            return RemoteInfo(
+                size=int(length) if length else None,
+                accepts_ranges=resp.headers.get('Accept-Ranges', '').lower() == 'bytes',
+                validator=_validator(resp.headers),
+            )
+    except (OSError, ValueError) as e:
+        logger.info(f'HEAD 请求失败，按不支持续传处理: {e}')
+        return RemoteInfo()
+
+
+def _split(size, count):
+    """将 [0, size) 均分为 count 段，返回 [[start, end, done], ...] (end 不含)"""
+    step = -(-size // count)
+    return [[start, min(start + step, size), 0] for start in range(0, size, step)]
+
+
+class _Download:
+    """一次下载的运行时状态"""
+
+    def __init__(self, url, part_path, state_path, on_progress, cancel_event, timeout):
+        self.url = url
+        self.part_path = part_path
+        self.state_path = state_path
+        self.on_progress = on_progress
+        self.cancel_event = cancel_event
+        self.timeout = timeout
+        self.state = None
+        self.hasher = None  # 仅单段下载时在写入的同时计算
+        self._abort = threading.Event()  # 某一分段失败时通知其它分段停止
+        self._lock = threading.Lock()
+
+    @property
+    def total(self):
+        return self.state['size'] or 0
+
+    @property
+    def done(self):
+        return sum(seg[2] for seg in self.state['segments'])
+
+    def load_state(self, info):
+        """读取续传状态，URL / 校验标识 / 大小与远端一致且 .part 存在时返回 True"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (state.get('version') != STATE_VERSION or state.get('url') != self.url
+                or not info.validator or state.get('validator') != info.validator
+                or state.get('size') != info.size or not os.path.exists(self.part_path)):
+            return False
+        self.state = state
+        return True
+
+    def new_state(self, info, segments):
+        if info.accepts_ranges and info.size and info.size >= SEGMENT_MIN_SIZE and segments > 1:
+            ranges = _split(info.size, segments)
+        else:
+            ranges = [[0, info.size, 0]]
+        self.state = {'version': STATE_VERSION, 'url': self.url, 'validator': info.validator,
+                      'size': info.size, 'segments': ranges}
+        with open(self.part_path, 'wb') as f:
+            if len(ranges) > 1:
+                f.truncate(info.size)
+        self.save_state()
+
+    def save_state(self):
+        with self._lock:
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.state_path)
+
+    def resume_hasher(self):
+        """单段续传时先对已下载的部分计算哈希"""
+        self.hasher = hashlib.sha256()
+        remaining = self.state['segments'][0][2]
+        with open(self.part_path, 'rb') as f:
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self.hasher.update(chunk)
+                remaining -= len(chunk)
+
+    def fetch_segment(self, seg):
+        start, end, done = seg
+        if end is not None and start + done >= end:
+            return
+        headers = {}
+        if start + done > 0:
+            headers['Range'] = f'bytes={start + done}-' + (str(end - 1) if end is not None else '')
+            if self.state['validator']:
+                headers['If-Range'] = self.state['validator']
+        elif end is not None and len(self.state['segments']) > 1:
+            headers['Range'] = f'bytes=0-{end - 1}'
+
+        with _request(self.url, headers=headers, timeout=self.timeout) as resp:
+            if 'Range' in headers and resp.status != 206:
+                if len(self.state['segments']) > 1:
+                    raise DownloadError(f'服务器未按 Range 返回数据 (HTTP {resp.status})')
+                # 远端文件已变化或不支持续传：从头下载
+                logger.info('服务器不支持续传，从头下载')
+                seg[2] = done = 0
+                self.hasher = hashlib.sha256() if self.hasher is not None else None
+                with open(self.part_path, 'wb'):
+                    pass
+            with open(self.part_path, 'r+b') as f:
+                f.seek(start + done)
+                while True:
+                    if self._abort.is_set() or (self.cancel_event is not None and self.cancel_event.is_set()):
+                        raise DownloadCancelled('下载已取消')
+                    limit = CHUNK_SIZE if end is None else min(CHUNK_SIZE, end - start - seg[2])
+                    if limit <= 0:
+                        break
+                    chunk = resp.read(limit)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    f.flush()
+                    if self.hasher is not None:
+                        self.hasher.update(chunk)
+                    seg[2] += len(chunk)
+                    self.save_state()
+                    if self.on_progress:
+                        self.on_progress(self.done, self.total)
+        if end is not None and start + seg[2] < end:
+            raise DownloadError(f'连接提前关闭: 已下载 {start + seg[2]} / {end} 字节')
+
+    def run_segments(self):
+        segments = self.state['segments']
+        if len(segments) == 1:
+            self.fetch_segment(segments[0])
+            return
+        errors = []
+
+        def worker(seg):
+            try:
+                self.fetch_segment(seg)
+            except BaseException as e:
+                errors.append(e)
+                self._abort.set()
+
+        threads = [threading.Thread(target=bind_context(worker), args=(seg,), daemon=True) for seg in segments]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            # 优先报告真正的错误，而非因其它分段失败而触发的取消
+            raise next((e for e in errors if not isinstance(e, DownloadCancelled)), errors[0])
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def download(url, dest, sha256=None, on_progress=None, cancel_event=None, segments=DEFAULT_SEGMENTS, timeout=60):
+    """下载 url 到 dest，返回文件的 SHA-256
+
+    sha256: 可选的期望摘要 (支持 'sha256:<hex>' 格式)，不一致时抛出 DigestMismatch
+    on_progress: 可选的 (done_bytes, total_bytes) 回调，total 未知时为 0
+    cancel_event: 可选的 threading.Event，置位后抛出 DownloadCancelled 并保留已下载部分
+    """
+    with span('download', url=url) as s:
+        digest = _download(url, dest, sha256, on_progress, cancel_event, segments, timeout)
+        s.set(bytes=os.path.getsize(dest))
+    return digest
+
+
+def _download(url, dest, sha256, on_progress, cancel_event, segments, timeout):
+    expected = parse_digest(sha256)
+    if sha256 and expected is None:
+        logger.warning(f'无法识别的摘要格式，跳过校验: {sha256}')
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+    part_path = dest + '.part'
+    state_path = part_path + '.json'
+
+    info = probe(url, timeout)
+    job = _Download(url, part_path, state_path, on_progress, cancel_event, timeout)
+    if job.load_state(info):
+        logger.info(f'继续下载 {url}: 已完成 {job.done} / {job.total} 字节')
+    else:
+        job.new_state(info, segments)
+    if len(job.state['segments']) == 1:
+        job.resume_hasher()
+
+    try:
+        job.run_segments()
+    except urllib.error.HTTPError as e:
+        raise DownloadError(f'HTTP {e.code}: {e.reason}') from e
+
+    digest = job.hasher.hexdigest() if job.hasher is not None else file_digest(part_path)
+    if expected and digest != expected:
+        for path in (part_path, state_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise DigestMismatch(expected, digest)
+    os.replace(part_path, dest)
+    os.remove(state_path)
+    logger.info(f'下载完成: {dest} (SHA-256 {digest})')
+    return digest
@@ -0,0 +1,41 @@
+"""运行环境：资源 / 数据路径与日志配置
+
+图形界面与命令行共用这些路径；本模块不依赖 Qt。
+"""
+import os
+import sys
+
+from launcher import logs
+
+# PyInstaller 兼容性获取路径基准
+FROZEN = getattr(sys, 'frozen', False)
+if FROZEN:
+    BASE_DIR = sys._MEIPASS
+else:
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCES_DIR = os.path.join(BASE_DIR, 'resources')
+# 打包版本的资源归档与 exe 位于同一目录，开发环境下也可放在 resources 中
+EXE_DIR = os.path.dirname(os.path.abspath(sys.executable)) if FROZEN else BASE_DIR
+
+DATA_DIR = os.path.join(os.getenv('APPDATA'), 'ArknightsLauncher_v2')
+CONFIG_PATH = os.path.join(DATA_DIR, 'config.json')
+ACCOUNTS_DIR = os.path.join(DATA_DIR, 'AccountBackups')
+MANIFEST_DIR = os.path.join(DATA_DIR, 'manifests')
+ACCOUNT_OBJECTS_DIR = os.path.join(DATA_DIR, 'AccountObjects')
+SERVER_CACHE_PATH = os.path.join(DATA_DIR, 'server_cache.json')
+ACCOUNT_INDEX_PATH = os.path.join(DATA_DIR, 'accounts_index.json')
+BACKGROUND_CACHE_DIR = os.path.join(DATA_DIR, 'BackgroundCache')
+PAYLOAD_CACHE_DIR = os.path.join(DATA_DIR, 'PayloadCache')
+RELEASE_CACHE_PATH = os.path.join(DATA_DIR, 'release_cache.json')
+SESSION_HISTORY_PATH = os.path.join(DATA_DIR, 'sessions.jsonl')
+ROTATION_HISTORY_PATH = os.path.join(DATA_DIR, 'rotations.jsonl')
+LOG_DIR = DATA_DIR
+LOG_PATH = os.path.join(LOG_DIR, 'launcher.log')
+METRICS_PATH = os.path.join(LOG_DIR, 'metrics.jsonl')
+
+VERSION = 'v1.2.0'
+
+
+def setup_logging(console=True):
+    """日志经队列由后台线程写入 launcher.log (按大小滚动) 与 (可选) 标准错误输出"""
+    return logs.setup(LOG_PATH, console=console)
@@ -0,0 +1,155 @@
+"""异步日志：队列 + 后台写入线程 + 按大小滚动
+
+记录日志的线程 (包括 GUI 线程) 只把日志记录放入队列，格式化之外的文件 / 控制台写入
+都由 QueueListener 的后台线程完成。launcher.log 超过 MAX_BYTES 后滚动为 launcher.log.1 ~ .N，
+最多保留 BACKUP_COUNT 个旧文件；开启压缩时旧文件以 gzip 保存 (launcher.log.1.gz)，
+压缩同样在后台线程中进行。
+
+日志级别可按操作设置：操作即 metrics.span 的名称 (download、payload_overlay 等)，
+例如 {'default': 'INFO', 'download': 'DEBUG'} 只为下载输出调试日志。
+复制、校验与分段下载的工作线程经 metrics.bind_context 继承提交任务时的操作，同样按操作过滤与标记。
+"""
+import os
+import re
+import gzip
+import queue
+import atexit
+import shutil
+import logging
+import logging.handlers
+
+from launcher.metrics import current_operation
+
+logger = logging.getLogger('ArknightsLauncher')
+
+MAX_BYTES = 2 * 1024 * 1024
+BACKUP_COUNT = 5
+LOG_FORMAT = '%(asctime)s [%(levelname)s]%(operation_tag)s %(message)s'
+DEFAULT_LEVEL = logging.INFO
+
+_state = {'listener': None, 'queue_handler': None, 'file_handler': None, 'filter': None}
+
+
+def parse_levels(levels):
+    """{'default' / 操作名: 级别名或数字} -> {名称: 数字级别}，无法识别的级别忽略"""
+    result = {}
+    for name, level in (levels or {}).items():
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        if isinstance(level, int):
+            result[name] = level
+        else:
+            logger.warning(f'无法识别的日志级别: {name}={level!r}')
+    return result
+
+
+class OperationFilter(logging.Filter):
+    """按当前操作决定是否记录，并为日志加上操作名标记 (在记录日志的线程中执行)"""
+
+    def __init__(self, levels=None):
+        super().__init__()
+        self.set_levels(levels)
+
+    def set_levels(self, levels):
+        levels = dict(levels or {})
+        self.default = levels.pop('default', DEFAULT_LEVEL)
+        self.levels = levels
+
+    @property
+    def min_level(self):
+        return min([self.default, *self.levels.values()])
+
+    def filter(self, record):
+        operation = current_operation()
+        record.operation_tag = f' [{operation}]' if operation else ''
+        return record.levelno >= self.levels.get(operation, self.default)
+
+
+class ArchivingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """滚动时可选地将旧日志压缩为 .gz"""
+
+    def __init__(self, filename, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, compress=False):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.compress = compress
+
+    def rotation_filename(self, default_name):
+        return default_name + '.gz' if self.compress else default_name
+
+    def rotate(self, source, dest):
+        if not self.compress:
+            return super().rotate(source, dest)
+        tmp_path = dest + '.tmp'
+        with open(source, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, dest)
+        os.remove(source)
+
+    def prune(self):
+        """删除序号超出保留数量的旧日志 (例如调小了 BACKUP_COUNT) 与压缩中断留下的临时文件"""
+        directory, base = os.path.split(self.baseFilename)
+        pattern = re.compile(re.escape(base) + r'\.(\d+)(\.gz)?(\.tmp)?$')
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            match = pattern.match(name)
+            if match and (int(match.group(1)) > self.backupCount or match.group(3)):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+def setup(log_path, console=True, levels=None, compress=False,
+          max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+    """为根日志器安装队列处理器并启动后台写入线程；重复调用直接返回"""
+    if _state['listener'] is not None:
+        return logging.getLogger('ArknightsLauncher')
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = ArchivingRotatingFileHandler(log_path, max_bytes, backup_count, compress)
+    file_handler.prune()
+    handlers = [file_handler]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    op_filter = OperationFilter(parse_levels(levels))
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(op_filter)
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(op_filter.min_level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    _state.update(listener=listener, queue_handler=queue_handler, file_handler=file_handler, filter=op_filter)
+    atexit.register(shutdown)
+    return logging.getLogger('ArknightsLauncher')
+
+
+def apply_settings(levels=None, compress=None):
+    """读取配置后更新按操作的日志级别与旧日志压缩设置"""
+    op_filter, file_handler = _state['filter'], _state['file_handler']
+    if op_filter is None:
+        return
+    op_filter.set_levels(parse_levels(levels))
+    logging.getLogger().setLevel(op_filter.min_level)
+    if compress is not None and compress != file_handler.compress:
+        # 处理器只在后台线程中使用，这里改标志即可，下次滚动时生效
+        file_handler.compress = compress
+
+
+def shutdown():
+    """写完队列中剩余的日志并停止后台线程"""
+    listener = _state['listener']
+    if listener is None:
+        return
+    listener.stop()
+    logging.getLogger().removeHandler(_state['queue_handler'])
+    for handler in listener.handlers:
+        handler.close()
+    _state.update(listener=None, queue_handler=None, file_handler=None, filter=None)
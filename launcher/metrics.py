@@ -0,0 +1,220 @@
+"""操作计时与本地指标记录
+
+主要操作 (结束进程、清理、资源覆盖、账号覆盖、借权启动、检查更新、下载、背景图加载等) 以
+span(name, **attrs) 包裹，记录耗时、是否出错以及调用方附加的字节数 / 文件数等字段。
+记录先缓存在内存中，经过一段防抖时间后由后台定时器追加到 launcher.log 旁的 metrics.jsonl
+(与 ConfigStore 相同的写回方式)，调用线程 (包括 GUI 线程) 不做文件 I/O；进程退出时写入剩余记录。
+
+summarize() 按操作名统计次数与耗时的 p50 / p95，供诊断信息界面与命令行 diagnostics 使用。
+"""
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import logging
+import platform
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger('ArknightsLauncher')
+
+FLUSH_DELAY = 2.0
+# 文件超过 limit 的两倍时截断为最近 limit 条
+RECORD_LIMIT = 5000
+
+
+# 当前所在的 span 名称 (由外到内)；工作线程经 bind_context 继承提交任务时的值
+_operations = contextvars.ContextVar('operations', default=())
+
+
+def current_operation():
+    """当前最内层 span 的操作名，不在任何 span 中时返回 None (日志按操作设置级别时使用)"""
+    operations = _operations.get()
+    return operations[-1] if operations else None
+
+
+def bind_context(func):
+    """包装在线程池 / 工作线程中执行的 func，使其处于包装时的上下文 (当前操作) 中
+
+    每次调用使用上下文的副本，同一个包装函数可以同时在多个线程中执行。
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+
+class Span:
+    """一次操作的计时区间，set() 附加字段 (字节数、文件数、结果状态等)"""
+    __slots__ = ('name', 'attrs', 'start', 'duration')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def set_copy_result(self, result):
+        """附加 CopyResult 的统计"""
+        self.attrs.update(files_written=result.files_written, bytes_written=result.bytes_written,
+                          files_skipped=result.files_skipped, bytes_skipped=result.bytes_skipped)
+
+    def to_dict(self):
+        return {'name': self.name, 'start': self.start, 'duration': self.duration, **self.attrs}
+
+
+class MetricsRecorder:
+    """指标记录器；path 为 None 时只在内存中保留最近的记录"""
+
+    def __init__(self, path=None, limit=RECORD_LIMIT, flush_delay=FLUSH_DELAY):
+        self.path = path
+        self.limit = limit
+        self.flush_delay = flush_delay
+        self._pending = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+
+    @contextmanager
+    def span(self, name, **attrs):
+        s = Span(name, attrs)
+        token = _operations.set(_operations.get() + (name,))
+        started = time.perf_counter()
+        try:
+            yield s
+        except BaseException as e:
+            s.attrs['error'] = type(e).__name__
+            raise
+        finally:
+            s.duration = time.perf_counter() - started
+            _operations.reset(token)
+            self.record(s)
+
+    def record(self, span):
+        with self._lock:
+            self._pending.append(span.to_dict())
+            del self._pending[:-self.limit]
+            if self.path is not None and self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """将缓存的记录追加到文件"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.path is None or not self._pending:
+                return
+            records, self._pending = self._pending, []
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False) + '\n' for r in records)
+                self._trim()
+            except OSError:
+                logger.warning('写入指标记录失败', exc_info=True)
+
+    def _trim(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        if len(lines) <= self.limit * 2:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[-self.limit:])
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """文件中的记录加上尚未写入的记录"""
+        records = []
+        if self.path is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            pass
+            except OSError:
+                pass
+        with self._lock:
+            records.extend(self._pending)
+        return records[-self.limit:]
+
+
+def percentile(sorted_values, p):
+    """最近秩法百分位数"""
+    if not sorted_values:
+        return None
+    index = math.ceil(p / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, index))]
+
+
+def summarize(records):
+    """按操作名汇总：次数、出错次数、耗时 p50 / p95 / 最大值 (秒) 与写入字节数的 p50"""
+    groups = {}
+    for r in records:
+        if r.get('duration') is not None:
+            groups.setdefault(r['name'], []).append(r)
+    summary = {}
+    for name in sorted(groups):
+        items = groups[name]
+        durations = sorted(r['duration'] for r in items)
+        written = sorted(r['bytes_written'] for r in items if 'bytes_written' in r)
+        summary[name] = {
+            'count': len(items),
+            'errors': sum(1 for r in items if 'error' in r),
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+            'max': durations[-1],
+            'bytes_written_p50': percentile(written, 50),
+            'last': max(r['start'] for r in items),
+        }
+    return summary
+
+
+def _format_bytes(n):
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f'{n:.0f} {unit}'
+        n /= 1024
+    return f'{n:.1f} GB'
+
+
+def format_summary(summary):
+    """将 summarize() 的结果排成等宽文本表格，返回行列表"""
+    lines = [f'{"操作":<16}{"次数":>6}{"出错":>6}{"p50":>9}{"p95":>9}{"最大":>7}{"写入 p50":>12}']
+    for name, row in summary.items():
+        written = _format_bytes(row['bytes_written_p50']) if row['bytes_written_p50'] is not None else '-'
+        lines.append(f'{name:<18}{row["count"]:>8}{row["errors"]:>8}{row["p50"]:>8.2f}s{row["p95"]:>8.2f}s'
+                     f'{row["max"]:>8.2f}s{written:>14}')
+    return lines
+
+
+def machine_info():
+    return {'host': platform.node(), 'platform': platform.platform(), 'python': sys.version.split()[0],
+            'cpus': os.cpu_count()}
+
+
+# 进程内共用的记录器，由 configure() 指定写入位置
+RECORDER = MetricsRecorder()
+
+
+def configure(path):
+    RECORDER.path = path
+    atexit.register(RECORDER.flush)
+    return RECORDER
+
+
+def span(name, **attrs):
+    return RECORDER.span(name, **attrs)
@@ -0,0 +1,212 @@
+"""游戏 / 辅助进程生命周期监视
+
+启动器拉起游戏或 MAA 后交给 ProcessMonitor 监视：后台线程每隔一段时间只检查被监视的 PID
+是否仍在运行 (不遍历进程表)，依次回调 started / ready / exited，并将
+启动到出现窗口的耗时与会话时长追加到本地历史记录。
+"""
+import os
+import json
+import time
+import logging
+import threading
+
+import psutil
+
+from launcher.process import visible_windows
+
+logger = logging.getLogger('ArknightsLauncher')
+
+POLL_INTERVAL = 1.0
+# 借权启动时可能拿不到 PID，此时在该时限内按名称查找进程
+LOOKUP_TIMEOUT = 60.0
+LOOKUP_INTERVAL = 3.0
+HISTORY_LIMIT = 200
+
+
+def _alive(proc):
+    """进程仍在运行 (POSIX 下尚未被回收的僵尸进程视为已退出)"""
+    try:
+        return proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        return False
+
+
+class Session:
+    """一次进程会话：launched 为发起启动的时间，started / ready / ended 依次为
+    找到进程、出现可见窗口、进程退出的时间 (均为 time.time())；meta 为调用方附加信息"""
+
+    def __init__(self, name, launched, meta=None):
+        self.name = name
+        self.launched = launched
+        self.meta = meta or {}
+        self.pid = None
+        self.started = None
+        self.ready = None
+        self.ended = None
+
+    @property
+    def ready_latency(self):
+        """从发起启动到出现窗口的耗时"""
+        return self.ready - self.launched if self.ready is not None else None
+
+    @property
+    def duration(self):
+        """进程运行时长"""
+        if self.started is None:
+            return None
+        return (self.ended or time.time()) - self.started
+
+    def to_dict(self):
+        return {
+            'name': self.name, 'pid': self.pid, 'meta': self.meta,
+            'launched': self.launched, 'started': self.started, 'ready': self.ready, 'ended': self.ended,
+            'ready_latency': self.ready_latency, 'duration': self.duration,
+        }
+
+    def __repr__(self):
+        return f'Session({self.name!r}, pid={self.pid})'
+
+
+class SessionHistory:
+    """按行追加的 JSON 会话记录，超过 limit 的两倍时截断为最近 limit 条"""
+
+    def __init__(self, path, limit=HISTORY_LIMIT):
+        self.path = path
+        self.limit = limit
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        records = []
+        for line in lines[-self.limit:]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass
+        return records
+
+    def append(self, session):
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(session.to_dict(), ensure_ascii=False) + '\n')
+                self._trim()
+            except OSError:
+                logger.warning('写入会话记录失败', exc_info=True)
+
+    def _trim(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        if len(lines) <= self.limit * 2:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[-self.limit:])
+        os.replace(tmp_path, self.path)
+
+
+class ProcessMonitor:
+    """监视启动器拉起的进程
+
+    回调均在监视线程中调用，参数为 Session：
+    on_started 找到进程；on_ready 进程出现可见窗口 (非 Windows 平台与 started 同时)；
+    on_exited 进程退出或在 LOOKUP_TIMEOUT 内始终未找到进程 (此时 session.pid 为 None)。
+    """
+
+    def __init__(self, processes, history=None, on_started=None, on_ready=None, on_exited=None):
+        self.processes = processes
+        self.history = history
+        self.on_started = on_started
+        self.on_ready = on_ready
+        self.on_exited = on_exited
+        self._watches = []  # [(Session, psutil.Process 或 None, 上次按名称查找的时间)]
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def watch(self, name, launched=None, meta=None):
+        """开始监视名为 name 的进程，launched 为发起启动的时间 (默认为当前时间)"""
+        session = Session(name, launched or time.time(), meta)
+        with self._lock:
+            self._watches.append([session, None, 0.0])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ProcessMonitor', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return session
+
+    def sessions(self):
+        """当前正在监视的会话"""
+        with self._lock:
+            return [w[0] for w in self._watches]
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=POLL_INTERVAL * 2)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+            with self._lock:
+                watches = list(self._watches)
+            finished = [w for w in watches if self._poll(w)]
+            if finished:
+                with self._lock:
+                    self._watches = [w for w in self._watches if w not in finished]
+
+    def _poll(self, watch):
+        """检查一个会话，返回 True 表示会话已结束"""
+        session, proc, last_lookup = watch
+        now = time.time()
+        if proc is None:
+            procs = self.processes.tracked(session.name)
+            if not procs and now - last_lookup >= LOOKUP_INTERVAL:
+                watch[2] = now
+                procs = self.processes.find(session.name)
+            if not procs:
+                if now - session.launched > LOOKUP_TIMEOUT:
+                    logger.warning(f'{LOOKUP_TIMEOUT:.0f}s 内未找到进程 {session.name}，停止监视')
+                    self._finish(session, now)
+                    return True
+                return False
+            proc = watch[1] = procs[0]
+            session.pid = proc.pid
+            session.started = now
+            logger.info(f'进程已启动: {session.name} (PID {proc.pid})')
+            self._emit(self.on_started, session)
+
+        if not _alive(proc):
+            self._finish(session, now)
+            return True
+
+        if session.ready is None and (os.name != 'nt' or visible_windows({proc.pid})):
+            session.ready = now
+            logger.info(f'进程就绪: {session.name}，启动耗时 {session.ready_latency:.1f}s')
+            self._emit(self.on_ready, session)
+        return False
+
+    def _finish(self, session, now):
+        session.ended = now
+        if session.started is not None:
+            logger.info(f'进程已退出: {session.name}，运行 {session.duration:.0f}s')
+            if self.history is not None:
+                self.history.append(session)
+        self._emit(self.on_exited, session)
+
+    @staticmethod
+    def _emit(callback, session):
+        if callback is None:
+            return
+        try:
+            callback(session)
+        except Exception:
+            logger.exception('进程监视回调失败')
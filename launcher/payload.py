@@ -0,0 +1,214 @@
+"""资源包清单 (Manifest) 与增量覆盖
+
+清单记录资源包内每个文件的相对路径、大小、修改时间与 SHA-256，
+覆盖时仅写入与目标不一致的文件，已一致的文件只需一次 stat 即可跳过。
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+
+from launcher.copier import DEFAULT_EXCLUDE, DEFAULT_WORKERS, CopyTask, iter_files, run_tasks
+
+logger = logging.getLogger('ArknightsLauncher')
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = '.manifest.json'
+HASH_BLOCK_SIZE = 1024 * 1024
+# NTFS 的修改时间精度为 100ns
+MTIME_RESOLUTION_NS = 100
+# FAT32 / exFAT 的修改时间精度为 2s / 10ms，无法保存 content_mtime_ns 编码在秒以下的哈希，
+# 修改时间是 COARSE_MTIME_NS 的整数倍时退回到容差比较
+COARSE_MTIME_NS = 10_000_000
+MTIME_TOLERANCE_NS = 2_000_000_000
+
+# 各服务器对应的原始资源目录 (位于 resources/ 下)
+PAYLOAD_DIRS = {'official': 'Payload', 'bilibili': 'Payload_B'}
+# 登录状态目录：资源包中带有初始版本，但登录后会被游戏改写
+LOGIN_DATA_DIRS = ('U8Data', 'sdkdata')
+# 切换到某服务器时需要清理的另一服务器专属文件
+EXCLUSIVE_FILES = {
+    'official': ('PCGameSDK.dll', 'BLPlatform64'),
+    'bilibili': ('hgsdk.dll',),
+}
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_BLOCK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_manifest(src_dir, previous=None, exclude=DEFAULT_EXCLUDE):
+    """扫描资源目录生成清单；若提供旧清单，大小与修改时间未变的文件直接复用其哈希"""
+    old_files = previous.get('files', {}) if previous else {}
+    files = {}
+    for rel, entry in iter_files(src_dir, exclude):
+        st = entry.stat()
+        old = old_files.get(rel)
+        if old and old['size'] == st.st_size and old['mtime_ns'] == st.st_mtime_ns:
+            digest = old['sha256']
+        else:
+            digest = file_sha256(entry.path)
+        files[rel] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+    return {'version': MANIFEST_VERSION, 'files': files}
+
+
+def save_manifest(manifest, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def shipped_manifest_path(src_dir):
+    """打包时随资源一同生成的清单路径: resources/Payload -> resources/Payload.manifest.json"""
+    return os.path.normpath(src_dir) + MANIFEST_SUFFIX
+
+
+def load_manifest(src_dir, cache_dir):
+    """获取资源包清单
+
+    优先使用打包时生成的清单；开发环境下则在首次运行时生成并缓存到 cache_dir，
+    之后每次仅对源文件做 stat 校验，变化的文件才重新计算哈希。
+    """
+    manifest = read_manifest(shipped_manifest_path(src_dir))
+    if manifest is not None:
+        return manifest
+
+    cache_path = os.path.join(cache_dir, os.path.basename(os.path.normpath(src_dir)) + MANIFEST_SUFFIX)
+    cached = read_manifest(cache_path)
+    manifest = build_manifest(src_dir, previous=cached)
+    if manifest != cached:
+        save_manifest(manifest, cache_path)
+        logger.info(f'已生成资源清单: {cache_path} ({len(manifest["files"])} 个文件)')
+    return manifest
+
+
+def content_mtime_ns(meta):
+    """写入目标文件时使用的修改时间：秒取清单记录的时间，秒以下部分由内容哈希决定
+
+    同一批检出 / 解压的资源文件修改时间几乎相同，仅凭 "大小 + 时间" 无法区分两个服务器
+    大小恰好相同的不同文件；把哈希编码进时间戳后，stat 命中即意味着内容一致。
+    """
+    fraction = int(meta['sha256'][:8], 16) % (1_000_000_000 // MTIME_RESOLUTION_NS)
+    return meta['mtime_ns'] // 1_000_000_000 * 1_000_000_000 + fraction * MTIME_RESOLUTION_NS
+
+
+def stamp_matches(st, meta):
+    """目标文件的修改时间是否等于 content_mtime_ns(meta) (按 MTIME_RESOLUTION_NS 截断后比较)
+
+    粗粒度文件系统上只能比较到 MTIME_TOLERANCE_NS 以内，此时无法区分修改时间相近、
+    大小相同的不同文件，与按内容编码时间戳之前的行为相同。
+    """
+    expected = content_mtime_ns(meta)
+    if st.st_mtime_ns // MTIME_RESOLUTION_NS == expected // MTIME_RESOLUTION_NS:
+        return True
+    return st.st_mtime_ns % COARSE_MTIME_NS == 0 and abs(st.st_mtime_ns - expected) <= MTIME_TOLERANCE_NS
+
+
+def is_up_to_date(dst_path, meta):
+    """目标文件是否已与清单条目一致：先比对 stat，仅在大小相同而时间不同时才计算哈希"""
+    try:
+        st = os.stat(dst_path)
+    except OSError:
+        return False
+    if st.st_size != meta['size']:
+        return False
+    if stamp_matches(st, meta):
+        return True
+    if file_sha256(dst_path) != meta['sha256']:
+        return False
+    # 内容一致，仅时间戳不同：同步时间戳，下次 stat 即可命中
+    try:
+        os.utime(dst_path, ns=(st.st_atime_ns, content_mtime_ns(meta)))
+    except OSError:
+        pass
+    return True
+
+
+class Payload:
+    """某个服务器的资源包：清单 + 每个条目的源文件位置"""
+
+    def __init__(self, server, manifest, source_path, location):
+        self.server = server
+        self.manifest = manifest
+        self.source_path = source_path  # (rel, meta) -> 源文件路径
+        self.location = location
+
+    def __repr__(self):
+        return f'Payload({self.server!r}, {self.location!r})'
+
+    @classmethod
+    def from_directory(cls, server, src_dir, cache_dir):
+        manifest = load_manifest(src_dir, cache_dir)
+        return cls(server, manifest, lambda rel, meta: os.path.join(src_dir, *rel.split('/')), src_dir)
+
+    @classmethod
+    def from_extracted(cls, server, root):
+        """解压后的资源归档 (launcher.archive)：清单为 <root>/<server>.json，文件位于 <root>/<server>/ 下"""
+        manifest = read_manifest(os.path.join(root, f'{server}.json'))
+        if manifest is None:
+            return None
+        src_dir = os.path.join(root, server)
+        return cls(server, manifest, lambda rel, meta: os.path.join(src_dir, *rel.split('/')), src_dir)
+
+
+def open_payload(server, resources_dir, cache_dir, archive=None):
+    """定位服务器资源包；都不存在时返回 None
+
+    依次尝试：资源归档 (launcher.archive，首次使用时解压到缓存)、原始资源目录。
+    """
+    if archive is not None:
+        payload = Payload.from_extracted(server, archive.extract())
+        if payload is not None:
+            return payload
+    src_dir = os.path.join(resources_dir, PAYLOAD_DIRS[server])
+    if os.path.isdir(src_dir):
+        return Payload.from_directory(server, src_dir, cache_dir)
+    return None
+
+
+def overlay_payload(payload, dst_dir, max_workers=DEFAULT_WORKERS, on_progress=None):
+    """按清单将资源包增量覆盖到目标目录，仅写入有差异的文件，返回 CopyResult
+
+    比对 (is_up_to_date) 与复制均在线程池中并行进行。
+    """
+    tasks = []
+    for rel, meta in payload.manifest['files'].items():
+        tasks.append(CopyTask(
+            payload.source_path(rel, meta),
+            os.path.join(dst_dir, *rel.split('/')),
+            meta['size'],
+            # 默认参数绑定当前条目
+            check=lambda dst, meta=meta: is_up_to_date(dst, meta),
+            # 以清单中的时间戳为准 (打包后解压出的源文件时间戳并不可靠)
+            mtime_ns=content_mtime_ns(meta),
+        ))
+    return run_tasks(tasks, max_workers, on_progress)
+
+
+if __name__ == '__main__':
+    # 构建时生成随包清单: python -m launcher.payload resources/Payload resources/Payload_B
+    for src in sys.argv[1:]:
+        m = build_manifest(src)
+        save_manifest(m, shipped_manifest_path(src))
+        print(f'{shipped_manifest_path(src)}: {len(m["files"])} files')
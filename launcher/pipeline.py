@@ -0,0 +1,212 @@
+"""启动 / 修复 / 保存账号的分阶段执行流程
+
+每个操作拆分为若干 Stage，由 run_pipeline 依次执行；阶段之间检查取消标记，
+阶段内部通过 PipelineContext.report 汇报进度。本模块不依赖 Qt，
+GUI 在 QThread 中调用，命令行可直接同步调用。
+"""
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+
+from launcher.copier import copy_tree
+from launcher.metrics import span
+from launcher.payload import EXCLUSIVE_FILES, LOGIN_DATA_DIRS, overlay_payload
+from launcher.process import GAME_EXE, kill_process
+from launcher.progress import ProgressReporter
+from launcher.transaction import switch_payload
+from launcher.verify import repair_damaged, verify_payload
+
+logger = logging.getLogger('ArknightsLauncher')
+
+
+class PipelineCancelled(Exception):
+    """流程在阶段之间被取消"""
+
+
+class Stage:
+    """流程中的一个阶段：func(ctx) 的返回值记录在 ctx.results[key]"""
+    __slots__ = ('key', 'title', 'func')
+
+    def __init__(self, key, title, func):
+        self.key = key
+        self.title = title
+        self.func = func
+
+
+class PipelineContext:
+    """流程运行时状态：取消标记、进度回调与各阶段结果
+
+    on_progress(snapshot) 经 ProgressReporter 限频后调用，snapshot 为 ProgressSnapshot。
+    """
+
+    def __init__(self, on_progress=None):
+        self.progress = ProgressReporter(on_progress) if on_progress else None
+        self.results = {}
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def report(self, done, total, items_done=0, items_total=0):
+        if self.progress:
+            self.progress.update(done, total, items_done, items_total)
+
+    def copy_progress(self):
+        """供复制引擎使用的进度回调"""
+        return lambda result: self.report(result.bytes_done, result.bytes_total, result.files_done, result.files_total)
+
+
+def run_pipeline(stages, ctx, on_stage=None):
+    """依次执行各阶段，on_stage(index, count, stage) 在每个阶段开始前调用"""
+    for i, stage in enumerate(stages):
+        if ctx.cancelled:
+            raise PipelineCancelled(stage.title)
+        if on_stage:
+            on_stage(i, len(stages), stage)
+        if ctx.progress:
+            ctx.progress.reset()
+        ctx.results[stage.key] = stage.func(ctx)
+        if ctx.progress:
+            ctx.progress.finish()
+    return ctx.results
+
+
+# ================= 阶段实现 =================
+
+def switch_server_files(game_path, server, payload, ctx=None):
+    """事务式切换服务器文件：清理另一服务器的专属文件并覆盖资源包，失败时整体回滚"""
+    with span('payload_overlay', server=server, mode='switch') as s:
+        result = switch_payload(game_path, payload, EXCLUSIVE_FILES[server],
+                                on_progress=ctx.copy_progress() if ctx else None)
+        s.set_copy_result(result)
+    logger.info(f'资源切换完成: 写入 {result.files_written} 个文件 ({result.bytes_written} 字节)，'
+                f'跳过 {result.files_skipped} 个文件 ({result.bytes_skipped} 字节)，'
+                f'耗时 {result.elapsed:.2f}s')
+    return result
+
+
+def switch_detected(game_path, server, ctx):
+    """按检测阶段的结论 (results['detect'] 中的检测结论与资源包) 切换服务器文件，已是目标服务器时跳过"""
+    verdict, payload = ctx.results['detect']
+    if verdict.server == server:
+        logger.info(f'当前已是目标服务器 ({server})，跳过文件覆盖')
+        return None
+    return switch_server_files(game_path, server, payload, ctx)
+
+
+def clear_login_data(game_path):
+    """删除已保存的登录状态 (U8Data / sdkdata)"""
+    with span('cleanup') as s:
+        removed = 0
+        for name in LOGIN_DATA_DIRS:
+            path = os.path.join(game_path, name)
+            if os.path.exists(path):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        s.set(dirs_removed=removed)
+
+
+def apply_payload(payload, game_path, ctx=None):
+    """按资源清单增量覆盖，跳过与游戏目录中内容一致的文件"""
+    with span('payload_overlay', server=payload.server, mode='overlay') as s:
+        result = overlay_payload(payload, game_path, on_progress=ctx.copy_progress() if ctx else None)
+        s.set_copy_result(result)
+    logger.info(f'资源覆盖完成: 写入 {result.files_written} 个文件 ({result.bytes_written} 字节)，'
+                f'跳过 {result.files_skipped} 个文件 ({result.bytes_skipped} 字节)，'
+                f'耗时 {result.elapsed:.2f}s')
+    result.raise_for_errors()
+    return result
+
+
+def apply_account(acc_path, game_path, snapshots, ctx=None):
+    """将账号预设覆盖到游戏目录：快照格式的预设从快照存储解出，旧版目录格式直接复制"""
+    on_progress = ctx.copy_progress() if ctx else None
+    with span('account_overlay') as s:
+        if snapshots is not None and snapshots.has_snapshot(acc_path):
+            result = snapshots.restore(acc_path, game_path, on_progress=on_progress)
+        else:
+            s.set(legacy=True)
+            result = copy_tree(acc_path, game_path, on_progress=on_progress)
+        s.set_copy_result(result)
+    result.raise_for_errors()
+    return result
+
+
+def save_login_data(game_path, acc_save_path, server, snapshots):
+    """将游戏目录当前的登录数据保存为账号预设快照"""
+    if os.path.exists(acc_save_path):
+        shutil.rmtree(acc_save_path, ignore_errors=True)
+    os.makedirs(acc_save_path, exist_ok=True)
+
+    # 保存服务器归属元数据
+    with open(os.path.join(acc_save_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'server': server, 'created': time.time()}, f, ensure_ascii=False)
+
+    snapshots.capture(game_path, LOGIN_DATA_DIRS, acc_save_path)
+
+
+# ================= 流程组装 =================
+
+def start_game_stages(game_path, server, payload, account_path=None, need_overlay=True, snapshots=None, processes=None,
+                      detect=None):
+    """启动游戏前的准备流程 (不含最终的 ShellExecute)
+
+    detect 不为 None 时服务器检测作为第一个阶段执行 (首次使用时包括资源解压与哈希)：detect() 返回
+    (检测结论, 资源包)，保存在 results['detect']，是否覆盖由检测结论决定，忽略 payload 与 need_overlay。
+    """
+    stages = []
+    if detect is not None:
+        stages.append(Stage('detect', '检测当前服务器', lambda ctx: detect()))
+    stages.append(Stage('kill', '关闭游戏进程', lambda ctx: kill_process(GAME_EXE, processes)))
+    if detect is not None:
+        stages.append(Stage('payload', '切换服务器文件', lambda ctx: switch_detected(game_path, server, ctx)))
+    elif need_overlay:
+        stages.append(Stage('payload', '切换服务器文件', lambda ctx: switch_server_files(game_path, server, payload, ctx)))
+    if account_path:
+        stages.append(Stage('account', '应用账号预设', lambda ctx: apply_account(account_path, game_path, snapshots, ctx)))
+    return stages
+
+
+def repair_stages(game_path, payload, processes=None):
+    """修复清理流程：关闭游戏、删除登录数据、以当前服务器资源覆盖"""
+    stages = [
+        Stage('kill', '关闭游戏进程', lambda ctx: kill_process(GAME_EXE, processes)),
+        Stage('clear', '清除登录数据', lambda ctx: clear_login_data(game_path)),
+    ]
+    if payload is not None:
+        stages.append(Stage('payload', '覆盖资源文件', lambda ctx: apply_payload(payload, game_path, ctx)))
+    return stages
+
+
+def verify_repair_stages(game_path, payload, processes=None, preserve_login=True, repair=True):
+    """校验修复流程：只修复与资源清单不一致的文件
+
+    preserve_login 为 False 时先清除登录数据，再连同资源包中的初始登录数据一起校验恢复；
+    repair 为 False 时只校验不修改 (结果在 results['verify'])。
+    """
+    stages = []
+    if repair:
+        stages.append(Stage('kill', '关闭游戏进程', lambda ctx: kill_process(GAME_EXE, processes)))
+        if not preserve_login:
+            stages.append(Stage('clear', '清除登录数据', lambda ctx: clear_login_data(game_path)))
+    stages.append(Stage('verify', '校验游戏文件', lambda ctx: verify_payload(
+        game_path, payload, include_login_data=not preserve_login, on_progress=ctx.report)))
+    if repair:
+        stages.append(Stage('repair', '修复损坏文件', lambda ctx: repair_damaged(
+            game_path, payload, ctx.results['verify'], on_progress=ctx.copy_progress())))
+    return stages
+
+
+def save_account_stages(game_path, accounts, name, server):
+    """将当前登录状态保存为账号预设，并更新账号索引"""
+    return [
+        Stage('save', '保存登录数据', lambda ctx: save_login_data(game_path, accounts.path_of(name), server, accounts.snapshots)),
+        Stage('index', '更新账号索引', lambda ctx: accounts.record_saved(name)),
+    ]
@@ -0,0 +1,218 @@
+"""游戏 / 辅助进程控制
+
+ProcessController 记住启动器自己拉起的进程 (游戏、MAA)，结束进程时优先检查这些 PID，
+仅在没有存活的已知进程时才遍历一次系统进程表按名称查找。结束时先请求正常退出，
+超时后强制结束，所有目标在同一个总时限内并发等待。
+"""
+import os
+import time
+import ctypes
+import logging
+import subprocess
+import threading
+from ctypes import wintypes
+
+import psutil
+
+from launcher.metrics import span
+
+logger = logging.getLogger('ArknightsLauncher')
+
+GAME_EXE = 'Arknights.exe'
+
+# 请求正常退出后的等待时间，以及从开始结束到放弃等待的总时限 (秒)
+GRACE_PERIOD = 1.5
+KILL_DEADLINE = 5.0
+
+SEE_MASK_NOCLOSEPROCESS = 0x00000040
+WM_CLOSE = 0x0010
+
+
+class SHELLEXECUTEINFOW(ctypes.Structure):
+    _fields_ = [
+        ('cbSize', wintypes.DWORD),
+        ('fMask', ctypes.c_ulong),
+        ('hwnd', wintypes.HWND),
+        ('lpVerb', wintypes.LPCWSTR),
+        ('lpFile', wintypes.LPCWSTR),
+        ('lpParameters', wintypes.LPCWSTR),
+        ('lpDirectory', wintypes.LPCWSTR),
+        ('nShow', ctypes.c_int),
+        ('hInstApp', wintypes.HINSTANCE),
+        ('lpIDList', ctypes.c_void_p),
+        ('lpClass', wintypes.LPCWSTR),
+        ('hkeyClass', wintypes.HKEY),
+        ('dwHotKey', wintypes.DWORD),
+        ('hIconOrMonitor', wintypes.HANDLE),
+        ('hProcess', wintypes.HANDLE),
+    ]
+
+
+def _shell_execute_runas(exe_path, cwd):
+    """以管理员权限启动程序，返回新进程的 PID；用户拒绝 UAC 等失败情况返回 None"""
+    info = SHELLEXECUTEINFOW()
+    info.cbSize = ctypes.sizeof(info)
+    info.fMask = SEE_MASK_NOCLOSEPROCESS
+    info.lpVerb = 'runas'
+    info.lpFile = exe_path
+    info.lpDirectory = cwd
+    info.nShow = 1
+    if not ctypes.windll.shell32.ShellExecuteExW(ctypes.byref(info)):
+        logger.warning(f'ShellExecuteExW 失败: {exe_path} (错误码 {ctypes.GetLastError()})')
+        return None
+    if not info.hProcess:
+        return None
+    try:
+        return ctypes.windll.kernel32.GetProcessId(info.hProcess) or None
+    finally:
+        ctypes.windll.kernel32.CloseHandle(info.hProcess)
+
+
+def visible_windows(pids):
+    """枚举属于 pids 的可见顶层窗口，返回 {pid: [hwnd, ...]}"""
+    user32 = ctypes.windll.user32
+    windows = {}
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def on_window(hwnd, _lparam):
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        if pid.value in pids and user32.IsWindowVisible(hwnd):
+            windows.setdefault(pid.value, []).append(hwnd)
+        return True
+
+    user32.EnumWindows(on_window, 0)
+    return windows
+
+
+def _post_close(pids):
+    """向目标进程的可见顶层窗口发送 WM_CLOSE，返回收到消息的 PID 集合"""
+    windows = visible_windows(pids)
+    for hwnds in windows.values():
+        for hwnd in hwnds:
+            ctypes.windll.user32.PostMessageW(hwnd, WM_CLOSE, 0, 0)
+    return set(windows)
+
+
+class ProcessController:
+    """跟踪启动器拉起的进程，并按名称快速结束进程
+
+    已跟踪的进程以 psutil.Process 保存，psutil 会比对创建时间，PID 被系统复用后不会误杀。
+    """
+
+    def __init__(self):
+        self._tracked = {}  # pid -> (小写进程名, psutil.Process)
+        self._lock = threading.Lock()
+
+    def track(self, pid, name):
+        """记录一个进程，之后按 name 结束进程时优先检查它"""
+        try:
+            proc = psutil.Process(pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+        with self._lock:
+            self._tracked[pid] = (name.lower(), proc)
+
+    def launch_game(self, game_path):
+        """借权启动游戏并记录其 PID；找不到 Arknights.exe、启动失败或用户拒绝 UAC 时返回 False"""
+        exe_path = os.path.join(game_path, GAME_EXE)
+        if not os.path.exists(exe_path):
+            return False
+        with span('shell_execute') as s:
+            pid = _shell_execute_runas(exe_path, game_path)
+            s.set(pid=pid)
+        if not pid:
+            return False
+        self.track(pid, GAME_EXE)
+        return True
+
+    def spawn(self, exe_path, cwd=None):
+        """普通权限启动辅助程序 (例如 MAA) 并记录其 PID"""
+        proc = subprocess.Popen(exe_path, cwd=cwd or os.path.dirname(exe_path))
+        self.track(proc.pid, os.path.basename(exe_path))
+        return proc
+
+    def tracked(self, name):
+        """已跟踪且仍在运行的同名进程 (不扫描进程表)"""
+        name = name.lower()
+        with self._lock:
+            return [proc for tracked_name, proc in self._tracked.values()
+                    if tracked_name == name and proc.is_running()]
+
+    def find(self, *names):
+        """查找名称匹配的存活进程：先查已跟踪的 PID，没有命中的名称再统一扫描一次进程表"""
+        wanted = {n.lower() for n in names}
+        found = {}
+        with self._lock:
+            for pid, (name, proc) in list(self._tracked.items()):
+                if name not in wanted:
+                    continue
+                if proc.is_running():
+                    found[pid] = proc
+                else:
+                    del self._tracked[pid]
+            missing = wanted - {self._tracked[pid][0] for pid in found}
+        if missing:
+            for proc in psutil.process_iter(['name']):
+                name = (proc.info['name'] or '').lower()
+                if name in missing and proc.pid not in found:
+                    found[proc.pid] = proc
+                    with self._lock:
+                        self._tracked[proc.pid] = (name, proc)
+        return list(found.values())
+
+    def terminate(self, *names, grace=GRACE_PERIOD, deadline=KILL_DEADLINE):
+        """结束所有名称匹配的进程，返回已退出的 PID 列表
+
+        先请求正常退出 (Windows 下向窗口发送 WM_CLOSE，其它平台发送 SIGTERM)，
+        grace 秒内未退出的强制结束；全部进程并发等待，总耗时不超过 deadline 秒。
+        """
+        with span('kill', names=list(names)) as s:
+            gone = self._terminate(self.find(*names), names, grace, deadline)
+            s.set(exited=len(gone))
+        return gone
+
+    def _terminate(self, procs, names, grace, deadline):
+        if not procs:
+            return []
+        start = time.perf_counter()
+
+        # 没有窗口可关闭的进程直接 terminate (Windows 下等同于强制结束)
+        closed = _post_close({p.pid for p in procs}) if os.name == 'nt' else set()
+        for proc in procs:
+            if proc.pid in closed:
+                continue
+            try:
+                proc.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+        gone, alive = psutil.wait_procs(procs, timeout=grace)
+        if alive:
+            for proc in alive:
+                try:
+                    proc.kill()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            remaining = max(0.0, deadline - (time.perf_counter() - start))
+            more, alive = psutil.wait_procs(alive, timeout=remaining)
+            gone.extend(more)
+
+        with self._lock:
+            for proc in gone:
+                self._tracked.pop(proc.pid, None)
+        if alive:
+            logger.warning(f'以下进程在 {deadline:.1f}s 内未退出: {[p.pid for p in alive]}')
+        logger.info(f'结束进程 {", ".join(names)}: {len(gone)} 个已退出，'
+                    f'耗时 {time.perf_counter() - start:.2f}s')
+        return [p.pid for p in gone]
+
+
+def kill_process(process_name, processes=None):
+    """结束名称匹配的进程 (等待其真正退出，避免文件锁冲突)"""
+    return (processes or ProcessController()).terminate(process_name)
+
+
+def launch_game(game_path, processes=None):
+    """借权启动游戏，找不到 Arknights.exe、启动失败或用户拒绝 UAC 时返回 False"""
+    return (processes or ProcessController()).launch_game(game_path)
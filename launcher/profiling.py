@@ -0,0 +1,143 @@
+"""启动阶段计时
+
+StartupProfiler 以 time.perf_counter 记录启动过程中各阶段 (模块导入、配置加载、界面构建等)
+相对进程内计时起点的开始时间与耗时，阶段可以嵌套。计时本身始终开启、开销可忽略；
+只有在命令行传入 --profile-startup 时才在启动结束后写出 JSON 报告，
+同时传入 --profile-startup-cprofile 时还会用 cProfile 覆盖整个启动过程并附上耗时最多的函数。
+
+本模块只依赖标准库，需在 main.py 最开始导入，才能统计后续模块的导入时间。
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import platform
+from contextlib import contextmanager
+
+logger = logging.getLogger('ArknightsLauncher')
+
+PROFILE_ARG = '--profile-startup'
+CPROFILE_ARG = '--profile-startup-cprofile'
+REPORT_VERSION = 1
+# 报告中保留的 cProfile 函数条数
+CPROFILE_TOP = 40
+
+
+class StartupProfiler:
+    """启动阶段计时器
+
+    report_path 为 None 时不写报告 (仅在日志中记录总耗时)。
+    """
+
+    def __init__(self, report_path=None, use_cprofile=False):
+        self.origin = time.perf_counter()
+        self.report_path = report_path
+        self.phases = []  # [{'name', 'start', 'duration', 'depth'}]
+        self.marks = []  # [{'name', 'at'}]
+        self.finished = False
+        self._depth = 0
+        self._cprofile = None
+        if use_cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @classmethod
+    def from_argv(cls, argv):
+        """解析并移除命令行中的性能分析参数: --profile-startup[=报告路径] 与 --profile-startup-cprofile
+
+        未指定报告路径时使用 default_report_path()。
+        """
+        report_path = None
+        use_cprofile = False
+        for arg in list(argv[1:]):
+            if arg == PROFILE_ARG or arg.startswith(PROFILE_ARG + '='):
+                report_path = arg.partition('=')[2] or default_report_path()
+                argv.remove(arg)
+            elif arg == CPROFILE_ARG:
+                use_cprofile = True
+                argv.remove(arg)
+        if use_cprofile and report_path is None:
+            report_path = default_report_path()
+        return cls(report_path, use_cprofile)
+
+    @property
+    def enabled(self):
+        return self.report_path is not None
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name):
+        """记录一个阶段的开始时间与耗时"""
+        if self.finished:
+            yield
+            return
+        start = time.perf_counter()
+        depth = self._depth
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth = depth
+            self.phases.append({'name': name, 'start': start - self.origin,
+                                'duration': time.perf_counter() - start, 'depth': depth})
+
+    def mark(self, name):
+        """记录一个时间点 (例如窗口首次显示)"""
+        if not self.finished:
+            self.marks.append({'name': name, 'at': self.elapsed()})
+
+    def report(self):
+        phases = sorted(self.phases, key=lambda p: p['start'])
+        data = {
+            'version': REPORT_VERSION,
+            'total': self.elapsed(),
+            'phases': phases,
+            'marks': self.marks,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'frozen': bool(getattr(sys, 'frozen', False)),
+        }
+        if self._cprofile is not None:
+            data['cprofile'] = self._cprofile_stats()
+        return data
+
+    def _cprofile_stats(self):
+        import pstats
+        stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+            rows.append({'function': f'{os.path.basename(filename)}:{line}({func})',
+                         'calls': nc, 'tottime': tt, 'cumtime': ct})
+        rows.sort(key=lambda r: r['cumtime'], reverse=True)
+        return rows[:CPROFILE_TOP]
+
+    def finish(self):
+        """启动结束：停止 cProfile，按需写出报告；只有第一次调用生效"""
+        if self.finished:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        total = self.elapsed()
+        logger.info(f'启动耗时 {total:.3f}s')
+        if self.enabled:
+            report = self.report()
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.report_path)), exist_ok=True)
+                with open(self.report_path, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, ensure_ascii=False, indent=2)
+                if self._cprofile is not None:
+                    self._cprofile.dump_stats(os.path.splitext(self.report_path)[0] + '.prof')
+                logger.info(f'启动性能报告已写入 {self.report_path}')
+            except OSError:
+                logger.warning('写入启动性能报告失败', exc_info=True)
+        self.finished = True
+
+
+def default_report_path():
+    appdata = os.getenv('APPDATA') or os.path.expanduser('~')
+    return os.path.join(appdata, 'ArknightsLauncher_v2', 'startup_profile.json')
@@ -0,0 +1,117 @@
+"""限频的进度汇报
+
+下载与复制在工作线程中以很高的频率产生进度 (每个数据块 / 每个文件)，直接逐次转发给界面
+会在 Qt 事件队列中堆积大量跨线程信号。ProgressReporter 在工作线程内汇总字节数与条目数，
+只在距上次发布超过 interval 且整数百分比发生变化时才调用 publish，完成时总会发布最后一次；
+发布内容附带平滑后的吞吐量与预计剩余时间。
+"""
+import time
+import threading
+
+DEFAULT_INTERVAL = 0.1
+# 吞吐量指数平滑系数，越大越贴近最近一段时间的速度
+RATE_SMOOTHING = 0.3
+
+
+class ProgressSnapshot:
+    """某一时刻的进度：字节 / 条目的完成数与总数 (总数未知时为 0)、吞吐量 (字节/秒)、预计剩余秒数"""
+    __slots__ = ('done', 'total', 'items_done', 'items_total', 'rate', 'eta', 'elapsed')
+
+    def __init__(self, done, total, items_done, items_total, rate, eta, elapsed):
+        self.done = done
+        self.total = total
+        self.items_done = items_done
+        self.items_total = items_total
+        self.rate = rate
+        self.eta = eta
+        self.elapsed = elapsed
+
+    @property
+    def percent(self):
+        return int(self.done * 100 / self.total) if self.total > 0 else 100
+
+    @property
+    def finished(self):
+        return self.total > 0 and self.done >= self.total
+
+    def __repr__(self):
+        return f'ProgressSnapshot({self.done}/{self.total} B, {self.rate:.0f} B/s, eta={self.eta})'
+
+
+def format_rate(rate):
+    """吞吐量的可读形式，例如 '12.3 MB/s'"""
+    for unit in ('B/s', 'KB/s', 'MB/s'):
+        if rate < 1024:
+            return f'{rate:.1f} {unit}'
+        rate /= 1024
+    return f'{rate:.1f} GB/s'
+
+
+def format_eta(eta):
+    """剩余时间的可读形式，例如 '1:05'；未知时返回空字符串"""
+    if eta is None:
+        return ''
+    minutes, seconds = divmod(int(eta + 0.5), 60)
+    return f'{minutes}:{seconds:02d}'
+
+
+class ProgressReporter:
+    """在工作线程中汇总进度并按限频发布，可被多个线程同时调用
+
+    publish(snapshot) 在调用 update 的线程中、持有内部锁时执行，应尽快返回 (例如只发出一个信号)；下载与复制共用同一种回调形式，
+    也可直接作为 (done, total) 回调传给 launcher.download.download。
+    """
+
+    def __init__(self, publish, interval=DEFAULT_INTERVAL):
+        self.publish = publish
+        self.interval = interval
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """开始新一轮计数 (例如流程进入下一个阶段)"""
+        with self._lock:
+            self._started = time.monotonic()
+            self._last_time = self._started
+            self._last_done = 0
+            self._last_percent = -1
+            self._rate = 0.0
+            self._latest = None
+
+    def __call__(self, done, total):
+        self.update(done, total)
+
+    def update(self, done, total, items_done=0, items_total=0):
+        """记录累计进度，满足限频条件时发布"""
+        with self._lock:
+            now = time.monotonic()
+            span = now - self._last_time
+            snapshot = self._snapshot(now, done, total, items_done, items_total)
+            finished = snapshot.finished
+            if not finished and (span < self.interval or (total > 0 and snapshot.percent == self._last_percent)):
+                return
+            if span > 0:
+                instant = max(0, done - self._last_done) / span
+                self._rate = instant if self._last_percent < 0 else (
+                    RATE_SMOOTHING * instant + (1 - RATE_SMOOTHING) * self._rate)
+                snapshot.rate = self._rate
+                snapshot.eta = (total - done) / self._rate if total > 0 and self._rate > 0 else None
+            self._last_time = now
+            self._last_done = done
+            self._last_percent = snapshot.percent
+            self._latest = None
+            # 在锁内发布，保证多个工作线程发布的进度不会乱序
+            self.publish(snapshot)
+
+    def finish(self):
+        """发布最近一次被限频跳过的进度 (如有)"""
+        with self._lock:
+            snapshot, self._latest = self._latest, None
+            if snapshot is not None:
+                self.publish(snapshot)
+
+    def _snapshot(self, now, done, total, items_done, items_total):
+        snapshot = ProgressSnapshot(done, total, items_done, items_total, self._rate,
+                                    None, now - self._started)
+        self._latest = snapshot
+        return snapshot
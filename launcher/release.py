@@ -0,0 +1,164 @@
+"""带缓存的 GitHub Releases 版本检查
+
+最新版本信息与 ETag 缓存在本地文件中：启动时先直接使用缓存，距上次检查超过最小间隔才访问 API，
+并以 If-None-Match 条件请求 (304 不计入 GitHub 未认证请求的频率限制)。请求失败时按指数退避推迟
+下次检查；遇到 403 / 429 频率限制时，以响应头给出的重置时间为准。
+"""
+import os
+import json
+import time
+import logging
+import urllib.error
+import urllib.request
+
+from launcher.metrics import span
+
+logger = logging.getLogger('ArknightsLauncher')
+
+CACHE_VERSION = 1
+# 两次联网检查的最小间隔，以及失败退避的起始与上限 (秒)
+MIN_INTERVAL = 6 * 3600
+BACKOFF_BASE = 5 * 60
+BACKOFF_MAX = 24 * 3600
+USER_AGENT = 'ArknightsLauncher'
+
+
+class ReleaseInfo:
+    """从 release JSON 中提取的版本信息"""
+    __slots__ = ('tag', 'changelog', 'download_url', 'sha256')
+
+    def __init__(self, tag, changelog, download_url, sha256):
+        self.tag = tag
+        self.changelog = changelog
+        self.download_url = download_url
+        self.sha256 = sha256
+
+    @classmethod
+    def from_release(cls, data):
+        """解析 release JSON，没有 tag_name 时返回 None"""
+        tag = data.get('tag_name', '')
+        if not tag:
+            return None
+        # 查找 .exe 下载链接，没有时退回 Release 页面
+        download_url = data.get('html_url', '')
+        digest = ''
+        for asset in data.get('assets', []):
+            if asset['name'].lower().endswith('.exe'):
+                download_url = asset['browser_download_url']
+                digest = asset.get('digest') or ''  # 形如 'sha256:<hex>'
+                break
+        return cls(tag, data.get('body', '') or '无更新日志', download_url, digest)
+
+    def __repr__(self):
+        return f'ReleaseInfo({self.tag!r})'
+
+
+def _trim_release(data):
+    """只缓存用到的字段"""
+    return {
+        'tag_name': data.get('tag_name', ''),
+        'body': data.get('body', ''),
+        'html_url': data.get('html_url', ''),
+        'assets': [{'name': a.get('name', ''), 'browser_download_url': a.get('browser_download_url', ''),
+                    'digest': a.get('digest')} for a in data.get('assets', [])],
+    }
+
+
+def _retry_at(error, now):
+    """频率限制响应给出的可重试时间，无法判断时返回 None"""
+    headers = error.headers or {}
+    retry_after = headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return now + int(retry_after)
+    if headers.get('X-RateLimit-Remaining') == '0' and (headers.get('X-RateLimit-Reset') or '').isdigit():
+        return float(headers['X-RateLimit-Reset'])
+    return None
+
+
+class ReleaseCache:
+    """最新 release 的本地缓存
+
+    cached() 不联网，直接返回缓存的 ReleaseInfo；refresh() 在到期时发起条件请求并更新缓存。
+    """
+
+    def __init__(self, path, url, min_interval=MIN_INTERVAL, timeout=10):
+        self.path = path
+        self.url = url
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self._state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == CACHE_VERSION and state.get('url') == self.url:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {'version': CACHE_VERSION, 'url': self.url, 'etag': None, 'release': None,
+                'checked': 0, 'failures': 0, 'next_check': 0}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.warning('写入版本检查缓存失败', exc_info=True)
+
+    def cached(self):
+        release = self._state.get('release')
+        return ReleaseInfo.from_release(release) if release else None
+
+    def due(self, now=None):
+        now = time.time() if now is None else now
+        return now >= max(self._state['next_check'], self._state['checked'] + self.min_interval)
+
+    def refresh(self, force=False):
+        """到期 (或 force) 时联网检查，返回 (ReleaseInfo 或 None, 是否与之前的缓存不同)
+
+        请求失败不抛出异常，记录退避时间后返回缓存内容。
+        """
+        now = time.time()
+        if not force and not self.due(now):
+            return self.cached(), False
+        with span('update_check', forced=force) as s:
+            release, changed = self._fetch(now)
+            s.set(changed=changed, failures=self._state['failures'])
+        return release, changed
+
+    def _fetch(self, now):
+        headers = {'Accept': 'application/vnd.github.v3+json', 'User-Agent': USER_AGENT}
+        if self._state['etag'] and self._state['release']:
+            headers['If-None-Match'] = self._state['etag']
+        previous = self._state['release']
+        try:
+            req = urllib.request.Request(self.url, headers=headers)
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                data = json.loads(resp.read().decode('utf-8'))
+                self._state['etag'] = resp.headers.get('ETag')
+            self._state['release'] = _trim_release(data)
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                self._fail(now, e, _retry_at(e, now) if e.code in (403, 429) else None)
+                return self.cached(), False
+            logger.info('版本信息未变化 (304)')
+        except (OSError, ValueError) as e:
+            self._fail(now, e)
+            return self.cached(), False
+
+        self._state.update(checked=now, failures=0, next_check=0)
+        self._save()
+        return self.cached(), self._state['release'] != previous
+
+    def _fail(self, now, error, retry_at=None):
+        failures = self._state['failures'] + 1
+        delay = min(BACKOFF_BASE * 2 ** (failures - 1), BACKOFF_MAX)
+        next_check = max(now + delay, retry_at or 0)
+        self._state.update(failures=failures, next_check=next_check)
+        self._save()
+        logger.warning(f'检查更新失败 (第 {failures} 次): {error}，'
+                       f'{int(next_check - now)}s 后再试')
@@ -0,0 +1,231 @@
+"""多账号轮换：依次应用账号预设、拉起游戏与 MAA，等待 MAA 完成后切换到下一个账号
+
+轮换队列按服务器分组 (从游戏目录当前所在的服务器开始)，整轮最多只切换一次服务器文件；
+同一服务器内的后续账号只需覆盖登录数据。每个账号的流程为：
+
+    准备 (关闭游戏 / 切换服务器文件 / 应用账号) → 拉起游戏 → 等待窗口出现
+    → 拉起 MAA → 等待 MAA 退出 (或超时) → 结束 MAA 与游戏
+
+"完成" 以 MAA 进程退出为准，需要在 MAA 中开启 "启动后直接运行" 与 "完成后退出 MAA"。
+等待基于进程监视回调唤醒，不做固定时长的 sleep。整轮结束后报告每小时完成的账号数。
+本模块不依赖 Qt。
+"""
+import os
+import time
+import logging
+import threading
+
+from launcher.monitor import ProcessMonitor
+from launcher.pipeline import PipelineCancelled, PipelineContext, run_pipeline
+from launcher.process import GAME_EXE
+
+logger = logging.getLogger('ArknightsLauncher')
+
+# 等待游戏出现窗口与等待 MAA 完成的默认时限 (秒)
+GAME_READY_TIMEOUT = 180.0
+MAA_TIMEOUT = 40 * 60.0
+# 等待期间检查取消标记的间隔
+WAIT_SLICE = 1.0
+
+DONE = 'done'
+TIMEOUT = 'timeout'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class RotationItem:
+    __slots__ = ('name', 'server')
+
+    def __init__(self, name, server):
+        self.name = name
+        self.server = server
+
+    def __repr__(self):
+        return f'RotationItem({self.name!r}, {self.server!r})'
+
+
+class RotationResult:
+    """单个账号的执行结果，status 为 done / timeout / failed / cancelled"""
+
+    def __init__(self, item, status, started, ended, error=None):
+        self.item = item
+        self.status = status
+        self.started = started
+        self.ended = ended
+        self.error = error
+
+    @property
+    def duration(self):
+        return self.ended - self.started
+
+    def to_dict(self):
+        return {'name': self.item.name, 'server': self.item.server, 'status': self.status,
+                'started': self.started, 'ended': self.ended, 'duration': self.duration, 'error': self.error}
+
+
+class RotationReport:
+    """一轮轮换的汇总，可直接追加到 SessionHistory"""
+
+    def __init__(self, started):
+        self.started = started
+        self.ended = None
+        self.results = []
+
+    @property
+    def completed(self):
+        return sum(1 for r in self.results if r.status == DONE)
+
+    @property
+    def elapsed(self):
+        return (self.ended or time.time()) - self.started
+
+    @property
+    def accounts_per_hour(self):
+        elapsed = self.elapsed
+        return self.completed * 3600 / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {'started': self.started, 'ended': self.ended, 'elapsed': self.elapsed,
+                'completed': self.completed, 'accounts_per_hour': self.accounts_per_hour,
+                'results': [r.to_dict() for r in self.results]}
+
+
+def plan_rotation(accounts, names, first_server=None):
+    """将选中的预设按服务器分组排序，返回 (RotationItem 列表, 未记录服务器归属而跳过的预设名)
+
+    first_server 的账号排在最前 (通常为游戏目录当前所在的服务器)；同一服务器内保持 names 的顺序。
+    """
+    entries = accounts.entries()
+    groups = {}
+    skipped = []
+    for name in names:
+        server = (entries.get(name) or {}).get('server')
+        if not server:
+            skipped.append(name)
+            continue
+        groups.setdefault(server, []).append(RotationItem(name, server))
+    order = sorted(groups, key=lambda s: (s != first_server, s))
+    return [item for server in order for item in groups[server]], skipped
+
+
+class RotationRunner:
+    """同步执行一轮轮换，在工作线程 (GUI) 或主线程 (命令行) 中调用 run()
+
+    回调均在调用 run() 的线程中执行：
+    on_item(index, count, item) 每个账号开始前；on_stage / on_progress 同 run_pipeline；
+    on_status(text) 等待游戏 / MAA 时的状态说明；on_result(result) 每个账号结束后。
+    """
+
+    def __init__(self, service, maa_path, items, maa_timeout=MAA_TIMEOUT, ready_timeout=GAME_READY_TIMEOUT,
+                 history=None, on_item=None, on_stage=None, on_progress=None, on_status=None, on_result=None):
+        self.service = service
+        self.maa_path = maa_path
+        self.maa_name = os.path.basename(maa_path)
+        self.items = list(items)
+        self.maa_timeout = maa_timeout
+        self.ready_timeout = ready_timeout
+        self.on_item = on_item
+        self.on_stage = on_stage
+        self.on_progress = on_progress
+        self.on_status = on_status
+        self.on_result = on_result
+        self._cond = threading.Condition()
+        self._cancel_event = threading.Event()
+        self._ctx = None
+        self.monitor = ProcessMonitor(service.processes, history, on_ready=self._notify, on_exited=self._notify)
+
+    def cancel(self):
+        """取消轮换：正在执行的准备流程在阶段之间停止，正在等待的游戏 / MAA 会被结束"""
+        self._cancel_event.set()
+        ctx = self._ctx
+        if ctx is not None:
+            ctx.cancel()
+        self._notify(None)
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _notify(self, _session):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _wait_for(self, predicate, timeout):
+        """等待 predicate() 成立，超时或取消时返回 False"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not predicate():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.cancelled:
+                    return False
+                self._cond.wait(min(remaining, WAIT_SLICE))
+        return True
+
+    def _status(self, text):
+        logger.info(text)
+        if self.on_status:
+            self.on_status(text)
+
+    def run(self):
+        report = RotationReport(time.time())
+        try:
+            for index, item in enumerate(self.items):
+                if self.cancelled:
+                    break
+                if self.on_item:
+                    self.on_item(index, len(self.items), item)
+                result = self._run_one(item)
+                report.results.append(result)
+                logger.info(f'轮换账号 {item.name}: {result.status}，耗时 {result.duration:.0f}s'
+                            + (f' ({result.error})' if result.error else ''))
+                if self.on_result:
+                    self.on_result(result)
+        finally:
+            self.monitor.stop()
+            report.ended = time.time()
+        logger.info(f'轮换结束: 完成 {report.completed}/{len(self.items)} 个账号，'
+                    f'耗时 {report.elapsed / 60:.1f} 分钟，{report.accounts_per_hour:.1f} 个/小时')
+        return report
+
+    def _run_one(self, item):
+        started = time.time()
+        status, error = DONE, None
+        try:
+            status, error = self._prepare_and_play(item)
+        except PipelineCancelled:
+            status = CANCELLED
+        except Exception as e:
+            logger.exception(f'轮换账号 {item.name} 失败')
+            status, error = FAILED, str(e)
+        finally:
+            # 无论结果如何都结束本账号的 MAA 与游戏，下一个账号的准备流程才能覆盖文件
+            self.service.processes.terminate(self.maa_name, GAME_EXE)
+        if self.cancelled and status != DONE:
+            status = CANCELLED
+        return RotationResult(item, status, started, time.time(), error)
+
+    def _prepare_and_play(self, item):
+        self._ctx = PipelineContext(self.on_progress)
+        if self.cancelled:
+            raise PipelineCancelled(item.name)
+        plan = self.service.plan_start(item.server, item.name)
+        if plan.account_path is None:
+            return FAILED, '账号预设不存在'
+        run_pipeline(self.service.start_stages(plan), self._ctx, self.on_stage)
+
+        launched = self.service.finish_start(plan)
+        game = self.monitor.watch(GAME_EXE, launched, {'server': item.server, 'account': item.name, 'rotation': True})
+        self._status(f'等待游戏启动: {item.name}')
+        if not self._wait_for(lambda: game.ready is not None or game.ended is not None, self.ready_timeout):
+            return (CANCELLED, None) if self.cancelled else (FAILED, f'游戏未能在 {self.ready_timeout:.0f}s 内就绪')
+        if game.ended is not None:
+            return FAILED, '游戏进程已退出'
+
+        self.service.processes.spawn(self.maa_path)
+        maa = self.monitor.watch(self.maa_name, meta={'account': item.name, 'rotation': True})
+        self._status(f'MAA 运行中: {item.name}')
+        if not self._wait_for(lambda: maa.ended is not None, self.maa_timeout):
+            return (CANCELLED, None) if self.cancelled else (TIMEOUT, f'MAA 未在 {self.maa_timeout:.0f}s 内结束')
+        if maa.pid is None:
+            return FAILED, 'MAA 进程未能启动'
+        return DONE, None
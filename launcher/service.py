@@ -0,0 +1,193 @@
+"""启动器服务：图形界面与命令行共用的切换 / 修复 / 账号操作
+
+LauncherService 持有配置、账号索引、进程控制与资源归档，负责把一次"切换服务器并启动"
+拆解为检测 → 生成计划 → 执行流程 → 拉起游戏。窗口类只负责确认对话框与进度显示，
+命令行直接同步执行同样的计划。本模块不依赖 Qt。
+"""
+import os
+import time
+import logging
+
+from launcher import env
+from launcher.accounts import AccountIndex
+from launcher.archive import PayloadArchive
+from launcher.config import SERVERS, ConfigStore
+from launcher.detect import detect_server
+from launcher.payload import PAYLOAD_DIRS, open_payload
+from launcher.pipeline import repair_stages, save_account_stages, start_game_stages, verify_repair_stages
+from launcher.process import GAME_EXE, ProcessController
+from launcher.snapshots import SnapshotStore
+from launcher.transaction import recover as recover_switch
+
+logger = logging.getLogger('ArknightsLauncher')
+
+SERVER_NAMES = {'official': '官服', 'bilibili': 'B服'}
+
+
+class LauncherError(Exception):
+    """可直接展示给用户的操作错误 (未配置、资源缺失、账号不存在等)"""
+
+
+class StartPlan:
+    """一次启动的计划：目标服务器、检测结论、需要覆盖的资源包与账号预设
+
+    deferred 为 True 时检测与打开资源包推迟到流程的第一个阶段，在此之前 verdict 只是
+    调用方已知的结论 (可能为 None，用于确认文本)，流程中检测后更新。
+    """
+
+    def __init__(self, game_path, server, verdict, payload=None, account=None, account_path=None, deferred=False):
+        self.game_path = game_path
+        self.server = server
+        self.verdict = verdict
+        self.payload = payload
+        self.account = account
+        self.account_path = account_path
+        self.deferred = deferred
+
+    @property
+    def need_overlay(self):
+        return self.verdict is None or self.verdict.server != self.server
+
+    def summary(self):
+        """启动确认文本"""
+        server_name = SERVER_NAMES[self.server]
+        if self.verdict is None:
+            text = f'将检测当前游戏文件，如与【{server_name}】环境不一致则覆盖游戏目录中的部分文件。'
+        elif self.need_overlay:
+            text = f'即将切换到【{server_name}】模式，需要覆盖游戏目录中的部分文件。'
+            if self.verdict.server == 'mixed' and self.server in self.verdict.differing:
+                text += f'\n(检测到 {len(self.verdict.differing[self.server])} 个文件与{server_name}资源不一致)'
+        else:
+            text = f'当前游戏文件已是【{server_name}】环境，将直接启动（跳过文件覆盖）。'
+        if self.account_path:
+            text += f'\n将加载账号预设「{self.account}」。'
+        return text
+
+
+class LauncherService:
+    def __init__(self, config=None):
+        self.config = config if config is not None else ConfigStore(env.CONFIG_PATH)
+        self.accounts = AccountIndex(env.ACCOUNTS_DIR, env.ACCOUNT_INDEX_PATH, SnapshotStore(env.ACCOUNT_OBJECTS_DIR))
+        self.processes = ProcessController()
+        self.payload_archive = PayloadArchive.locate((env.EXE_DIR, env.RESOURCES_DIR), env.PAYLOAD_CACHE_DIR)
+
+    # ---------------- 状态 ----------------
+    @property
+    def game_path(self):
+        return self.config.get('game_path', '')
+
+    def require_game_path(self):
+        game_path = self.game_path
+        if not game_path or not os.path.exists(game_path):
+            raise LauncherError('未配置游戏根目录，或目录已不存在')
+        return game_path
+
+    def require_maa_path(self):
+        maa_path = self.config.get('maa_path', '')
+        if not maa_path or not os.path.exists(maa_path):
+            raise LauncherError('未配置 MAA 路径 (MAA.exe)，或文件已不存在')
+        return maa_path
+
+    def recover(self):
+        """回滚上次被打断的服务器切换，返回是否发生了回滚"""
+        game_path = self.game_path
+        return bool(game_path) and os.path.exists(game_path) and recover_switch(game_path)
+
+    def open_payload(self, server):
+        """打开服务器资源包，资源归档在首次使用时才解压到本地缓存"""
+        return open_payload(server, env.RESOURCES_DIR, env.MANIFEST_DIR, self.payload_archive)
+
+    def payloads(self):
+        """可用的服务器资源包 {server: Payload}"""
+        payloads = {}
+        for server in PAYLOAD_DIRS:
+            payload = self.open_payload(server)
+            if payload is not None:
+                payloads[server] = payload
+        return payloads
+
+    def detect(self, game_path=None):
+        """比对游戏目录与两套资源清单，判断当前实际对应的服务器 (official / bilibili / mixed)"""
+        return detect_server(game_path or self.require_game_path(), self.payloads(), env.SERVER_CACHE_PATH)
+
+    def current_server(self):
+        """游戏目录当前所在的服务器；文件处于混合状态时以上次选择的服务器为准"""
+        verdict = self.detect()
+        return verdict.server if verdict.server in SERVERS else self.config.get('last_server', 'official')
+
+    # ---------------- 启动 ----------------
+    def plan_start(self, server, account=None, verdict=None, deferred=False):
+        """检测当前服务器并生成启动计划；account 为 None 表示不覆盖账号
+
+        deferred 为 True 时不在此检测 (图形界面线程中调用)，检测与打开资源包由流程的检测阶段完成，
+        verdict 仅作为确认文本中的当前状态。
+        """
+        if server not in SERVERS:
+            raise LauncherError(f'未知的服务器: {server}')
+        game_path = self.require_game_path()
+        if deferred:
+            plan = StartPlan(game_path, server, verdict, deferred=True)
+        else:
+            plan = StartPlan(game_path, server, verdict or self.detect(game_path))
+            self._open_plan_payload(plan)
+        if account:
+            acc_path = self.accounts.path_of(account)
+            if os.path.exists(acc_path):
+                plan.account = account
+                plan.account_path = acc_path
+        return plan
+
+    def _open_plan_payload(self, plan):
+        if plan.need_overlay:
+            plan.payload = self.open_payload(plan.server)
+            if plan.payload is None:
+                raise LauncherError(f'找不到预配资源包: {PAYLOAD_DIRS[plan.server]}')
+
+    def resolve_plan(self, plan):
+        """流程的检测阶段：检测当前服务器并按需打开资源包，结果写回 plan，返回 (检测结论, 资源包)"""
+        plan.verdict = self.detect(plan.game_path)
+        plan.payload = None
+        self._open_plan_payload(plan)
+        return plan.verdict, plan.payload
+
+    def start_stages(self, plan):
+        detect = (lambda: self.resolve_plan(plan)) if plan.deferred else None
+        return start_game_stages(plan.game_path, plan.server, plan.payload, plan.account_path,
+                                 plan.need_overlay, self.accounts.snapshots, self.processes, detect)
+
+    def finish_start(self, plan, launch=True):
+        """准备流程完成后：记录服务器与账号使用情况，按需拉起游戏；返回拉起时间，未启动时返回 None"""
+        if plan.need_overlay:
+            logger.info(f'服务器文件已切换: {plan.verdict.server} -> {plan.server}')
+        self.config['last_server'] = plan.server
+        if plan.account_path:
+            self.accounts.touch(plan.account)
+        if not launch:
+            return None
+        if not os.path.exists(os.path.join(plan.game_path, GAME_EXE)):
+            raise LauncherError('在游戏目录下未找到 Arknights.exe，请检查游戏是否损坏！')
+        launched = time.time()
+        if not self.processes.launch_game(plan.game_path):
+            raise LauncherError('游戏未能启动：管理员权限请求被拒绝或启动失败')
+        return launched
+
+    # ---------------- 修复 / 账号 ----------------
+    def repair(self, server):
+        if server not in SERVERS:
+            raise LauncherError(f'未知的服务器: {server}')
+        return repair_stages(self.require_game_path(), self.open_payload(server), self.processes)
+
+    def verify_repair(self, server, preserve_login=True, repair=True):
+        """校验 (并按需修复) 游戏目录，只处理与该服务器资源不一致的文件"""
+        if server not in SERVERS:
+            raise LauncherError(f'未知的服务器: {server}')
+        payload = self.open_payload(server)
+        if payload is None:
+            raise LauncherError(f'找不到预配资源包: {PAYLOAD_DIRS[server]}')
+        return verify_repair_stages(self.require_game_path(), payload, self.processes, preserve_login, repair)
+
+    def save_account(self, name, server):
+        return save_account_stages(self.require_game_path(), self.accounts, name, server)
+
+    def close(self):
+        self.config.close()
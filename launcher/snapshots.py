@@ -0,0 +1,167 @@
+"""账号快照存储
+
+每个账号预设目录中只保存 meta.json 与 snapshot.json (快照清单)，
+文件内容按固定大小切块、zlib 压缩后以 SHA-256 为键存放在共享的 objects 目录中，
+多个账号之间相同的配置文件只保存一份。
+
+目录结构::
+
+    AccountBackups/<name>/meta.json
+    AccountBackups/<name>/snapshot.json   # {'files': {rel: {size, mtime_ns, sha256, chunks}}}
+    AccountObjects/ab/abcdef...           # zlib 压缩后的数据块
+"""
+import os
+import json
+import time
+import zlib
+import shutil
+import hashlib
+import logging
+
+from launcher.copier import CopyTask, DEFAULT_EXCLUDE, DEFAULT_WORKERS, iter_files, run_tasks
+from launcher.payload import content_mtime_ns, is_up_to_date
+
+logger = logging.getLogger('ArknightsLauncher')
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE = 'snapshot.json'
+CHUNK_SIZE = 1024 * 1024
+COMPRESS_LEVEL = 6
+# 清理只删除超过该时长未被写入 / 引用的数据块：正在进行的保存 (可能在另一个启动器实例中)
+# 已写出数据块但尚未写出 snapshot.json，这些块此时还不在任何快照中
+GC_GRACE_SECONDS = 3600
+
+
+class SnapshotStore:
+    """压缩、去重的账号快照存储"""
+
+    def __init__(self, objects_dir):
+        self.objects_dir = objects_dir
+
+    def chunk_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    # ---------------- 数据块 ----------------
+    def _put_chunk(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.chunk_path(digest)
+        try:
+            # 复用已有的数据块时刷新修改时间，使其在本次保存完成前不会被 gc 清理
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(data, COMPRESS_LEVEL))
+            os.replace(tmp_path, path)
+        return digest
+
+    def _read_chunk(self, digest):
+        with open(self.chunk_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    # ---------------- 快照 ----------------
+    @staticmethod
+    def has_snapshot(acc_path):
+        return os.path.exists(os.path.join(acc_path, SNAPSHOT_FILE))
+
+    @staticmethod
+    def read_snapshot(acc_path):
+        try:
+            with open(os.path.join(acc_path, SNAPSHOT_FILE), 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get('version') == SNAPSHOT_VERSION:
+                return snapshot
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _capture_file(self, path, st):
+        file_hash = hashlib.sha256()
+        chunks = []
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(CHUNK_SIZE)
+                if not data:
+                    break
+                file_hash.update(data)
+                chunks.append(self._put_chunk(data))
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_hash.hexdigest(), 'chunks': chunks}
+
+    def capture(self, base_dir, names, acc_path, exclude=DEFAULT_EXCLUDE):
+        """将 base_dir 下的 names (如 U8Data / sdkdata) 保存为 acc_path 中的快照"""
+        files = {}
+        for name in names:
+            src = os.path.join(base_dir, name)
+            if not os.path.isdir(src):
+                continue
+            for rel, entry in iter_files(src, exclude, name + '/'):
+                files[rel] = self._capture_file(entry.path, entry.stat())
+        snapshot = {'version': SNAPSHOT_VERSION, 'files': files}
+        tmp_path = os.path.join(acc_path, SNAPSHOT_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, os.path.join(acc_path, SNAPSHOT_FILE))
+        return snapshot
+
+    def restore(self, acc_path, dst_dir, max_workers=DEFAULT_WORKERS, on_progress=None):
+        """将快照解压写入目标目录，内容已一致的文件跳过，返回 CopyResult"""
+        snapshot = self.read_snapshot(acc_path)
+        if snapshot is None:
+            raise FileNotFoundError(f'账号快照缺失或已损坏: {acc_path}')
+        tasks = []
+        for rel, meta in snapshot['files'].items():
+            tasks.append(CopyTask(
+                None, os.path.join(dst_dir, *rel.split('/')), meta['size'],
+                check=lambda dst, meta=meta: is_up_to_date(dst, meta),
+                mtime_ns=content_mtime_ns(meta),
+                writer=lambda dst, meta=meta: self._write_file(meta, dst),
+            ))
+        return run_tasks(tasks, max_workers, on_progress)
+
+    def _write_file(self, meta, dst):
+        with open(dst, 'wb') as f:
+            for digest in meta['chunks']:
+                f.write(self._read_chunk(digest))
+
+    # ---------------- 维护 ----------------
+    def migrate_legacy(self, acc_path):
+        """将旧版 (直接保存 U8Data / sdkdata 目录) 的预设转换为快照格式"""
+        names = [e.name for e in os.scandir(acc_path) if e.is_dir()]
+        self.capture(acc_path, names, acc_path)
+        for name in names:
+            shutil.rmtree(os.path.join(acc_path, name), ignore_errors=True)
+        logger.info(f'已将账号预设转换为快照格式: {os.path.basename(acc_path)}')
+
+    def gc(self, accounts_dir, grace=GC_GRACE_SECONDS):
+        """删除已不被任何预设引用、且最近 grace 秒内未被写入的数据块"""
+        cutoff = time.time() - grace
+        live = set()
+        for entry in os.scandir(accounts_dir):
+            if entry.is_dir():
+                snapshot = self.read_snapshot(entry.path)
+                if snapshot is None and self.has_snapshot(entry.path):
+                    # 快照无法解析时不清理，避免误删仍被引用的数据
+                    return 0
+                for meta in (snapshot or {}).get('files', {}).values():
+                    live.update(meta['chunks'])
+        removed = 0
+        if not os.path.isdir(self.objects_dir):
+            return removed
+        for bucket in os.scandir(self.objects_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                # 跳过其他线程正在写入的临时文件与仍可能属于进行中保存的新数据块
+                if entry.name in live or entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    if entry.stat().st_mtime >= cutoff:
+                        continue
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+        if removed:
+            logger.info(f'已清理 {removed} 个未引用的账号数据块')
+        return removed
@@ -0,0 +1,178 @@
+"""带日志 (journal) 的事务式服务器切换
+
+切换分三步进行：
+1. 暂存：将需要更新的文件复制到游戏目录下的事务目录 (与目标同一分区)，此时游戏目录不受影响；
+2. 交换：写入日志后，依次将旧文件改名移入回滚区、将暂存文件改名到目标位置，仅涉及 rename；
+3. 提交：标记日志为已提交并删除事务目录。
+
+任一步骤失败都会按日志回滚；若启动器在交换过程中崩溃，下次启动时
+recover() 会根据残留的日志自动回滚，回滚代价只与变更的文件数有关。
+"""
+import os
+import json
+import shutil
+import logging
+
+from launcher.copier import CopyTask, DEFAULT_WORKERS, run_tasks
+from launcher.payload import content_mtime_ns, is_up_to_date
+
+logger = logging.getLogger('ArknightsLauncher')
+
+TXN_DIR_NAME = '.ArknightsLauncher_txn'
+JOURNAL_FILE = 'journal.json'
+JOURNAL_VERSION = 1
+
+# 日志状态
+STAGING = 'staging'
+SWAPPING = 'swapping'
+COMMITTED = 'committed'
+
+
+def _native(root, rel):
+    return os.path.join(root, *rel.split('/'))
+
+
+def _remove_path(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+class SwitchTransaction:
+    """对游戏目录的一组文件替换 / 删除操作，整体提交或回滚"""
+
+    def __init__(self, game_path):
+        self.game_path = game_path
+        self.txn_dir = os.path.join(game_path, TXN_DIR_NAME)
+        self.staged_dir = os.path.join(self.txn_dir, 'staged')
+        self.rollback_dir = os.path.join(self.txn_dir, 'rollback')
+        self.journal_path = os.path.join(self.txn_dir, JOURNAL_FILE)
+        self.ops = []  # [{'rel': ..., 'kind': 'put' | 'remove'}]
+        self.state = None
+
+    # ---------------- 日志 ----------------
+    def _write_journal(self, state):
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': JOURNAL_VERSION, 'state': state, 'ops': self.ops}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        self.state = state
+
+    @classmethod
+    def load(cls, game_path):
+        """读取残留的事务，不存在时返回 None"""
+        txn = cls(game_path)
+        if not os.path.isdir(txn.txn_dir):
+            return None
+        try:
+            with open(txn.journal_path, 'r', encoding='utf-8') as f:
+                journal = json.load(f)
+            txn.ops = journal.get('ops', [])
+            txn.state = journal.get('state', STAGING)
+        except (OSError, ValueError):
+            # 日志尚未写出即中断：此时游戏目录尚未被修改
+            txn.state = STAGING
+        return txn
+
+    # ---------------- 暂存 ----------------
+    def begin(self):
+        # 先处理上次残留的事务，避免覆盖其回滚数据
+        recover(self.game_path)
+        os.makedirs(self.staged_dir)
+        self._write_journal(STAGING)
+
+    def remove(self, rel):
+        """登记一个在交换阶段移入回滚区的文件或目录 (不存在则忽略)"""
+        if os.path.lexists(_native(self.game_path, rel)):
+            self.ops.append({'rel': rel, 'kind': 'remove'})
+
+    def stage_payload(self, payload, max_workers=DEFAULT_WORKERS, on_progress=None):
+        """将资源包中与游戏目录不一致的文件复制到暂存区，返回 CopyResult"""
+        tasks = []
+        for rel, meta in payload.manifest['files'].items():
+            target = _native(self.game_path, rel)
+            tasks.append(CopyTask(
+                payload.source_path(rel, meta), _native(self.staged_dir, rel), meta['size'],
+                check=lambda dst, target=target, meta=meta: is_up_to_date(target, meta),
+                mtime_ns=content_mtime_ns(meta),
+            ))
+        result = run_tasks(tasks, max_workers, on_progress)
+        result.raise_for_errors()
+        for rel in payload.manifest['files']:
+            if os.path.exists(_native(self.staged_dir, rel)):
+                self.ops.append({'rel': rel, 'kind': 'put'})
+        return result
+
+    # ---------------- 交换 / 提交 ----------------
+    def _move_to_rollback(self, rel):
+        target = _native(self.game_path, rel)
+        if os.path.lexists(target):
+            backup = _native(self.rollback_dir, rel)
+            os.makedirs(os.path.dirname(backup), exist_ok=True)
+            os.replace(target, backup)
+
+    def swap(self):
+        self._write_journal(SWAPPING)
+        for op in self.ops:
+            rel = op['rel']
+            self._move_to_rollback(rel)
+            if op['kind'] == 'put':
+                target = _native(self.game_path, rel)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(_native(self.staged_dir, rel), target)
+
+    def commit(self):
+        self._write_journal(COMMITTED)
+        shutil.rmtree(self.txn_dir, ignore_errors=True)
+
+    # ---------------- 回滚 ----------------
+    def rollback(self):
+        """按日志撤销已执行的交换，可重复执行"""
+        if self.state == SWAPPING:
+            for op in reversed(self.ops):
+                rel = op['rel']
+                target = _native(self.game_path, rel)
+                backup = _native(self.rollback_dir, rel)
+                staged = _native(self.staged_dir, rel)
+                if os.path.lexists(backup):
+                    if os.path.lexists(target):
+                        _remove_path(target)
+                    os.replace(backup, target)
+                elif op['kind'] == 'put' and not os.path.exists(staged) and os.path.lexists(target):
+                    # 新建的文件已换入：删除即可
+                    _remove_path(target)
+            logger.warning(f'服务器切换已回滚: 恢复 {len(self.ops)} 项变更')
+        shutil.rmtree(self.txn_dir, ignore_errors=True)
+        self.state = None
+
+
+def recover(game_path):
+    """启动时处理上次中断的切换：未提交的回滚，已提交的清理；返回是否执行了回滚"""
+    txn = SwitchTransaction.load(game_path)
+    if txn is None:
+        return False
+    if txn.state == COMMITTED:
+        shutil.rmtree(txn.txn_dir, ignore_errors=True)
+        return False
+    logger.warning(f'检测到未完成的服务器切换 (状态: {txn.state})，正在回滚')
+    txn.rollback()
+    return True
+
+
+def switch_payload(game_path, payload, remove=(), on_progress=None):
+    """事务式地删除 remove 中的路径并覆盖资源包，失败时自动回滚，返回暂存阶段的 CopyResult"""
+    txn = SwitchTransaction(game_path)
+    txn.begin()
+    try:
+        for rel in remove:
+            txn.remove(rel)
+        result = txn.stage_payload(payload, on_progress=on_progress)
+        txn.swap()
+        txn.commit()
+    except BaseException:
+        txn.rollback()
+        raise
+    return result
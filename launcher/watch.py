@@ -0,0 +1,264 @@
+"""账号预设与游戏目录状态的监视
+
+StateModel 在内存中保存账号预设索引与游戏目录当前对应的服务器，界面切换服务器、点击启动时
+直接读取，不再扫描目录。外部修改 (游戏更新、手动增删预设、另一个启动器实例) 由目录监视发现：
+图形界面使用 QFileSystemWatcher，无法注册的路径 (以及无 Qt 环境) 使用 PollingWatcher 定期比对 stat。
+监视回调只需调用 notify(path)，模型在后台线程中合并一段时间内的变化后增量更新：
+预设目录只重新扫描变化的预设，游戏目录变化后重新检测服务器 (检测本身按 stat 缓存)。
+
+监视只注册预设目录、游戏根目录与根目录下的资源文件，不深入子目录；启动器自身修改游戏目录
+(切换服务器、修复等) 期间应 suspend()，避免监视句柄或检测读文件使文件替换失败。
+"""
+import os
+import logging
+import threading
+
+from launcher.accounts import filter_names
+from launcher.config import SERVERS
+from launcher.detect import fingerprint_files
+
+logger = logging.getLogger('ArknightsLauncher')
+
+POLL_INTERVAL = 2.0
+# 最后一次变化后等待的时间，复制大量文件期间只在结束后刷新一次
+DEBOUNCE = 0.5
+
+
+def path_signature(path):
+    """目录为各条目的 (名称, 大小, 修改时间)，文件为自身的 (大小, 修改时间)，不存在时为 None"""
+    try:
+        if os.path.isdir(path):
+            return frozenset((e.name, e.stat().st_size, e.stat().st_mtime_ns) for e in os.scandir(path))
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
+
+
+def game_watch_paths(game_path, payloads):
+    """游戏目录中需要监视的路径：根目录与根目录下的资源文件
+
+    另一服务器的专属文件 / 目录位于根目录，其出现与消失由根目录的条目变化反映；
+    子目录中的文件不监视，启动前的检测阶段仍会按 stat 重新比对。
+    """
+    names = set()
+    for payload in payloads.values():
+        names.update(rel for rel in fingerprint_files(payload.manifest) if '/' not in rel)
+    return [game_path] + sorted(os.path.join(game_path, name) for name in names)
+
+
+class PollingWatcher:
+    """不依赖平台通知机制的监视：后台线程每隔 interval 秒比对各路径的 stat 信息，变化时回调 on_change(path)"""
+
+    def __init__(self, on_change, interval=POLL_INTERVAL):
+        self.on_change = on_change
+        self.interval = interval
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def set_paths(self, paths):
+        signatures = {path: path_signature(path) for path in paths}
+        with self._lock:
+            self._signatures = signatures
+            if self._thread is None and signatures:
+                self._thread = threading.Thread(target=self._run, name='PollingWatcher', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                paths = list(self._signatures)
+            for path in paths:
+                signature = path_signature(path)
+                with self._lock:
+                    if path not in self._signatures or self._signatures[path] == signature:
+                        continue
+                    self._signatures[path] = signature
+                self.on_change(path)
+
+
+class StateModel:
+    """账号预设与服务器状态的内存模型
+
+    回调均在模型的后台线程中调用：on_accounts(entries) 预设有增删改；on_server(verdict)
+    服务器检测结论变化；on_paths(paths) 需要监视的路径集合变化 (游戏目录或其中资源变更)，
+    其中可能包含尚不存在的文件；未提供 on_paths 时全部路径由 PollingWatcher 轮询。
+    verdict 为 None 表示游戏目录有未处理的变化 (或尚未检测)，此时调用方应自行检测。
+    suspend() 后不再刷新 (通知仍会记录)，resume() 后一并处理并重新给出监视路径。
+    """
+
+    def __init__(self, service, on_accounts=None, on_server=None, on_paths=None, debounce=DEBOUNCE):
+        self.service = service
+        self.on_accounts = on_accounts
+        self.on_server = on_server
+        self.on_paths = on_paths
+        self.debounce = debounce
+        self.accounts = {}
+        self.verdict = None
+        self.poller = PollingWatcher(self.notify)
+        self._paths = []
+        self._server = None
+        self._pending = {'accounts': True, 'game': True}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._retry = None
+        self._suspended = False
+        # 刷新期间持有，suspend() 借此等待进行中的刷新结束
+        self._refreshing = threading.Lock()
+
+    # ---------------- 读取 (不做 I/O) ----------------
+    def names_for(self, server):
+        return filter_names(self.accounts, server)
+
+    def current_server(self, fallback):
+        verdict = self.verdict
+        return verdict.server if verdict is not None and verdict.server in SERVERS else fallback
+
+    # ---------------- 变化通知 ----------------
+    def start(self):
+        """加载当前状态并开始处理变化通知"""
+        if self._thread is not None:
+            return
+        self.accounts = self.service.accounts.entries()
+        self._thread = threading.Thread(target=self._run, name='StateModel', daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self.poller.stop()
+        if self._retry is not None:
+            self._retry.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=self.debounce * 4)
+
+    def notify(self, path):
+        """监视回调：path 发生了变化 (可在任意线程调用)"""
+        accounts_dir = os.path.normcase(os.path.abspath(self.service.accounts.accounts_dir))
+        path = os.path.normcase(os.path.abspath(path))
+        is_accounts = path == accounts_dir or path.startswith(accounts_dir + os.sep)
+        with self._lock:
+            self._pending['accounts' if is_accounts else 'game'] = True
+            if not is_accounts:
+                self.verdict = None
+        self._wake.set()
+
+    def poll(self, paths):
+        """为无法使用系统通知的路径启用轮询 (替换之前的轮询路径)"""
+        if paths:
+            logger.info(f'{len(paths)} 个路径无法注册目录监视，改为每 {self.poller.interval:.0f}s 轮询')
+        self.poller.set_paths(paths)
+
+    def invalidate_game(self):
+        """游戏目录配置变更后重新检测并更新监视路径"""
+        with self._lock:
+            self._pending['game'] = True
+            self.verdict = None
+        self._wake.set()
+
+    def suspend(self):
+        """暂停刷新，返回前等待进行中的刷新 (检测会读取游戏目录中的文件) 结束；可在任意线程调用"""
+        with self._refreshing:
+            self._suspended = True
+
+    def resume(self):
+        """恢复刷新，处理暂停期间的变化并重新给出监视路径"""
+        with self._refreshing:
+            self._suspended = False
+            self._paths = []
+        self._wake.set()
+
+    def reload_accounts(self):
+        """启动器自身保存 / 删除预设后同步读取索引 (索引已在内存中更新)"""
+        self.accounts = self.service.accounts.entries()
+
+    # ---------------- 后台处理 ----------------
+    def _run(self):
+        try:
+            # 旧版格式的预设只在启动时转换，监视触发的同步不做转换
+            self.service.accounts.migrate_legacy()
+        except Exception:
+            logger.exception('转换旧版账号预设失败')
+        while not self._stopped.is_set():
+            self._wake.wait()
+            # 等待变化平息，合并一段时间内的所有通知
+            while self._wake.is_set() and not self._stopped.is_set():
+                self._wake.clear()
+                self._stopped.wait(self.debounce)
+            if self._stopped.is_set():
+                return
+            with self._refreshing:
+                if self._suspended:
+                    # 通知保留在 _pending 中，resume() 后处理
+                    continue
+                with self._lock:
+                    pending, self._pending = self._pending, {'accounts': False, 'game': False}
+                try:
+                    self._refresh(pending)
+                except Exception:
+                    logger.exception('刷新账号 / 服务器状态失败')
+
+    def _refresh(self, pending):
+        paths_changed = False
+        if pending['accounts']:
+            added, removed, changed, unsettled = self.service.accounts.sync(settle=self.debounce)
+            if unsettled:
+                self._schedule_accounts_retry()
+            self.accounts = self.service.accounts.entries()
+            if added or removed or changed:
+                self._emit(self.on_accounts, self.accounts)
+            paths_changed |= not self._paths
+        game_path = self.service.game_path
+        if pending['game']:
+            # 游戏目录配置变更或根目录下出现新的资源文件时监视路径随之变化
+            paths_changed = True
+            verdict = self.service.detect(game_path) if game_path and os.path.isdir(game_path) else None
+            with self._lock:
+                # 检测期间又有新的变化时保持 None，由下一轮处理
+                if not self._pending['game']:
+                    self.verdict = verdict
+            server = verdict.server if verdict is not None else None
+            if server != self._server:
+                self._server = server
+                self._emit(self.on_server, verdict)
+        if paths_changed:
+            paths = self._watch_paths(game_path)
+            if paths == self._paths:
+                return
+            self._paths = paths
+            if self.on_paths:
+                self._emit(self.on_paths, list(self._paths))
+            else:
+                self.poller.set_paths(self._paths)
+
+    def _schedule_accounts_retry(self):
+        """仍在写入的预设没有新的变化通知时，也在平息后再同步一次"""
+        if self._retry is not None:
+            self._retry.cancel()
+        self._retry = threading.Timer(self.debounce * 2, self.notify, (self.service.accounts.accounts_dir,))
+        self._retry.daemon = True
+        self._retry.start()
+
+    def _watch_paths(self, game_path):
+        paths = [self.service.accounts.accounts_dir]
+        if game_path and os.path.isdir(game_path):
+            paths += game_watch_paths(game_path, self.service.payloads())
+        return paths
+
+    def _emit(self, callback, *args):
+        # 停止后不再回调 (界面对象可能已销毁)
+        if callback and not self._stopped.is_set():
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception('状态回调出错')
@@ -1,95 +1,99 @@
 import sys
-import os
-import json
-import shutil
-import logging
-import psutil
-import subprocess
-import ctypes
-import tempfile
-import urllib.request
-import re
-from packaging.version import Version
-
-from PyQt6.QtCore import Qt, QSize, QTimer, QVariantAnimation, QRect, QThread, pyqtSignal
-from PyQt6.QtGui import QIcon, QFont, QPixmap, QPainter, QColor, QPen
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QToolButton, QPushButton,
-    QFileDialog, QFrame, QGraphicsDropShadowEffect, QSizePolicy, QSystemTrayIcon, QMenu,
-    QProgressBar, QDialog
-)
-from qfluentwidgets import (
-    SubtitleLabel, setTheme, Theme,
-    BodyLabel, PushButton, FluentIcon,
-    MessageBox, InfoBar, InfoBarPosition, LineEdit, ToolButton,
-    ComboBox, MessageBoxBase,
-    TransparentToolButton, MSFluentTitleBar, ToolTipFilter, ToolTipPosition
-)
-from qframelesswindow import FramelessWindow
 
-# PyInstaller 兼容性获取路径基准
-if getattr(sys, 'frozen', False):
-    BASE_DIR = sys._MEIPASS
-else:
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 带子命令运行 (switch / status / verify / repair / list-accounts / rotate / diagnostics) 时进入命令行模式，不加载 Qt
+if __name__ == '__main__' and len(sys.argv) > 1 and not sys.argv[1].startswith('-'):
+    from launcher.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
+# 尽早开始计时，以便统计后续模块的导入耗时 (--profile-startup)
+from launcher.profiling import StartupProfiler
+PROFILER = StartupProfiler.from_argv(sys.argv)
+
+with PROFILER.phase('import stdlib'):
+    import os
+    import subprocess
+    import tempfile
+    import threading
+    import re
+    import hashlib
+with PROFILER.phase('import packaging'):
+    from packaging.version import Version
+
+with PROFILER.phase('import PyQt6'):
+    from PyQt6.QtCore import (
+        Qt, QObject, QSize, QTimer, QVariantAnimation, QRect, QRectF, QThread, QFileSystemWatcher, pyqtSignal
+    )
+    from PyQt6.QtGui import (
+        QIcon, QFont, QPixmap, QPainter, QPainterPath, QColor, QPen, QBrush, QImage, QImageReader, QImageIOHandler
+    )
+    from PyQt6.QtWidgets import (
+        QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QToolButton, QPushButton,
+        QFileDialog, QFrame, QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect, QSizePolicy,
+        QSystemTrayIcon, QMenu, QProgressBar, QDialog, QListWidgetItem
+    )
+with PROFILER.phase('import qfluentwidgets'):
+    from qfluentwidgets import (
+        SubtitleLabel, setTheme, Theme,
+        BodyLabel, PushButton, FluentIcon,
+        MessageBox, InfoBar, InfoBarPosition, LineEdit, ToolButton,
+        ComboBox, MessageBoxBase, ListWidget, SpinBox, CheckBox,
+        TransparentToolButton, MSFluentTitleBar, ToolTipFilter, ToolTipPosition
+    )
+    from qframelesswindow import FramelessWindow
 
-CONFIG_PATH = os.path.join(os.getenv('APPDATA'), 'ArknightsLauncher_v2', 'config.json')
-ACCOUNTS_DIR = os.path.join(os.getenv('APPDATA'), 'ArknightsLauncher_v2', 'AccountBackups')
+with PROFILER.phase('import launcher'):
+    from launcher.download import DownloadCancelled, download
+    from launcher.logs import apply_settings as apply_log_settings
+    from launcher.metrics import (
+        RECORDER, configure as configure_metrics, format_summary, machine_info, span, summarize
+    )
+    from launcher.release import ReleaseCache
+    from launcher.progress import ProgressReporter, format_eta, format_rate
+    from launcher.pipeline import PipelineCancelled, PipelineContext, run_pipeline
+    from launcher.monitor import ProcessMonitor, SessionHistory
+    from launcher.process import GAME_EXE
+    from launcher.rotation import DONE, MAA_TIMEOUT, RotationRunner, plan_rotation
+    from launcher.service import SERVER_NAMES, LauncherError, LauncherService
+    from launcher.watch import StateModel
+
+from launcher.env import (
+    BASE_DIR, BACKGROUND_CACHE_DIR, RELEASE_CACHE_PATH, SESSION_HISTORY_PATH, ROTATION_HISTORY_PATH,
+    METRICS_PATH, VERSION, setup_logging
+)
 
 OFFICIAL_ICON = os.path.join(BASE_DIR, 'resources', 'Icons', 'official.ico')
 BSERVER_ICON = os.path.join(BASE_DIR, 'resources', 'Icons', 'bserver.ico')
 MAA_ICON = os.path.join(BASE_DIR, 'resources', 'Icons', 'MAA.ico')
 
-VERSION = 'v1.2.0'
 GITHUB_REPO = 'qwe4559999/ArknightsLauncher-Py'
 GITHUB_API_URL = f'https://api.github.com/repos/{GITHUB_REPO}/releases/latest'
 
 # ================= 日志系统 =================
-LOG_DIR = os.path.join(os.getenv('APPDATA'), 'ArknightsLauncher_v2')
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_PATH = os.path.join(LOG_DIR, 'launcher.log')
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_PATH, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger('ArknightsLauncher')
+logger = setup_logging()
+configure_metrics(METRICS_PATH)
 
 # ================= 自动更新组件 =================
 class UpdateChecker(QThread):
-    """后台线程检查 GitHub Releases 最新版本"""
-    update_available = pyqtSignal(str, str, str)  # (new_version, changelog, download_url)
-    
+    """后台线程检查 GitHub Releases 最新版本：先使用本地缓存，到期后再以条件请求联网检查"""
+    update_available = pyqtSignal(str, str, str, str)  # (new_version, changelog, download_url, sha256)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cache = ReleaseCache(RELEASE_CACHE_PATH, GITHUB_API_URL)
+
+    @staticmethod
+    def _version(release):
+        # 版本比较 (去掉 v 前缀)
+        return Version(release.tag.lstrip('v'))
+
     def run(self):
         try:
-            req = urllib.request.Request(GITHUB_API_URL, headers={'Accept': 'application/vnd.github.v3+json', 'User-Agent': 'ArknightsLauncher'})
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read().decode('utf-8'))
-            
-            remote_tag = data.get('tag_name', '')
-            if not remote_tag:
-                return
-            
-            # 版本比较 (去掉 v 前缀)
-            local_ver = Version(VERSION.lstrip('v'))
-            remote_ver = Version(remote_tag.lstrip('v'))
-            
-            if remote_ver > local_ver:
-                changelog = data.get('body', '') or '无更新日志'
-                # 查找 .exe 下载链接
-                download_url = ''
-                for asset in data.get('assets', []):
-                    if asset['name'].lower().endswith('.exe'):
-                        download_url = asset['browser_download_url']
-                        break
-                if not download_url:
-                    download_url = data.get('html_url', '')
-                
-                self.update_available.emit(remote_tag, changelog, download_url)
+            cached = self.cache.cached()
+            release, _ = self.cache.refresh()
+            # 缓存与联网结果取较新的一个，最多提示一次
+            newest = max((r for r in (cached, release) if r is not None), key=self._version, default=None)
+            if newest is not None and self._version(newest) > Version(VERSION.lstrip('v')):
+                self.update_available.emit(newest.tag, newest.changelog, newest.download_url, newest.sha256)
             else:
                 logger.info(f'已是最新版本 {VERSION}')
         except Exception as e:
@@ -98,7 +102,7 @@ class UpdateChecker(QThread):
 
 class UpdateDownloadDialog(QDialog):
     """下载进度对话框"""
-    def __init__(self, download_url, new_version, parent=None):
+    def __init__(self, download_url, new_version, sha256='', parent=None):
         super().__init__(parent)
         self.download_url = download_url
         self.new_version = new_version
@@ -119,7 +123,7 @@ class UpdateDownloadDialog(QDialog):
         self.progressBar.setValue(0)
         layout.addWidget(self.progressBar)
         
-        self.download_thread = DownloadThread(download_url)
+        self.download_thread = DownloadThread(download_url, sha256)
         self.download_thread.progress.connect(self.on_progress)
         self.download_thread.finished_path.connect(self.on_finished)
         self.download_thread.error.connect(self.on_error)
@@ -127,8 +131,12 @@ class UpdateDownloadDialog(QDialog):
         
         self.downloaded_path = None
     
-    def on_progress(self, percent):
-        self.progressBar.setValue(percent)
+    def on_progress(self, snapshot):
+        self.progressBar.setValue(snapshot.percent)
+        text = f'正在下载 {self.new_version} ...  {format_rate(snapshot.rate)}'
+        if snapshot.eta is not None:
+            text += f'，剩余 {format_eta(snapshot.eta)}'
+        self.label.setText(text)
     
     def on_finished(self, path):
         self.downloaded_path = path
@@ -143,46 +151,286 @@ class UpdateDownloadDialog(QDialog):
     
     def closeEvent(self, e):
         if self.download_thread.isRunning():
-            self.download_thread.terminate()
+            # 已下载的部分保留，下次更新时断点续传。不在界面线程中等待：连接停滞时当前读取
+            # 可能要到超时才返回，线程交给应用对象持有，取消生效后自行销毁；退出程序时才等待其结束
+            app = QApplication.instance()
+            self.download_thread.cancel()
+            self.download_thread.setParent(app)
+            self.download_thread.finished.connect(self.download_thread.deleteLater)
+            app.aboutToQuit.connect(self.download_thread.wait)
         super().closeEvent(e)
 
 
 class DownloadThread(QThread):
     """后台下载线程"""
-    progress = pyqtSignal(int)
+    progress = pyqtSignal(object)  # ProgressSnapshot
     finished_path = pyqtSignal(str)
     error = pyqtSignal(str)
     
-    def __init__(self, url):
+    def __init__(self, url, sha256=''):
         super().__init__()
         self.url = url
-    
+        self.sha256 = sha256
+        self._cancel_event = threading.Event()
+        self._progress = ProgressReporter(self.progress.emit)
+
+    def cancel(self):
+        self._cancel_event.set()
+
     def run(self):
+        # 下载到临时目录，固定文件名以便中断后续传
+        tmp_dir = os.path.join(tempfile.gettempdir(), 'ArknightsLauncher_update')
+        tmp_path = os.path.join(tmp_dir, 'ArknightsLauncher_new.exe')
+        if not self.sha256:
+            logger.warning('发布信息中没有 SHA-256 摘要，下载后将不做校验')
         try:
-            req = urllib.request.Request(self.url, headers={'User-Agent': 'ArknightsLauncher'})
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                total = int(resp.headers.get('Content-Length', 0))
-                
-                # 下载到临时目录
-                tmp_dir = os.path.join(tempfile.gettempdir(), 'ArknightsLauncher_update')
-                os.makedirs(tmp_dir, exist_ok=True)
-                tmp_path = os.path.join(tmp_dir, 'ArknightsLauncher_new.exe')
-                
-                downloaded = 0
-                block_size = 8192
-                with open(tmp_path, 'wb') as f:
-                    while True:
-                        chunk = resp.read(block_size)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total > 0:
-                            self.progress.emit(int(downloaded * 100 / total))
-            
-            self.finished_path.emit(tmp_path)
+            download(self.url, tmp_path, self.sha256 or None, self._progress, self._cancel_event)
+        except DownloadCancelled:
+            logger.info('更新下载已取消')
+            return
         except Exception as e:
+            logger.exception('下载更新失败')
             self.error.emit(str(e))
+            return
+        self.finished_path.emit(tmp_path)
+
+
+# ================= 后台任务 =================
+class PipelineWorker(QThread):
+    """后台按阶段执行启动 / 修复 / 保存账号流程，阶段之间可取消"""
+    stage_changed = pyqtSignal(int, int, str)  # (index, count, title)
+    progress = pyqtSignal(object)  # 当前阶段的 ProgressSnapshot (已限频)
+    succeeded = pyqtSignal(object)  # 各阶段结果 {key: result}
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, stages, parent=None):
+        super().__init__(parent)
+        self.stages = stages
+        self.context = PipelineContext(on_progress=self.progress.emit)
+
+    def cancel(self):
+        self.context.cancel()
+
+    def _on_stage(self, index, count, stage):
+        self.stage_changed.emit(index, count, stage.title)
+
+    def run(self):
+        try:
+            results = run_pipeline(self.stages, self.context, self._on_stage)
+        except PipelineCancelled as e:
+            logger.info(f'操作已取消，未执行阶段: {e}')
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            logger.exception('后台任务执行失败')
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit(results)
+
+
+class RotationWorker(QThread):
+    """后台执行多账号轮换，取消后结束当前账号的游戏与 MAA 并停止"""
+    item_changed = pyqtSignal(int, int, str)  # (index, count, 账号名)
+    stage_changed = pyqtSignal(int, int, str)
+    progress = pyqtSignal(object)
+    status = pyqtSignal(str)
+    result = pyqtSignal(object)  # RotationResult
+    report = pyqtSignal(object)  # RotationReport
+    failed = pyqtSignal(str)
+
+    def __init__(self, service, maa_path, items, maa_timeout, parent=None):
+        super().__init__(parent)
+        self.runner = RotationRunner(
+            service, maa_path, items, maa_timeout=maa_timeout, history=SessionHistory(SESSION_HISTORY_PATH),
+            on_item=lambda i, n, item: self.item_changed.emit(i, n, item.name),
+            on_stage=lambda i, n, stage: self.stage_changed.emit(i, n, stage.title),
+            on_progress=self.progress.emit, on_status=self.status.emit, on_result=self.result.emit,
+        )
+
+    def cancel(self):
+        self.runner.cancel()
+
+    def run(self):
+        try:
+            report = self.runner.run()
+        except Exception as e:
+            logger.exception('账号轮换失败')
+            self.failed.emit(str(e))
+            return
+        SessionHistory(ROTATION_HISTORY_PATH).append(report)
+        self.report.emit(report)
+
+
+class ProcessEvents(QObject):
+    """将 ProcessMonitor 在监视线程中的回调转为 Qt 信号，由 GUI 线程处理"""
+    started = pyqtSignal(object)  # Session
+    ready = pyqtSignal(object)
+    exited = pyqtSignal(object)
+
+    def monitor(self, processes, history):
+        return ProcessMonitor(processes, history,
+                              on_started=self.started.emit, on_ready=self.ready.emit, on_exited=self.exited.emit)
+
+
+class StateEvents(QObject):
+    """将 StateModel 在后台线程中的回调转为 Qt 信号，并用 QFileSystemWatcher 监视模型给出的路径"""
+    accounts_changed = pyqtSignal(object)  # {预设名: 索引条目}
+    server_changed = pyqtSignal(object)  # ServerVerdict 或 None
+    paths_changed = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_changed)
+        self.watcher.fileChanged.connect(self._on_changed)
+        self.paths_changed.connect(self._set_paths)
+        self._model = None
+        self._suspended = False
+
+    def model(self, service):
+        self._model = StateModel(service, on_accounts=self.accounts_changed.emit,
+                                 on_server=self.server_changed.emit, on_paths=self.paths_changed.emit)
+        return self._model
+
+    def suspend_during(self, worker):
+        """worker 执行期间暂停监视：立即释放全部监视句柄，worker 线程开始时等待进行中的检测结束，
+        结束后恢复 (模型随后重新给出监视路径)"""
+        self._suspended = True
+        self._clear()
+        worker.started.connect(self._model.suspend, Qt.ConnectionType.DirectConnection)
+        worker.finished.connect(self._resume)
+
+    def _resume(self):
+        self._suspended = False
+        self._model.resume()
+
+    def _clear(self):
+        current = self.watcher.files() + self.watcher.directories()
+        if current:
+            self.watcher.removePaths(current)
+
+    def _on_changed(self, path):
+        self._model.notify(path)
+        # 文件被删除或以改名方式替换后会从监视列表中移除，仍存在时重新加入
+        if path not in self.watcher.files() and os.path.isfile(path):
+            self.watcher.addPath(path)
+
+    def _set_paths(self, paths):
+        self._clear()
+        if self._suspended:
+            # 暂停前发出的信号，恢复后模型会重新给出
+            return
+        # 尚不存在的文件由其所在目录的变化发现；已存在却无法注册的路径 (例如网络驱动器) 改为轮询
+        existing = [path for path in paths if os.path.exists(path)]
+        failed = self.watcher.addPaths(existing) if existing else []
+        self._model.poll(failed)
+
+
+# ================= 背景图 =================
+def read_image_size(path):
+    """只读取图片文件头获取尺寸 (已按 EXIF 方向旋转)，无法识别时返回空 QSize"""
+    reader = QImageReader(path)
+    size = reader.size()
+    if size.isValid() and reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+        size.transpose()
+    return size
+
+
+class BackgroundLoader(QThread):
+    """后台解码背景图并缩小到目标尺寸，结果以 (路径, 修改时间, 目标尺寸) 为键缓存在磁盘上"""
+    loaded = pyqtSignal(str, QImage)  # (缓存键, 缩小后的图片)
+
+    def __init__(self, path, target_size, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.target_size = target_size
+        st = os.stat(path)
+        # 键的前半部分只取决于图片路径，同一张图片的旧缓存 (修改前 / 其他尺寸) 据此清理
+        self.source = hashlib.sha1(os.path.normcase(os.path.abspath(path)).encode('utf-8')).hexdigest()
+        variant = f'{st.st_mtime_ns}|{st.st_size}|{target_size.width()}x{target_size.height()}'
+        self.key = f'{self.source}-{hashlib.sha1(variant.encode("utf-8")).hexdigest()}'
+
+    def run(self):
+        cache_path = os.path.join(BACKGROUND_CACHE_DIR, self.key + '.png')
+        with span('background_load') as s:
+            image = QImage(cache_path) if os.path.exists(cache_path) else QImage()
+            s.set(cached=not image.isNull())
+            if image.isNull():
+                image = self._decode()
+                if image.isNull():
+                    s.set(error='decode')
+                    logger.warning(f'无法读取背景图: {self.path}')
+                    return
+                self._save(image, cache_path)
+            s.set(bytes=os.path.getsize(self.path), width=image.width(), height=image.height())
+        self.loaded.emit(self.key, image)
+
+    def _decode(self):
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        size = read_image_size(self.path)
+        if size.isValid():
+            # 缩放到恰好覆盖目标区域；JPEG 等格式可在解码时直接按缩小后的尺寸解码
+            scaled = size.scaled(self.target_size, Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+            if scaled.width() < size.width():
+                if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+                    scaled.transpose()
+                reader.setScaledSize(scaled)
+        return reader.read()
+
+    def _save(self, image, cache_path):
+        try:
+            os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+            # 每张背景只保留当前尺寸的缓存 (连同旧版不带前缀的缓存)；其他图片的缓存与正在写入的临时文件不动
+            for name in os.listdir(BACKGROUND_CACHE_DIR):
+                stem, ext = os.path.splitext(name)
+                if ext == '.png' and stem != self.key and (stem.startswith(self.source + '-') or '-' not in stem):
+                    os.remove(os.path.join(BACKGROUND_CACHE_DIR, name))
+            tmp_path = cache_path + '.tmp'
+            if image.save(tmp_path, 'PNG'):
+                os.replace(tmp_path, cache_path)
+        except OSError:
+            logger.warning('写入背景图缓存失败', exc_info=True)
+
+
+class BackgroundFrame(QFrame):
+    """绘制背景图的容器：图片拉伸铺满，右侧两角圆角；每种尺寸只缩放一次"""
+    RADIUS = 12
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._source = None
+        self._scaled = None
+
+    def set_background(self, pixmap):
+        self._source = pixmap
+        self._scaled = None
+        self.update()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._scaled = None
+
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if self._source is None:
+            return
+        dpr = self.devicePixelRatioF()
+        if self._scaled is None:
+            self._scaled = self._source.scaled(
+                self.size() * dpr, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            self._scaled.setDevicePixelRatio(dpr)
+        rect = QRectF(self.rect())
+        clip = QPainterPath()
+        # 左侧圆角落在控件之外，只保留右侧两角
+        clip.addRoundedRect(rect.adjusted(-self.RADIUS, 0, 0, 0), self.RADIUS, self.RADIUS)
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setClipPath(clip)
+        painter.drawPixmap(0, 0, self._scaled)
+        painter.end()
 
 
 # ================= 颜色插值工具 =================
@@ -195,8 +443,82 @@ def lerp_color(c1: QColor, c2: QColor, t: float) -> QColor:
         int(c1.alpha() + (c2.alpha() - c1.alpha()) * t),
     )
 
+# 颜色过渡预先计算的级数，动画帧中按进度直接取用，不再逐帧创建 QColor
+RAMP_STEPS = 64
+
+
+class ColorRamp:
+    """start -> end 的预计算颜色序列"""
+    __slots__ = ('colors', '_last_index')
+
+    def __init__(self, start: QColor, end: QColor, steps=RAMP_STEPS):
+        self.colors = [lerp_color(start, end, i / (steps - 1)) for i in range(steps)]
+        self._last_index = len(self.colors) - 1
+
+    def at(self, t) -> QColor:
+        if t >= 1.0:
+            return self.colors[self._last_index]
+        if t <= 0.0:
+            return self.colors[0]
+        return self.colors[int(t * self._last_index + 0.5)]
+
+    @property
+    def end(self) -> QColor:
+        return self.colors[self._last_index]
+
+
+def animation_progress(anim):
+    """动画当前进度 (0.0 ~ 1.0)，未运行时为 1.0"""
+    if anim.state() != QVariantAnimation.State.Running:
+        return 1.0
+    return anim.currentTime() / anim.duration()
+
+
+# 阴影图按 (尺寸, 圆角, 模糊半径, 颜色) 缓存，只在尺寸变化时重新模糊一次
+_shadow_cache = {}
+
+
+def render_shadow(width, height, radius, blur, color: QColor) -> QPixmap:
+    """预渲染圆角矩形的模糊阴影，四周各留出 blur 像素的边距"""
+    key = (width, height, radius, blur, color.rgba())
+    pixmap = _shadow_cache.get(key)
+    if pixmap is not None:
+        return pixmap
+    shape = QImage(width + blur * 2, height + blur * 2, QImage.Format.Format_ARGB32_Premultiplied)
+    shape.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(shape)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(color)
+    painter.drawRoundedRect(QRectF(blur, blur, width, height), radius, radius)
+    painter.end()
+
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(shape))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(blur)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+    blurred = QImage(shape.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    blurred.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(blurred)
+    scene.render(painter, QRectF(blurred.rect()), QRectF(shape.rect()))
+    painter.end()
+
+    pixmap = QPixmap.fromImage(blurred)
+    _shadow_cache[key] = pixmap
+    return pixmap
+
+
 # ================= 自定义动画组件 =================
 class AnimatedServerButton(QToolButton):
+    ACTIVE_BG = QColor(255, 255, 255, 25)
+    ACTIVE_BORDER = QColor(255, 255, 255, 255)
+    HOVER_BG = QColor(255, 255, 255, 10)
+    HOVER_BORDER = QColor(160, 160, 160, 255)
+    IDLE_BG = QColor(255, 255, 255, 0)
+    IDLE_BORDER = QColor(255, 255, 255, 0)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.is_active = False
@@ -204,17 +526,48 @@ class AnimatedServerButton(QToolButton):
         
         self.anim = QVariantAnimation(self)
         self.anim.setDuration(250)
+        self.anim.setStartValue(0.0)
+        self.anim.setEndValue(1.0)
         self.anim.valueChanged.connect(self.update)
         
-        self.current_val = 0.0
-        
-        self.start_border = QColor(255, 255, 255, 0)
-        self.start_bg = QColor(255, 255, 255, 0)
-        self.end_border = QColor(255, 255, 255, 0)
-        self.end_bg = QColor(255, 255, 255, 0)
+        self.bg_ramp = ColorRamp(self.IDLE_BG, self.IDLE_BG)
+        self.border_ramp = ColorRamp(self.IDLE_BORDER, self.IDLE_BORDER)
+
+        # 绘制用对象在各帧之间复用
+        self._painter = QPainter()
+        self._pen = QPen(self.IDLE_BORDER)
+        self._pen.setWidth(2)
+        self._pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+        self._brush = QBrush(self.IDLE_BG)
+        self._body_rect = QRect()
+        self._icon = QIcon()
+        self._icon_rect = QRect()
 
         self.setStyleSheet("QToolButton { background: transparent; border: none; outline: none; }")
 
+    def setIcon(self, icon):
+        super().setIcon(icon)
+        self._icon = icon
+        self._update_geometry_cache()
+
+    def setIconSize(self, size):
+        super().setIconSize(size)
+        self._update_geometry_cache()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._update_geometry_cache()
+
+    def _update_geometry_cache(self):
+        self._body_rect = self.rect().adjusted(1, 1, -1, -1)
+        icon_size = self.iconSize()
+        self._icon_rect = QRect(
+            (self.width() - icon_size.width()) // 2,
+            (self.height() - icon_size.height()) // 2,
+            icon_size.width(),
+            icon_size.height()
+        )
+
     def set_active(self, active):
         if self.is_active == active: return
         self.is_active = active
@@ -239,60 +592,65 @@ class AnimatedServerButton(QToolButton):
         self.update()
 
     def _start_anim(self):
-        cur_val = self.anim.currentValue() if self.anim.state() == QVariantAnimation.State.Running else self.current_val
-        if cur_val is None: cur_val = 1.0
-
-        self.start_bg = lerp_color(self.start_bg, self.end_bg, cur_val)
-        self.start_border = lerp_color(self.start_border, self.end_border, cur_val)
+        # 从当前显示的颜色过渡到新状态的颜色，色阶只在状态切换时计算一次
+        val = animation_progress(self.anim)
+        start_bg = self.bg_ramp.at(val)
+        start_border = self.border_ramp.at(val)
         
         if self.is_active:
-            self.end_bg = QColor(255, 255, 255, 25)
-            self.end_border = QColor(255, 255, 255, 255)
+            end_bg, end_border = self.ACTIVE_BG, self.ACTIVE_BORDER
         elif self.is_hover:
-            self.end_bg = QColor(255, 255, 255, 10)
-            self.end_border = QColor(160, 160, 160, 255)
+            end_bg, end_border = self.HOVER_BG, self.HOVER_BORDER
         else:
-            self.end_bg = QColor(255, 255, 255, 0)
-            self.end_border = QColor(255, 255, 255, 0)
+            end_bg, end_border = self.IDLE_BG, self.IDLE_BORDER
+        self.bg_ramp = ColorRamp(start_bg, end_bg)
+        self.border_ramp = ColorRamp(start_border, end_border)
 
         self.anim.stop()
-        self.anim.setStartValue(0.0)
-        self.anim.setEndValue(1.0)
         self.anim.start()
 
     def paintEvent(self, e):
-        val = self.anim.currentValue() if self.anim.state() == QVariantAnimation.State.Running else 1.0
-        self.current_val = val
-        if val is None: val = 1.0
-
-        bg = lerp_color(self.start_bg, self.end_bg, val)
-        bc = lerp_color(self.start_border, self.end_border, val)
+        val = animation_progress(self.anim)
+        self._pen.setColor(self.border_ramp.at(val))
+        self._brush.setColor(self.bg_ramp.at(val))
 
-        painter = QPainter(self)
+        painter = self._painter
+        painter.begin(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(self._pen)
+        painter.setBrush(self._brush)
+        painter.drawRoundedRect(self._body_rect, 12, 12)
+        if not self._icon.isNull():
+            self._icon.paint(painter, self._icon_rect)
+        painter.end()
 
-        pen = QPen(bc)
-        pen.setWidth(2)
-        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
-        rect = self.rect().adjusted(1, 1, -1, -1)
-        
-        painter.setPen(pen)
-        painter.setBrush(bg)
-        painter.drawRoundedRect(rect, 12, 12)
-
-        icon = self.icon()
-        if not icon.isNull():
-            icon_size = self.iconSize()
-            icon_rect = QRect(
-                (self.width() - icon_size.width()) // 2,
-                (self.height() - icon_size.height()) // 2,
-                icon_size.width(),
-                icon_size.height()
-            )
-            icon.paint(painter, icon_rect)
+
+class ShadowUnderlay(QWidget):
+    """绘制在按钮下层的预渲染阴影，随按钮移动；只有几何变化时才重绘"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.pixmap = None
+
+    def paintEvent(self, e):
+        if self.pixmap is not None:
+            painter = QPainter(self)
+            painter.drawPixmap(0, 0, self.pixmap)
+            painter.end()
 
 
 class AnimatedStartButton(QPushButton):
+    SHADOW_BLUR = 20
+    SHADOW_OFFSET = 5
+    SHADOW_COLOR = QColor(0, 0, 0, 80)
+    TEXT_COLOR = QColor(255, 255, 255, 255)
+    THEMES = {
+        # (常态, 悬停, 按下)
+        'official': (QColor(0, 152, 234, 255), QColor(51, 161, 244, 255), QColor(0, 123, 191, 255)),
+        'bilibili': (QColor(240, 116, 130, 255), QColor(251, 143, 155, 255), QColor(210, 90, 105, 255)),
+    }
+
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
         self.is_hover = False
@@ -300,17 +658,27 @@ class AnimatedStartButton(QPushButton):
         
         self.anim = QVariantAnimation(self)
         self.anim.setDuration(200)
+        self.anim.setStartValue(0.0)
+        self.anim.setEndValue(1.0)
         self.anim.valueChanged.connect(self.update)
-        self.current_val = 0.0
         
-        self.base_color = QColor(0, 152, 234, 255)
-        self.hover_color = QColor(51, 161, 244, 255)
-        self.press_color = QColor(0, 123, 191, 255)
-        self.start_bg = QColor(0, 152, 234, 255)
-        self.end_bg = QColor(0, 152, 234, 255)
+        self.base_color, self.hover_color, self.press_color = self.THEMES['official']
+        self.bg_ramp = ColorRamp(self.base_color, self.base_color)
+
+        # 绘制用对象在各帧之间复用
+        self._painter = QPainter()
+        self._brush = QBrush(self.base_color)
+        self._text_pen = QPen(self.TEXT_COLOR)
+        self._text = text
+        self._rect = QRect()
+        self._shadow = None
 
         self.setStyleSheet("QPushButton { background-color: transparent; border: none; outline: none; }")
 
+    def setText(self, text):
+        super().setText(text)
+        self._text = text
+
     def enterEvent(self, e):
         super().enterEvent(e)
         self.is_hover = True
@@ -332,56 +700,79 @@ class AnimatedStartButton(QPushButton):
         self._start_anim()
 
     def _start_anim(self):
-        cur_val = self.anim.currentValue() if self.anim.state() == QVariantAnimation.State.Running else self.current_val
-        if cur_val is None: cur_val = 1.0
-        
-        self.start_bg = lerp_color(self.start_bg, self.end_bg, cur_val)
+        start_bg = self.bg_ramp.at(animation_progress(self.anim))
 
         if self.is_pressed:
-            self.end_bg = self.press_color
+            end_bg = self.press_color
         elif self.is_hover:
-            self.end_bg = self.hover_color
+            end_bg = self.hover_color
         else:
-            self.end_bg = self.base_color
+            end_bg = self.base_color
+        self.bg_ramp = ColorRamp(start_bg, end_bg)
 
         self.anim.stop()
-        self.anim.setStartValue(0.0)
-        self.anim.setEndValue(1.0)
         self.anim.start()
 
     def paintEvent(self, e):
-        val = self.anim.currentValue() if self.anim.state() == QVariantAnimation.State.Running else 1.0
-        self.current_val = val
-        if val is None: val = 1.0
+        self._brush.setColor(self.bg_ramp.at(animation_progress(self.anim)))
 
-        bg = lerp_color(self.start_bg, self.end_bg, val)
-
-        painter = QPainter(self)
+        painter = self._painter
+        painter.begin(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
         painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(bg)
-        rect = self.rect()
-        painter.drawRoundedRect(rect, 12, 12)
+        painter.setBrush(self._brush)
+        painter.drawRoundedRect(self._rect, 12, 12)
+
+        # begin() 已使用控件字体，无需再 setFont
+        painter.setPen(self._text_pen)
+        painter.drawText(self._rect, Qt.AlignmentFlag.AlignCenter, self._text)
+        painter.end()
 
-        painter.setPen(QColor(255, 255, 255, 255))
-        painter.setFont(self.font())
-        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, self.text())
+    # ---------------- 阴影 ----------------
+    # 阴影绘制在父控件中的独立底层控件上，按钮重绘 (动画帧) 时无需重新模糊
+
+    def _sync_shadow(self):
+        parent = self.parentWidget()
+        if parent is None:
+            return
+        if self._shadow is None or self._shadow.parentWidget() is not parent:
+            if self._shadow is not None:
+                self._shadow.deleteLater()
+            self._shadow = ShadowUnderlay(parent)
+        blur = self.SHADOW_BLUR
+        if self._shadow.pixmap is None or self._shadow.pixmap.size() != self.size() + QSize(blur * 2, blur * 2):
+            self._shadow.pixmap = render_shadow(self.width(), self.height(), 12, blur, self.SHADOW_COLOR)
+        geo = self.geometry().adjusted(-blur, -blur + self.SHADOW_OFFSET, blur, blur + self.SHADOW_OFFSET)
+        self._shadow.setGeometry(geo)
+        self._shadow.setVisible(self.isVisible())
+        self._shadow.stackUnder(self)
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self._sync_shadow()
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        if self._shadow is not None:
+            self._shadow.hide()
+
+    def moveEvent(self, e):
+        super().moveEvent(e)
+        self._sync_shadow()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._rect = self.rect()
+        self._sync_shadow()
 
     def set_server_theme(self, server):
         """切换服务器主题色"""
+        self.base_color, self.hover_color, self.press_color = self.THEMES.get(server, self.THEMES['bilibili'])
         if server == 'official':
-            self.base_color = QColor(0, 152, 234, 255)
-            self.hover_color = QColor(51, 161, 244, 255)
-            self.press_color = QColor(0, 123, 191, 255)
             self.setText(' 启动官服  START')
         else:
-            self.base_color = QColor(240, 116, 130, 255)
-            self.hover_color = QColor(251, 143, 155, 255)
-            self.press_color = QColor(210, 90, 105, 255)
             self.setText(' 启动B服  START')
-        self.start_bg = self.base_color
-        self.end_bg = self.base_color
+        self.bg_ramp = ColorRamp(self.base_color, self.base_color)
         self.update()
 
 class InputDialog(MessageBoxBase):
@@ -401,24 +792,6 @@ class InputDialog(MessageBoxBase):
     def getText(self):
         return self.lineEdit.text().strip()
 
-def load_config():
-    if not os.path.exists(os.path.dirname(CONFIG_PATH)):
-        os.makedirs(os.path.dirname(CONFIG_PATH))
-    if os.path.exists(CONFIG_PATH):
-        try:
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {'game_path': '', 'maa_path': ''}
-
-def save_config(config):
-    if not os.path.exists(os.path.dirname(CONFIG_PATH)):
-        os.makedirs(os.path.dirname(CONFIG_PATH))
-    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-        json.dump(config, f, ensure_ascii=False, indent=4)
-
-
 class SettingsDialog(MessageBoxBase):
     def __init__(self, config, parent=None):
         super().__init__(parent)
@@ -467,6 +840,12 @@ class SettingsDialog(MessageBoxBase):
         self.bgRow.addWidget(self.bgInput)
         self.bgRow.addWidget(self.bgBtn)
         self.viewLayout.addLayout(self.bgRow)
+
+        self.viewLayout.addSpacing(10)
+
+        self.logCompressBox = CheckBox("压缩保存旧日志 (.gz)", self)
+        self.logCompressBox.setChecked(self.config.get('log_compress', False))
+        self.viewLayout.addWidget(self.logCompressBox)
         
         self.widget.setMinimumWidth(450)
         self.viewLayout.setContentsMargins(24, 24, 24, 24)
@@ -487,16 +866,123 @@ class SettingsDialog(MessageBoxBase):
         return {
             'game_path': self.gameInput.text(),
             'maa_path': self.maaInput.text(),
-            'bg_path': self.bgInput.text()
+            'bg_path': self.bgInput.text(),
+            'log_compress': self.logCompressBox.isChecked()
         }
 
+class RepairDialog(MessageBoxBase):
+    """修复确认：默认只修复损坏文件并保留登录状态"""
+
+    def __init__(self, server_name, parent=None):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel("修复确认", self)
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(BodyLabel(
+            f"将对【{server_name}】执行校验修复：\n\n"
+            "• 关闭正在运行的游戏进程\n"
+            "• 校验游戏目录中的服务器资源文件\n"
+            "• 只重新写入缺失 / 损坏的文件，并删除另一服务器的残留文件", self))
+        self.keepLoginBox = CheckBox("保留登录状态 (取消勾选将清除 U8Data / sdkdata，需要重新登录)", self)
+        self.keepLoginBox.setChecked(True)
+        self.viewLayout.addWidget(self.keepLoginBox)
+        self.widget.setMinimumWidth(420)
+        self.viewLayout.setContentsMargins(24, 24, 24, 24)
+        self.viewLayout.setSpacing(12)
+
+    def preserve_login(self):
+        return self.keepLoginBox.isChecked()
+
+class DiagnosticsDialog(MessageBoxBase):
+    """本机各项操作的耗时统计，用于排查切换缓慢的原因"""
+
+    def __init__(self, summary, info, parent=None):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel("诊断信息", self)
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(BodyLabel(
+            f"{info['host']}  ·  {info['platform']}  ·  {info['cpus']} 核  ·  启动器 {VERSION}", self))
+
+        lines = format_summary(summary) if summary else ['暂无操作记录']
+        self.tableLabel = BodyLabel('\n'.join(lines), self)
+        self.tableLabel.setFont(QFont('Consolas', 9))
+        self.tableLabel.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.viewLayout.addWidget(self.tableLabel)
+        self.viewLayout.addWidget(BodyLabel(f"原始记录: {METRICS_PATH}", self))
+
+        self.cancelButton.hide()
+        self.widget.setMinimumWidth(560)
+        self.viewLayout.setContentsMargins(24, 24, 24, 24)
+        self.viewLayout.setSpacing(12)
+
+class RotationDialog(MessageBoxBase):
+    """选择参与轮换的账号预设与 MAA 超时时间"""
+
+    def __init__(self, entries, parent=None):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel("多账号轮换", self)
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(BodyLabel("依次为选中的账号启动游戏并运行 MAA (按服务器分组执行)：", self))
+
+        self.accountList = ListWidget(self)
+        for name in sorted(entries):
+            server = entries[name].get('server')
+            item = QListWidgetItem(f"{name}  ({SERVER_NAMES.get(server, '未记录服务器')})")
+            item.setData(Qt.ItemDataRole.UserRole, name)
+            if server:
+                item.setCheckState(Qt.CheckState.Checked)
+            else:
+                # 未记录服务器归属的旧预设无法确定应切换到哪个服务器
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEnabled)
+            self.accountList.addItem(item)
+        self.accountList.setMinimumHeight(200)
+        self.viewLayout.addWidget(self.accountList)
+
+        self.timeoutRow = QHBoxLayout()
+        self.timeoutRow.addWidget(BodyLabel("单个账号 MAA 超时 (分钟):", self))
+        self.timeoutSpin = SpinBox(self)
+        self.timeoutSpin.setRange(5, 240)
+        self.timeoutSpin.setValue(int(MAA_TIMEOUT / 60))
+        self.timeoutRow.addWidget(self.timeoutSpin)
+        self.viewLayout.addLayout(self.timeoutRow)
+        self.viewLayout.addWidget(BodyLabel("MAA 需开启「启动后直接运行」与「完成后退出 MAA」。", self))
+
+        self.widget.setMinimumWidth(420)
+        self.viewLayout.setContentsMargins(24, 24, 24, 24)
+        self.viewLayout.setSpacing(12)
+
+    def selected(self):
+        return [self.accountList.item(i).data(Qt.ItemDataRole.UserRole) for i in range(self.accountList.count())
+                if self.accountList.item(i).checkState() == Qt.CheckState.Checked]
+
+    def maa_timeout(self):
+        return self.timeoutSpin.value() * 60
+
 class ModernArknightsLauncher(FramelessWindow):
     def __init__(self):
-        super().__init__()
-        self.config = load_config()
-        self._config_dirty = False
-        self.initUI()
-        self.initWindow()
+        with PROFILER.phase('FramelessWindow.__init__'):
+            super().__init__()
+        self._worker = None
+        self._stage_title = ''
+        with PROFILER.phase('launcher services'):
+            self.service = LauncherService()
+            self.config = self.service.config
+            apply_log_settings(self.config['log_levels'], self.config['log_compress'])
+            self.accounts = self.service.accounts
+            self.processes = self.service.processes
+            self.processEvents = ProcessEvents(self)
+            self.processEvents.ready.connect(self._on_process_ready)
+            self.processEvents.exited.connect(self._on_process_exited)
+            self.monitor = self.processEvents.monitor(self.processes, SessionHistory(SESSION_HISTORY_PATH))
+            # 账号列表与服务器状态由目录监视增量更新，切换服务器 / 启动时不再扫描
+            self.stateEvents = StateEvents(self)
+            self.stateEvents.accounts_changed.connect(lambda entries: self.refresh_accounts_list())
+            self.stateModel = self.stateEvents.model(self.service)
+            # 后台检测要等 check_first_run 回滚完被打断的切换后再开始，这里只读取预设索引供界面显示
+            self.stateModel.reload_accounts()
+        with PROFILER.phase('initUI'):
+            self.initUI()
+        with PROFILER.phase('initWindow'):
+            self.initWindow()
         
         # 在界面初始化完成后检查是否需要首次配置指南
         QTimer.singleShot(100, self.check_first_run)
@@ -505,11 +991,21 @@ class ModernArknightsLauncher(FramelessWindow):
         
     def check_first_run(self):
         """ 检查是否是首次运行，如果是则强制要求设置游戏路径 """
-        game_path = self.config.get('game_path', '')
-        if not game_path or not os.path.exists(game_path):
+        # 计时不包含等待用户操作的对话框
+        with PROFILER.phase('check_first_run'):
+            game_path = self.config.get('game_path', '')
+            needs_setup = not game_path or not os.path.exists(game_path)
+            recovered = not needs_setup and self.service.recover()
+            self.stateModel.start()
+        PROFILER.finish()
+
+        if needs_setup:
             msgBox = MessageBox('欢迎使用', '检测到您可能是首次使用本启动器，或游戏路径配置已失效。\n请先设置「明日方舟」的客户端根目录以继续。', self)
             if msgBox.exec():
                 self.on_settings_clicked()
+        elif recovered:
+            # 上次服务器切换中途被打断，已按日志回滚
+            InfoBar.warning('已回滚', '检测到上次服务器切换未完成，游戏文件已恢复到切换前的状态。', position=InfoBarPosition.TOP, duration=4000, parent=self)
 
     def initWindow(self):
         self.setWindowTitle('Arknights Launcher - Modern Edition')
@@ -520,17 +1016,20 @@ class ModernArknightsLauncher(FramelessWindow):
         self.setTitleBar(MSFluentTitleBar(self))
 
         # 系统托盘图标
-        self.trayIcon = QSystemTrayIcon(QIcon(OFFICIAL_ICON), self)
-        trayMenu = QMenu()
-        trayMenu.addAction("显示主窗口", self.showNormal)
-        trayMenu.addAction("退出启动器", self.quit_app)
-        self.trayIcon.setContextMenu(trayMenu)
-        self.trayIcon.activated.connect(self.on_tray_activated)
-        self.trayIcon.show()
+        with PROFILER.phase('tray icon'):
+            self.trayIcon = QSystemTrayIcon(QIcon(OFFICIAL_ICON), self)
+            trayMenu = QMenu()
+            trayMenu.addAction("显示主窗口", self.showNormal)
+            trayMenu.addAction("退出启动器", self.quit_app)
+            self.trayIcon.setContextMenu(trayMenu)
+            self.trayIcon.activated.connect(self.on_tray_activated)
+            self.trayIcon.show()
 
         # 强制暗黑流利风格
-        setTheme(Theme.DARK)
-        self.update_background()
+        with PROFILER.phase('setTheme'):
+            setTheme(Theme.DARK)
+        with PROFILER.phase('update_background'):
+            self.update_background()
 
     def resizeEvent(self, e):
         super().resizeEvent(e)
@@ -540,18 +1039,24 @@ class ModernArknightsLauncher(FramelessWindow):
 
     def update_background(self):
         bg_path = self.config.get('bg_path', os.path.join(BASE_DIR, 'resources', 'bg.png'))
-        bg_url = bg_path.replace("\\", "/") if os.path.exists(bg_path) else "none"
-        bg_css = f"border-image: url({bg_url}) 0 0 0 0 stretch stretch;" if bg_url != "none" else ""
-
-        if os.path.exists(bg_path):
-            pixmap = QPixmap(bg_path)
-            if not pixmap.isNull():
-                ratio = pixmap.width() / pixmap.height()
-                target_height = 550
-                # 取消了外边距，所以右侧宽度 = 总宽 - 边栏宽
-                total_width = int(target_height * ratio) + 80
-                total_width = max(900, min(total_width, 1600))
-                self.resize(total_width, target_height)
+        self.rightContent.set_background(None)
+        self._background_key = None
+
+        # 仅读取文件头计算宽高比，解码与缩放在后台线程中完成
+        size = read_image_size(bg_path) if os.path.exists(bg_path) else QSize()
+        if size.isValid() and size.height() > 0:
+            ratio = size.width() / size.height()
+            target_height = 550
+            # 取消了外边距，所以右侧宽度 = 总宽 - 边栏宽
+            total_width = int(target_height * ratio) + 80
+            total_width = max(900, min(total_width, 1600))
+            self.resize(total_width, target_height)
+            target = QSize(total_width - 80, target_height) * self.devicePixelRatioF()
+            loader = BackgroundLoader(bg_path, target, self)
+            self._background_key = loader.key
+            loader.loaded.connect(self._on_background_loaded)
+            loader.finished.connect(loader.deleteLater)
+            loader.start()
 
         self.setStyleSheet(f"""
             ModernArknightsLauncher {{
@@ -563,7 +1068,6 @@ class ModernArknightsLauncher(FramelessWindow):
                 border-bottom-left-radius: 12px;
             }}
             #RightContent {{
-                {bg_css}
                 background-color: #2b2b2b;
                 border-top-right-radius: 12px;
                 border-bottom-right-radius: 12px;
@@ -643,10 +1147,17 @@ class ModernArknightsLauncher(FramelessWindow):
         self.btnAbout.clicked.connect(self.on_about_clicked)
         self.navLayout.addWidget(self.btnAbout, 0, Qt.AlignmentFlag.AlignHCenter)
 
+        self.btnDiagnostics = TransparentToolButton(FluentIcon.SPEED_HIGH, self)
+        self.btnDiagnostics.setFixedSize(40, 40)
+        self.btnDiagnostics.setIconSize(QSize(18, 18))
+        self.btnDiagnostics.setToolTip("诊断信息")
+        self.btnDiagnostics.clicked.connect(self.on_diagnostics_clicked)
+        self.navLayout.addWidget(self.btnDiagnostics, 0, Qt.AlignmentFlag.AlignHCenter)
+
         self.mainLayout.addWidget(self.navBar)
 
         # ----------------- 右侧主视窗 (承载壁纸) -----------------
-        self.rightContent = QFrame(self)
+        self.rightContent = BackgroundFrame(self)
         self.rightContent.setObjectName("RightContent")
         self.rightLayout = QVBoxLayout(self.rightContent)
         self.rightLayout.setContentsMargins(0, 0, 0, 0)
@@ -735,7 +1246,10 @@ class ModernArknightsLauncher(FramelessWindow):
         self.maaBtn.clicked.connect(self.on_maa_clicked)
         self.fixBtn = PushButton('修复清理', self, FluentIcon.SYNC)
         self.fixBtn.clicked.connect(self.on_fix_clicked)
+        self.rotateBtn = PushButton('账号轮换', self, FluentIcon.PEOPLE)
+        self.rotateBtn.clicked.connect(self.on_rotate_clicked)
         self.toolsRow.addWidget(self.maaBtn)
+        self.toolsRow.addWidget(self.rotateBtn)
         self.toolsRow.addWidget(self.fixBtn)
         self.infoLayout.addLayout(self.toolsRow)
 
@@ -751,12 +1265,6 @@ class ModernArknightsLauncher(FramelessWindow):
         self.startBtn.setFont(QFont("Microsoft YaHei", 20, QFont.Weight.Bold))
         self.startBtn.clicked.connect(self.on_start_game)
 
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        shadow.setOffset(0, 5)
-        self.startBtn.setGraphicsEffect(shadow)
-
         # 将综合面板和启动按钮加入右侧竖向布局
         self.rightPlayLayout.addWidget(self.infoPanel, 0, Qt.AlignmentFlag.AlignRight)
         self.rightPlayLayout.addWidget(self.startBtn, 0, Qt.AlignmentFlag.AlignRight)
@@ -776,7 +1284,6 @@ class ModernArknightsLauncher(FramelessWindow):
 
     def on_server_switched(self, routeKey):
         self.current_server = routeKey
-        self._config_dirty = True
         self.config['last_server'] = routeKey
 
         if routeKey == 'official':
@@ -796,25 +1303,16 @@ class ModernArknightsLauncher(FramelessWindow):
     # ================= 功能逻辑 =================
     
     def refresh_accounts_list(self):
+        selected = self.accountCombo.currentText()
         self.accountCombo.clear()
         self.accountCombo.addItem("默认 (不覆盖)")
-        if not os.path.exists(ACCOUNTS_DIR):
-            os.makedirs(ACCOUNTS_DIR)
-        for item in os.listdir(ACCOUNTS_DIR):
-            acc_path = os.path.join(ACCOUNTS_DIR, item)
-            if os.path.isdir(acc_path):
-                # 按服务器归属过滤账号
-                meta_file = os.path.join(acc_path, 'meta.json')
-                if os.path.exists(meta_file):
-                    try:
-                        with open(meta_file, 'r', encoding='utf-8') as f:
-                            meta = json.load(f)
-                        if meta.get('server') and meta['server'] != self.current_server:
-                            continue
-                    except Exception:
-                        pass
-                self.accountCombo.addItem(item)
-                
+        # 按服务器归属过滤账号
+        names = self.stateModel.names_for(self.current_server)
+        for name in names:
+            self.accountCombo.addItem(name)
+        if selected in names:
+            self.accountCombo.setCurrentText(selected)
+
     def on_save_account(self):
         game_path = self.config.get('game_path', '')
         if not game_path or not os.path.exists(game_path):
@@ -828,30 +1326,21 @@ class ModernArknightsLauncher(FramelessWindow):
                 InfoBar.error('错误', '账号名不能为空', position=InfoBarPosition.TOP, parent=self)
                 return
                 
-            acc_save_path = os.path.join(ACCOUNTS_DIR, acc_name)
-            if os.path.exists(acc_save_path):
+            if os.path.exists(self.accounts.path_of(acc_name)):
                 msg_box = MessageBox('覆盖确认', f'账号 "{acc_name}" 已经存在，是否要覆盖？', self)
                 if not msg_box.exec():
                     return
-                shutil.rmtree(acc_save_path, ignore_errors=True)
-                
-            os.makedirs(acc_save_path, exist_ok=True)
 
-            # 保存服务器归属元数据
-            with open(os.path.join(acc_save_path, 'meta.json'), 'w', encoding='utf-8') as f:
-                json.dump({'server': self.current_server}, f, ensure_ascii=False)
+            def on_saved(results):
+                self.stateModel.reload_accounts()
+                self.refresh_accounts_list()
+                self.accountCombo.setCurrentText(acc_name)
+                InfoBar.success('成功', f'当前登录账状态已保存为：{acc_name}', position=InfoBarPosition.TOP, parent=self)
 
-            u8_data = os.path.join(game_path, "U8Data")
-            if os.path.exists(u8_data):
-                self.copy_tree_overwrite(u8_data, os.path.join(acc_save_path, "U8Data"))
-                
-            sdk_data = os.path.join(game_path, "sdkdata")
-            if os.path.exists(sdk_data):
-                self.copy_tree_overwrite(sdk_data, os.path.join(acc_save_path, "sdkdata"))
-            
-            self.refresh_accounts_list()
-            self.accountCombo.setCurrentText(acc_name)
-            InfoBar.success('成功', f'当前登录账状态已保存为：{acc_name}', position=InfoBarPosition.TOP, parent=self)
+            self._start_worker(
+                self.service.save_account(acc_name, self.current_server), on_saved,
+                lambda msg: InfoBar.error('保存失败', msg, position=InfoBarPosition.TOP, parent=self)
+            )
 
     def on_delete_account(self):
         selected_acc = self.accountCombo.currentText()
@@ -861,10 +1350,9 @@ class ModernArknightsLauncher(FramelessWindow):
         
         msg_box = MessageBox('删除确认', f'确定要删除账号预设 "{selected_acc}" 吗？\n此操作不可恢复。', self)
         if msg_box.exec():
-            acc_path = os.path.join(ACCOUNTS_DIR, selected_acc)
-            if os.path.exists(acc_path):
-                shutil.rmtree(acc_path, ignore_errors=True)
-                logger.info(f'已删除账号预设: {selected_acc}')
+            self.accounts.delete(selected_acc)
+            logger.info(f'已删除账号预设: {selected_acc}')
+            self.stateModel.reload_accounts()
             self.refresh_accounts_list()
             InfoBar.success('已删除', f'账号预设 "{selected_acc}" 已被移除。', position=InfoBarPosition.TOP, parent=self)
 
@@ -872,8 +1360,12 @@ class ModernArknightsLauncher(FramelessWindow):
         dialog = SettingsDialog(self.config, self)
         if dialog.exec():
             new_conf = dialog.get_result()
+            game_path_changed = new_conf['game_path'] != self.config.get('game_path', '')
             self.config.update(new_conf)
-            save_config(self.config)
+            self.config.flush()
+            apply_log_settings(self.config['log_levels'], self.config['log_compress'])
+            if game_path_changed:
+                self.stateModel.invalidate_game()
             self.update_background() # 实时刷新背景图
             InfoBar.success('配置已保存', '启动器各项设置已更新！', position=InfoBarPosition.TOP, parent=self)
 
@@ -883,29 +1375,30 @@ class ModernArknightsLauncher(FramelessWindow):
             InfoBar.error('未配置!', '请先点击左下角设置游戏根目录。', position=InfoBarPosition.TOP, parent=self)
             return
 
-        server_name = '官服' if self.current_server == 'official' else 'B服'
-        msgBox = MessageBox('修复确认', f'是否要对【{server_name}】执行登录数据重置？\n\n• 关闭正在运行的游戏进程\n• 清除已保存的登录状态 (U8Data / sdkdata)\n• 使用当前服务器的原始客户端文件覆盖冲突文件\n\n⚠ 执行后需要重新登录游戏账号。', self)
-        if msgBox.exec():
-            self.kill_process("Arknights.exe")
-            try:
-                # 删除缓存元凶
-                u8_data = os.path.join(game_path, "U8Data")
-                if os.path.exists(u8_data): shutil.rmtree(u8_data, ignore_errors=True)
-                sdk_data = os.path.join(game_path, "sdkdata")
-                if os.path.exists(sdk_data): shutil.rmtree(sdk_data, ignore_errors=True)
-
-                # 根据当前选择的服务器使用对应资源
-                if self.current_server == 'official':
-                    res_path = os.path.join(BASE_DIR, 'resources', 'Payload')
-                else:
-                    res_path = os.path.join(BASE_DIR, 'resources', 'Payload_B')
-                if os.path.exists(res_path):
-                    self.copy_tree_overwrite(res_path, game_path)
-                
-                InfoBar.success('成功', f"【{server_name}】环境修复完毕！可尝试重新登录。", position=InfoBarPosition.TOP, duration=3000, parent=self)
-            except Exception as e:
-                logger.exception('修复清理时发生异常')
-                InfoBar.error('修复失败', f"清理时发生错误: {str(e)}", position=InfoBarPosition.TOP, parent=self)
+        server_name = SERVER_NAMES[self.current_server]
+        dialog = RepairDialog(server_name, self)
+        if not dialog.exec():
+            return
+        # 根据当前选择的服务器使用对应资源
+        try:
+            stages = self.service.verify_repair(self.current_server, dialog.preserve_login())
+        except LauncherError as e:
+            InfoBar.error('资源缺失', str(e), position=InfoBarPosition.TOP, parent=self)
+            return
+
+        def on_repaired(results):
+            report = results['verify']
+            if report.ok:
+                detail = f'已校验 {report.files_checked} 个文件，未发现损坏。'
+            else:
+                detail = (f'修复 {len(report.missing)} 个缺失、{len(report.modified)} 个损坏文件，'
+                          f'删除 {len(report.foreign)} 个残留文件。')
+            InfoBar.success(f'【{server_name}】修复完毕', detail, position=InfoBarPosition.TOP, duration=4000, parent=self)
+
+        self._start_worker(
+            stages, on_repaired,
+            lambda msg: InfoBar.error('修复失败', f"修复时发生错误: {msg}", position=InfoBarPosition.TOP, parent=self)
+        )
 
     def on_maa_clicked(self):
         maa_path = self.config.get('maa_path', '')
@@ -916,125 +1409,156 @@ class ModernArknightsLauncher(FramelessWindow):
             return
         
         try:
-            subprocess.Popen(maa_path, cwd=os.path.dirname(maa_path))
+            self.processes.spawn(maa_path)
+            self.monitor.watch(os.path.basename(maa_path))
             InfoBar.success('启动成功', "成功拉起 MAA 辅助进程", position=InfoBarPosition.TOP, duration=2000, parent=self)
         except Exception as e:
             logger.exception('启动 MAA 失败')
             InfoBar.error('错误', f'启动 MAA 失败: {str(e)}', position=InfoBarPosition.TOP, parent=self)
 
+    def on_rotate_clicked(self):
+        try:
+            maa_path = self.service.require_maa_path()
+            self.service.require_game_path()
+        except LauncherError as e:
+            InfoBar.error('未配置!', f'{e}，请先在全局设置中配置。', position=InfoBarPosition.TOP, parent=self)
+            return
+        dialog = RotationDialog(self.stateModel.accounts, self)
+        if not dialog.exec():
+            return
+        first_server = self.stateModel.current_server(self.config.get('last_server', 'official'))
+        items, _ = plan_rotation(self.accounts, dialog.selected(), first_server)
+        if not items:
+            InfoBar.warning('未选择账号', '请至少选择一个已记录服务器归属的账号预设。', position=InfoBarPosition.TOP, parent=self)
+            return
+
+        self._worker = RotationWorker(self.service, maa_path, items, dialog.maa_timeout(), self)
+        self._worker.item_changed.connect(lambda i, n, name: self.serverLabel.setText(f"▶ 轮换中 ({i + 1}/{n}): {name}"))
+        self._worker.stage_changed.connect(self._on_stage_changed)
+        self._worker.progress.connect(self._on_stage_progress)
+        self._worker.status.connect(lambda text: self.startBtn.setText(f' {text}'))
+        self._worker.result.connect(self._on_rotation_result)
+        self._worker.report.connect(self._on_rotation_report)
+        self._worker.failed.connect(lambda msg: InfoBar.error('轮换中止', msg, position=InfoBarPosition.TOP, parent=self))
+        self._worker.finished.connect(self._on_worker_finished)
+        self._worker.finished.connect(lambda: self.on_server_switched(self.config.get('last_server', 'official')))
+        self.stateEvents.suspend_during(self._worker)
+        self._set_busy(True)
+        self._worker.start()
+
+    def _on_rotation_result(self, result):
+        if result.status != DONE:
+            InfoBar.warning(result.item.name, result.error or '已取消', position=InfoBarPosition.TOP, duration=4000, parent=self)
+
+    def _on_rotation_report(self, report):
+        InfoBar.success('轮换结束', f'完成 {report.completed}/{len(report.results)} 个账号，耗时 {report.elapsed / 60:.0f} 分钟'
+                        f' ({report.accounts_per_hour:.1f} 个/小时)', position=InfoBarPosition.TOP, duration=8000, parent=self)
+
     def on_start_game(self):
+        # 启动流程进行中再次点击按钮即为取消
+        if self._worker is not None and self._worker.isRunning():
+            self._worker.cancel()
+            InfoBar.info('正在取消', '当前步骤完成后将停止后续操作。', position=InfoBarPosition.TOP, duration=2000, parent=self)
+            return
+
         game_path = self.config.get('game_path', '')
         if not game_path or not os.path.exists(game_path):
             InfoBar.error('未配置!', '请先点击左下角设置游戏根目录。', position=InfoBarPosition.TOP, duration=3000, parent=self)
             return
 
-        # 检测当前游戏目录实际服务器状态
-        server_name = '官服' if self.current_server == 'official' else 'B服'
-        detected = self._detect_current_server(game_path)
-        need_overlay = (detected != self.current_server)
+        # 检测 (首次使用时包括资源解压与哈希) 在后台流程的第一个阶段进行，
+        # 确认文本使用监视维护的服务器状态
+        server = self.current_server
         acc_text = self.accountCombo.currentText()
+        account = acc_text if acc_text and acc_text != "默认 (不覆盖)" else None
+        try:
+            plan = self.service.plan_start(server, account, self.stateModel.verdict, deferred=True)
+        except LauncherError as e:
+            InfoBar.error('资源缺失', str(e), position=InfoBarPosition.TOP, parent=self)
+            return
 
         # 启动确认
-        if need_overlay:
-            summary = f'即将切换到【{server_name}】模式，需要覆盖游戏目录中的部分文件。'
-        else:
-            summary = f'当前游戏文件已是【{server_name}】环境，将直接启动（跳过文件覆盖）。'
-        if acc_text and acc_text != "默认 (不覆盖)":
-            summary += f'\n将加载账号预设「{acc_text}」。'
-        summary += '\n\n是否继续？'
-        if not MessageBox('启动确认', summary, self).exec():
+        if not MessageBox('启动确认', plan.summary() + '\n\n是否继续？', self).exec():
             return
 
-        self.kill_process("Arknights.exe")
-
-        try:
-
-            if need_overlay:
-                # 文件覆盖逻辑 — 仅在服务器切换时执行
-                if self.current_server == 'official':
-                    res_path = os.path.join(BASE_DIR, 'resources', 'Payload')
-                    # 互斥清理 B 服专属文件
-                    pc_game_sdk = os.path.join(game_path, "PCGameSDK.dll")
-                    bl_platform = os.path.join(game_path, "BLPlatform64")
-                    if os.path.exists(pc_game_sdk): os.remove(pc_game_sdk)
-                    if os.path.exists(bl_platform): shutil.rmtree(bl_platform, ignore_errors=True)
-                else:
-                    res_path = os.path.join(BASE_DIR, 'resources', 'Payload_B')
-                    # 互斥清理官服专属文件
-                    hg_sdk = os.path.join(game_path, "hgsdk.dll")
-                    if os.path.exists(hg_sdk): os.remove(hg_sdk)
-
-                if os.path.exists(res_path):
-                    self.copy_tree_overwrite(res_path, game_path)
-                else:
-                    InfoBar.error('资源缺失', f'找不到预配资源包: {res_path}', position=InfoBarPosition.TOP, parent=self)
-                    return
-                logger.info(f'服务器文件已切换: {detected} -> {self.current_server}')
-            else:
-                logger.info(f'当前已是{"官服" if self.current_server == "official" else "B服"}环境，跳过文件覆盖')
-
-            # 应用账号预设
-            selected_acc = self.accountCombo.currentText()
-            if selected_acc and selected_acc != "默认 (不覆盖)":
-                acc_path = os.path.join(ACCOUNTS_DIR, selected_acc)
-                if os.path.exists(acc_path):
-                    self.copy_tree_overwrite(acc_path, game_path)
-
+        def on_prepared(results):
             # 借权启动
-            exe_path = os.path.join(game_path, "Arknights.exe")
-            if os.path.exists(exe_path):
-                ctypes.windll.shell32.ShellExecuteW(None, "runas", exe_path, None, game_path, 1)
-                InfoBar.success('正在进入游戏', '模块注入成功，正在拉起游戏终端...', position=InfoBarPosition.TOP, duration=2000, parent=self)
-                QTimer.singleShot(1500, self._minimize_to_tray)
-            else:
-                InfoBar.error('错误', '在游戏目录下未找到 Arknights.exe，请检查游戏是否损坏！', position=InfoBarPosition.TOP, parent=self)
+            try:
+                launched = self.service.finish_start(plan)
+            except LauncherError as e:
+                InfoBar.error('错误', str(e), position=InfoBarPosition.TOP, parent=self)
+                return
+            self.monitor.watch(GAME_EXE, launched, {'server': server, 'account': plan.account})
+            InfoBar.success('正在进入游戏', '模块注入成功，正在拉起游戏终端...', position=InfoBarPosition.TOP, duration=2000, parent=self)
+            QTimer.singleShot(1500, self._minimize_to_tray)
+
+        self._start_worker(
+            self.service.start_stages(plan),
+            on_prepared,
+            lambda msg: InfoBar.error('执行中止', msg, position=InfoBarPosition.TOP, duration=4000, parent=self)
+        )
 
-        except Exception as e:
-            logger.exception('启动游戏时发生异常')
-            InfoBar.error('执行中止', str(e), position=InfoBarPosition.TOP, duration=4000, parent=self)
+    # ---------------- 进程监视 ----------------
+    def _on_process_ready(self, session):
+        if session.name == GAME_EXE:
+            self.trayIcon.showMessage('Arknights Launcher', f'游戏已就绪 (启动耗时 {session.ready_latency:.1f}s)',
+                                      QSystemTrayIcon.MessageIcon.Information, 2000)
 
-    # ---------------- 辅助方法 ---------------- 
-    def kill_process(self, process_name):
-        killed = []
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'] and proc.info['name'].lower() == process_name.lower():
-                    proc.kill()
-                    killed.append(proc)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        # 等待进程真正退出，避免文件锁冲突
-        for proc in killed:
-            try:
-                proc.wait(timeout=5)
-            except (psutil.NoSuchProcess, psutil.TimeoutExpired):
-                pass
-
-    def _detect_current_server(self, game_path):
-        """检测游戏目录当前实际对应的服务器，通过特征文件判断"""
-        has_bilibili = os.path.exists(os.path.join(game_path, 'PCGameSDK.dll'))
-        has_official = os.path.exists(os.path.join(game_path, 'hgsdk.dll'))
-        if has_bilibili and not has_official:
-            return 'bilibili'
-        elif has_official and not has_bilibili:
-            return 'official'
-        # 无法确定或首次使用时，返回 None 强制执行覆盖
-        return None
-
-    def copy_tree_overwrite(self, src_dir, dst_dir, exclude=None):
-        if exclude is None:
-            exclude = {'meta.json'}
-        if not os.path.exists(dst_dir):
-            os.makedirs(dst_dir)
-        for item in os.listdir(src_dir):
-            if item in exclude:
-                continue
-            s = os.path.join(src_dir, item)
-            d = os.path.join(dst_dir, item)
-            if os.path.isdir(s):
-                self.copy_tree_overwrite(s, d, exclude)
-            else:
-                shutil.copy2(s, d)
+    def _on_process_exited(self, session):
+        if session.name != GAME_EXE or session.pid is None:
+            return
+        # 游戏退出后从托盘恢复启动器窗口
+        if self.isHidden():
+            self.showNormal()
+            self.activateWindow()
+        minutes, seconds = divmod(int(session.duration), 60)
+        InfoBar.info('游戏已退出', f'本次游戏时长 {minutes // 60}:{minutes % 60:02d}:{seconds:02d}', position=InfoBarPosition.TOP, duration=4000, parent=self)
+
+    # ---------------- 后台任务 ----------------
+    def _start_worker(self, stages, on_success, on_failed):
+        """在后台线程执行流程，期间锁定会修改游戏目录的按钮，启动按钮显示当前阶段与进度"""
+        self._worker = PipelineWorker(stages, self)
+        self._worker.stage_changed.connect(self._on_stage_changed)
+        self._worker.progress.connect(self._on_stage_progress)
+        self._worker.succeeded.connect(on_success)
+        self._worker.failed.connect(on_failed)
+        self._worker.cancelled.connect(
+            lambda: InfoBar.warning('已取消', '操作已在阶段之间中止。', position=InfoBarPosition.TOP, duration=2000, parent=self)
+        )
+        self._worker.finished.connect(self._on_worker_finished)
+        self.stateEvents.suspend_during(self._worker)
+        self._set_busy(True)
+        self._worker.start()
+
+    def _set_busy(self, busy):
+        for w in (self.btnOff, self.btnBili, self.saveAccBtn, self.delAccBtn, self.fixBtn, self.btnSettings,
+                  self.maaBtn, self.rotateBtn):
+            w.setEnabled(not busy)
+
+    def _on_stage_changed(self, index, count, title):
+        self._stage_title = title
+        self.startBtn.setText(f' {title} ({index + 1}/{count})')
+
+    def _on_stage_progress(self, snapshot):
+        self.startBtn.setText(f' {self._stage_title}  {snapshot.percent}%')
+
+    def _on_worker_finished(self):
+        self._set_busy(False)
+        # 后台流程修改了游戏目录：不等目录监视的通知，下次启动前确保重新检测
+        self.stateModel.invalidate_game()
+        self.startBtn.set_server_theme(self.current_server)
+
+    def _stop_worker(self):
+        """退出前取消并等待后台任务，避免游戏目录停留在写入一半的状态"""
+        if self._worker is not None and self._worker.isRunning():
+            self._worker.cancel()
+            self._worker.wait()
+
+    # ---------------- 辅助方法 ----------------
+    def _on_background_loaded(self, key, image):
+        # 忽略切换背景前发起的旧任务
+        if key == self._background_key:
+            self.rightContent.set_background(QPixmap.fromImage(image))
 
     # ================= 关于 / 托盘 / 退出 =================
 
@@ -1045,7 +1569,7 @@ class ModernArknightsLauncher(FramelessWindow):
             '功能特性:\n'
             '• 一键切换官服 / Bilibili 服务器\n'
             '• 多账号预设保存与加载\n'
-            '• MAA 辅助快速启动\n'
+            '• MAA 辅助快速启动与多账号轮换\n'
             '• 客户端登录数据修复\n'
             '• 自动检查更新\n\n'
             f'项目地址: github.com/{GITHUB_REPO}\n'
@@ -1053,6 +1577,10 @@ class ModernArknightsLauncher(FramelessWindow):
             self
         ).exec()
 
+    def on_diagnostics_clicked(self):
+        summary = summarize(RECORDER.load())
+        DiagnosticsDialog(summary, machine_info(), self).exec()
+
     # ================= 自动更新 =================
 
     def _check_for_updates(self):
@@ -1061,7 +1589,7 @@ class ModernArknightsLauncher(FramelessWindow):
         self._update_checker.update_available.connect(self._on_update_available)
         self._update_checker.start()
 
-    def _on_update_available(self, new_version, changelog, download_url):
+    def _on_update_available(self, new_version, changelog, download_url, sha256):
         """发现新版本时显示更新提示"""
         logger.info(f'发现新版本: {new_version}')
         
@@ -1079,16 +1607,16 @@ class ModernArknightsLauncher(FramelessWindow):
         msg.cancelButton.setText('下次再说')
         
         if msg.exec():
-            self._do_update(download_url, new_version)
+            self._do_update(download_url, new_version, sha256)
 
-    def _do_update(self, download_url, new_version):
+    def _do_update(self, download_url, new_version, sha256=''):
         """执行下载并替换"""
         # 如果链接是 GitHub Release 页面(非 exe)，直接打开浏览器
         if not download_url.lower().endswith('.exe'):
             os.startfile(download_url)
             return
         
-        dialog = UpdateDownloadDialog(download_url, new_version, self)
+        dialog = UpdateDownloadDialog(download_url, new_version, sha256, self)
         if dialog.exec() and dialog.downloaded_path:
             self._apply_update(dialog.downloaded_path)
 
@@ -1131,8 +1659,10 @@ del "%~f0"
         )
         
         # 强制退出
-        if self._config_dirty:
-            save_config(self.config)
+        self._stop_worker()
+        self.monitor.stop()
+        self.stateModel.stop()
+        self.config.close()
         self.trayIcon.hide()
         QApplication.quit()
 
@@ -1151,15 +1681,15 @@ del "%~f0"
         )
 
     def quit_app(self):
-        if self._config_dirty:
-            save_config(self.config)
+        self._stop_worker()
+        self.monitor.stop()
+        self.stateModel.stop()
+        self.config.close()
         self.trayIcon.hide()
         QApplication.quit()
 
     def closeEvent(self, e):
-        if self._config_dirty:
-            save_config(self.config)
-            self._config_dirty = False
+        self.config.flush()
         # 点 X 时最小化到托盘而非退出
         if hasattr(self, 'trayIcon') and self.trayIcon.isVisible():
             e.ignore()
@@ -1168,7 +1698,11 @@ del "%~f0"
         super().closeEvent(e)
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    w = ModernArknightsLauncher()
-    w.show()
+    with PROFILER.phase('QApplication'):
+        app = QApplication(sys.argv)
+    with PROFILER.phase('ModernArknightsLauncher'):
+        w = ModernArknightsLauncher()
+    with PROFILER.phase('show'):
+        w.show()
+    QTimer.singleShot(0, lambda: PROFILER.mark('event loop running'))
     sys.exit(app.exec())